@@ -12,6 +12,7 @@ from .models import (
     Item,
     Request,
     Appointment,
+    BookingSeries,
     OrgPolicy,
 )
 
@@ -96,3 +97,11 @@ class AppointmentAdmin(admin.ModelAdmin):
     search_fields = ('item__name', 'user__username')
     readonly_fields = ('created_at',)
 
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    """Admin for BookingSeries model."""
+    list_display = ('id', 'user', 'item', 'room', 'weekdays', 'start_time', 'end_time', 'start_date', 'until', 'materialized_until')
+    list_filter = ('start_date', 'until')
+    search_fields = ('item__name', 'room__code', 'user__username')
+    readonly_fields = ('created_at', 'materialized_until')
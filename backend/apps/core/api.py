@@ -1,7 +1,8 @@
 """
 DRF serializers and viewsets pentru gestionarea resurselor.
 """
-from drf_spectacular.utils import extend_schema, extend_schema_view, extend_schema_field
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
 from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -15,7 +16,11 @@ from .models import (
     Item,
     Request,
     Appointment,
+    BookingSeries,
+    User,
 )
+from . import refdata
+from .fieldsets import FIELDSET_PARAMETERS, SparseFieldsetMixin, ValuesProjection
 from .permissions import IsSuperAdmin, IsOwnerOrSuperAdmin
 
 
@@ -29,22 +34,12 @@ class RoleSerializer(serializers.ModelSerializer):
 
 class TeamSerializer(serializers.ModelSerializer):
     """Serializer for Team model."""
+    manager = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
     manager_username = serializers.CharField(source='manager.username', read_only=True)
     
     class Meta:
         model = Team
         fields = ['id', 'name', 'manager', 'manager_username', 'required_days_per_week', 'required_weekdays']
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Setăm queryset-ul pentru manager după ce Django este inițializat
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        self.fields['manager'] = serializers.PrimaryKeyRelatedField(
-            queryset=User.objects.all(),
-            required=False,
-            allow_null=True
-        )
 
 
 class RoomCategorySerializer(serializers.ModelSerializer):
@@ -64,132 +59,226 @@ class RoomSerializer(serializers.ModelSerializer):
         fields = ['id', 'code', 'name', 'category', 'category_name', 'capacity']
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Item model."""
     class Meta:
         model = Item
         fields = ['id', 'name', 'status', 'meta']
 
 
-class RequestSerializer(serializers.ModelSerializer):
+class RequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Request model."""
     user = serializers.CharField(source='user.username', read_only=True)
     room_code = serializers.CharField(write_only=True, help_text="Codul camerei (ex: 'meetingRoom1', 'beerPointArea', 'meetingLarge1')")
-    roomCode = serializers.SerializerMethodField(read_only=True, help_text="Codul camerei")
+    roomCode = serializers.CharField(
+        source='room.code', read_only=True, allow_null=True, help_text="Codul camerei"
+    )
     decided_by = serializers.CharField(source='decided_by.username', read_only=True, allow_null=True)
     
-    @extend_schema_field(serializers.CharField(allow_null=True))
-    def get_roomCode(self, obj) -> str | None:
-        """Returnează codul camerei folosind doar room_id pentru a evita loop-uri."""
-        # Folosim doar room_id pentru a evita accesarea obiectului room
-        # care ar putea cauza loop-uri infinite
-        if not hasattr(obj, 'room_id') or not obj.room_id:
-            return None
-        
-        # Folosim cache-ul din context pentru a evita query-uri multiple
-        if hasattr(self, '_room_cache'):
-            room_cache = self._room_cache
-        else:
-            room_cache = {}
-            self._room_cache = room_cache
-        
-        # Dacă avem room_id în cache, folosim-l
-        if obj.room_id in room_cache:
-            return room_cache[obj.room_id]
-        
-        # Dacă nu, încercăm să obținem codul direct din baza de date
-        # fără a accesa obiectul room
-        try:
-            from django.db import connection
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT code FROM core_room WHERE id = %s", [obj.room_id])
-                row = cursor.fetchone()
-                if row:
-                    code = row[0]
-                    room_cache[obj.room_id] = code
-                    return code
-        except Exception:
-            pass
-        
-        return None
-    
     class Meta:
         model = Request
         fields = [
             'id', 'user', 'roomCode', 'room_code',
-            'status', 'start_date', 'end_date', 'created_at', 'status_changed_at', 'decided_by', 'note'
+            'status', 'start_date', 'end_date', 'created_at', 'status_changed_at', 'decided_by', 'note', 'series'
         ]
-        read_only_fields = ['user', 'status', 'created_at', 'status_changed_at', 'decided_by']
+        read_only_fields = ['user', 'status', 'created_at', 'status_changed_at', 'decided_by', 'series']
     
     def validate_room_code(self, value):
-        """Validează că camera cu acest cod există."""
-        try:
-            room = Room.objects.get(code=value)
-            if not hasattr(room, 'category') or not room.category:
-                raise serializers.ValidationError(f"Camera '{room.name}' nu are o categorie asociată.")
-            return value
-        except Room.DoesNotExist:
+        """Validează că camera cu acest cod există (din cache-ul de referință)."""
+        room = refdata.rooms.by_key(value)
+        if room is None:
             raise serializers.ValidationError(f"Camera cu codul '{value}' nu există.")
+        if not room.category_id:
+            raise serializers.ValidationError(f"Camera '{room.name}' nu are o categorie asociată.")
+        return value
     
     def create(self, validated_data):
         """Creează request-ul folosind room_code."""
         room_code = validated_data.pop('room_code')
-        room = Room.objects.get(code=room_code)
-        validated_data['room'] = room
+        validated_data['room'] = refdata.rooms.by_key(room_code)
         return super().create(validated_data)
     
     def update(self, instance, validated_data):
         """Actualizează request-ul folosind room_code dacă este furnizat."""
         if 'room_code' in validated_data:
             room_code = validated_data.pop('room_code')
-            room = Room.objects.get(code=room_code)
-            validated_data['room'] = room
+            validated_data['room'] = refdata.rooms.by_key(room_code)
         return super().update(instance, validated_data)
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Appointment model."""
     item_name = serializers.CharField(write_only=True, help_text="Numele item-ului (ex: 'LT-001', 'MON-001')")
     item = serializers.PrimaryKeyRelatedField(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False)
     username = serializers.CharField(source='user.username', read_only=True)
     
     class Meta:
         model = Appointment
-        fields = ['id', 'user', 'username', 'item', 'item_name', 'start_date', 'end_date', 'created_at']
-        read_only_fields = ['user', 'item', 'created_at']
+        fields = ['id', 'user', 'username', 'item', 'item_name', 'start_date', 'end_date', 'created_at', 'series']
+        read_only_fields = ['user', 'item', 'created_at', 'series']
     
     def validate_item_name(self, value):
-        """Validează că item-ul cu acest nume există."""
-        try:
-            Item.objects.get(name=value)
-            return value
-        except Item.DoesNotExist:
+        """Validează că item-ul cu acest nume există (din cache-ul de referință)."""
+        if refdata.items.by_key(value) is None:
             raise serializers.ValidationError(f"Item-ul cu numele '{value}' nu există.")
+        return value
     
     def create(self, validated_data):
         """Creează appointment-ul folosind item_name."""
         item_name = validated_data.pop('item_name')
-        item = Item.objects.get(name=item_name)
-        validated_data['item'] = item
+        validated_data['item'] = refdata.items.by_key(item_name)
         return super().create(validated_data)
     
     def update(self, instance, validated_data):
         """Actualizează appointment-ul folosind item_name dacă este furnizat."""
         if 'item_name' in validated_data:
             item_name = validated_data.pop('item_name')
-            item = Item.objects.get(name=item_name)
-            validated_data['item'] = item
+            validated_data['item'] = refdata.items.by_key(item_name)
         return super().update(instance, validated_data)
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Setăm queryset-ul pentru user după ce Django este inițializat
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        self.fields['user'] = serializers.PrimaryKeyRelatedField(
-            queryset=User.objects.all(),
-            required=False
-        )
+
+
+# Proiecțiile read-only pentru listele mari (aceleași chei ca RequestSerializer / AppointmentSerializer)
+REQUEST_VALUES = ValuesProjection(
+    id='id',
+    user='user__username',
+    roomCode='room__code',
+    status='status',
+    start_date='start_date',
+    end_date='end_date',
+    created_at='created_at',
+    status_changed_at='status_changed_at',
+    decided_by='decided_by__username',
+    note='note',
+    series='series_id',
+)
+
+APPOINTMENT_VALUES = ValuesProjection(
+    id='id',
+    user='user_id',
+    username='user__username',
+    item='item_id',
+    start_date='start_date',
+    end_date='end_date',
+    created_at='created_at',
+    series='series_id',
+)
+
+
+class AppointmentBatchEntrySerializer(serializers.Serializer):
+    """O programare din batch; item_name este rezolvat o singură dată pentru tot batch-ul."""
+    item_name = serializers.CharField(help_text="Numele item-ului (ex: 'LT-001', 'MON-001')")
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs['end_date'] <= attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'end_date trebuie să fie după start_date.'})
+        return attrs
+
+
+class AppointmentBatchSerializer(serializers.Serializer):
+    """
+    Serializer pentru crearea mai multor programări într-un singur request
+    (ex: același birou pentru toată săptămâna).
+
+    Item-urile sunt rezolvate din cache-ul de referință (refdata); după validare,
+    fiecare intrare din `appointments` are cheia `item` cu instanța Item.
+    """
+    MAX_APPOINTMENTS = 50
+
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False)
+    appointments = AppointmentBatchEntrySerializer(many=True, allow_empty=False)
+
+    def validate_appointments(self, entries):
+        if len(entries) > self.MAX_APPOINTMENTS:
+            raise serializers.ValidationError(
+                f"Un batch poate conține cel mult {self.MAX_APPOINTMENTS} programări."
+            )
+
+        names = {entry['item_name'] for entry in entries}
+        items = {}
+        for name in names:
+            item = refdata.items.by_key(name)
+            if item is not None:
+                items[name] = item
+
+        missing = sorted(names - items.keys())
+        if missing:
+            raise serializers.ValidationError(
+                f"Item-urile cu numele {', '.join(repr(name) for name in missing)} nu există."
+            )
+
+        for entry in entries:
+            entry['item'] = items[entry.pop('item_name')]
+
+        # Programările din batch nu se pot suprapune între ele pe același item
+        by_item = {}
+        for index, entry in enumerate(entries):
+            by_item.setdefault(entry['item'].id, []).append((entry['start_date'], entry['end_date'], index))
+        for intervals in by_item.values():
+            intervals.sort()
+            for (_, previous_end, previous_index), (start, _, index) in zip(intervals, intervals[1:]):
+                if start < previous_end:
+                    raise serializers.ValidationError(
+                        f"Programările {previous_index} și {index} se suprapun pe același item."
+                    )
+        return entries
+
+
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    """
+    Serializer pentru BookingSeries (rezervare recurentă săptămânală).
+
+    Resursa este dată fie prin item_name, fie prin room_code (exact una dintre ele).
+    """
+    MAX_DAYS = 366
+
+    item_name = serializers.CharField(write_only=True, required=False, help_text="Numele item-ului (ex: 'LT-001')")
+    room_code = serializers.CharField(write_only=True, required=False, help_text="Codul camerei (ex: 'meetingRoom1')")
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = BookingSeries
+        fields = [
+            'id', 'user', 'username', 'item', 'item_name', 'room', 'room_code',
+            'weekdays', 'interval', 'start_time', 'end_time', 'start_date', 'until',
+            'materialized_until', 'created_at',
+        ]
+        read_only_fields = ['user', 'item', 'room', 'materialized_until', 'created_at']
+
+    def validate_weekdays(self, value):
+        if not value or any(day not in range(7) for day in value):
+            raise serializers.ValidationError("weekdays trebuie să conțină valori între 0 (Luni) și 6 (Duminică).")
+        return sorted(set(value))
+
+    def validate(self, attrs):
+        from django.utils import timezone
+
+        item_name = attrs.pop('item_name', None)
+        room_code = attrs.pop('room_code', None)
+        if bool(item_name) == bool(room_code):
+            raise serializers.ValidationError("Specifică exact unul dintre item_name și room_code.")
+        if item_name:
+            item = refdata.items.by_key(item_name)
+            if item is None:
+                raise serializers.ValidationError({'item_name': f"Item-ul cu numele '{item_name}' nu există."})
+            attrs['item'] = item
+        else:
+            room = refdata.rooms.by_key(room_code)
+            if room is None:
+                raise serializers.ValidationError({'room_code': f"Camera cu codul '{room_code}' nu există."})
+            attrs['room'] = room
+
+        if attrs['end_time'] <= attrs['start_time']:
+            raise serializers.ValidationError({'end_time': 'end_time trebuie să fie după start_time.'})
+        if attrs['start_date'] < timezone.localdate():
+            raise serializers.ValidationError({'start_date': 'Seria nu poate începe în trecut.'})
+        if attrs['until'] < attrs['start_date']:
+            raise serializers.ValidationError({'until': 'until trebuie să fie după sau egal cu start_date.'})
+        if (attrs['until'] - attrs['start_date']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'until': f'O serie poate acoperi cel mult {self.MAX_DAYS} de zile.'})
+        return attrs
 
 
 # ViewSets
@@ -237,6 +326,8 @@ class TeamViewSet(viewsets.ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
     permission_classes = [IsAuthenticated]
+    # Intervalul maxim al raportului de conformitate (un an + o săptămână)
+    COMPLIANCE_MAX_DAYS = 371
     
     def get_permissions(self):
         """Permisiuni diferite pentru acțiuni diferite."""
@@ -245,6 +336,129 @@ class TeamViewSet(viewsets.ModelViewSet):
         # update_presence_policy are permisiuni custom în metoda respectivă
         return super().get_permissions()
     
+    @extend_schema(
+        tags=['Teams'],
+        summary='Raport de conformitate cu politica de prezență',
+        description='Pentru fiecare membru activ și fiecare săptămână din interval: zilele de prezență (Luni-Vineri), '
+                    'zilele cerute de politică (team override → org default), dacă norma a fost atinsă și ce zile '
+                    'obligatorii (required_weekdays, 0=Luni) au fost ratate. Răspunsul este transmis în flux '
+                    '(CSV sau NDJSON), un rând per user și săptămână. '
+                    'SUPERADMIN vede toate echipele, manager-ul doar echipele pe care le conduce. '
+                    f'Intervalul maxim este de {COMPLIANCE_MAX_DAYS} de zile.',
+        parameters=[
+            OpenApiParameter(name='from', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, required=False,
+                             description='Prima zi (YYYY-MM-DD). Alternativ se poate folosi `quarter`'),
+            OpenApiParameter(name='to', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, required=False,
+                             description='Ultima zi (YYYY-MM-DD). Default: azi'),
+            OpenApiParameter(name='quarter', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, required=False,
+                             description='Trimestrul, ex: 2025Q1 (înlocuiește from/to)'),
+            OpenApiParameter(name='team_id', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, required=False,
+                             description='Doar echipa specificată'),
+            OpenApiParameter(name='output', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, required=False,
+                             enum=['csv', 'ndjson'], description='Formatul răspunsului (default: csv)'),
+        ],
+        responses={
+            (200, 'text/csv'): OpenApiTypes.STR,
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            400: {'description': 'Parametri invalizi'},
+            403: {'description': 'Doar SUPERADMIN sau manager-ii de echipă'},
+            404: {'description': 'Echipa specificată (team_id) nu există'},
+        },
+    )
+    @action(detail=False, methods=['get'], url_path='compliance')
+    def compliance(self, request):
+        """
+        Raportul de conformitate cu politica de prezență, pe echipă și săptămână, transmis în flux.
+        """
+        from datetime import date, datetime, timedelta
+        from django.http import StreamingHttpResponse
+        from django.utils import timezone
+        from .compliance import stream_csv, stream_ndjson
+        
+        user = request.user
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response(
+                {'error': 'Parametrul "output" trebuie să fie "csv" sau "ndjson"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        quarter = request.query_params.get('quarter')
+        try:
+            if quarter:
+                year, number = quarter.upper().split('Q')
+                year, number = int(year), int(number)
+                if number not in (1, 2, 3, 4):
+                    raise ValueError(quarter)
+                from_date = date(year, 3 * number - 2, 1)
+                to_date = (
+                    date(year + 1, 1, 1) if number == 4 else date(year, 3 * number + 1, 1)
+                ) - timedelta(days=1)
+            else:
+                from_str = request.query_params.get('from')
+                to_str = request.query_params.get('to')
+                if not from_str:
+                    return Response(
+                        {'error': 'Parametrul "from" sau "quarter" este obligatoriu'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                from_date = datetime.strptime(from_str, '%Y-%m-%d').date()
+                to_date = datetime.strptime(to_str, '%Y-%m-%d').date() if to_str else timezone.localdate()
+        except ValueError:
+            return Response(
+                {'error': 'Format invalid. Folosește YYYY-MM-DD pentru from/to sau YYYYQn pentru quarter'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if to_date < from_date:
+            return Response(
+                {'error': '"to" trebuie să fie după sau egal cu "from"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (to_date - from_date).days >= self.COMPLIANCE_MAX_DAYS:
+            return Response(
+                {'error': f'Intervalul maxim este de {self.COMPLIANCE_MAX_DAYS} de zile'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # SUPERADMIN vede toate echipele, manager-ul doar echipele sale
+        teams = Team.objects.all() if user.is_superuser else Team.objects.filter(manager=user)
+        team_id = request.query_params.get('team_id')
+        if team_id:
+            try:
+                teams = teams.filter(id=int(team_id))
+            except ValueError:
+                return Response(
+                    {'error': 'Parametrul "team_id" trebuie să fie un număr întreg'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        team_ids = list(teams.values_list('id', flat=True))
+        if not team_ids and team_id and user.is_superuser:
+            return Response(
+                {'error': f'Echipa cu ID-ul {team_id} nu există'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if not team_ids:
+            return Response(
+                {'error': 'Doar SUPERADMIN sau manager-ul echipei poate vedea raportul de conformitate.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if output == 'ndjson':
+            response = StreamingHttpResponse(
+                stream_ndjson(team_ids, from_date, to_date),
+                content_type='application/x-ndjson; charset=utf-8'
+            )
+        else:
+            response = StreamingHttpResponse(
+                stream_csv(team_ids, from_date, to_date),
+                content_type='text/csv; charset=utf-8'
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="presence-compliance-{from_date.isoformat()}-{to_date.isoformat()}.csv"'
+            )
+        return response
+    
     @extend_schema(
         tags=['Teams'],
         summary='Actualizează politica de prezență pentru o echipă',
@@ -401,7 +615,7 @@ class RoomViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema_view(
-    list=extend_schema(tags=['Items'], summary='Listează toate item-urile'),
+    list=extend_schema(tags=['Items'], summary='Listează toate item-urile', parameters=FIELDSET_PARAMETERS),
     retrieve=extend_schema(tags=['Items'], summary='Obține detalii despre un item'),
     create=extend_schema(tags=['Items'], summary='Creează un item nou'),
     update=extend_schema(tags=['Items'], summary='Actualizează un item'),
@@ -6,3 +6,8 @@ class CoreConfig(AppConfig):
     name = 'apps.core'
     label = 'core'
 
+    def ready(self):
+        # Înregistrează signal handlers (invalidarea snapshot-urilor de disponibilitate)
+        from . import signals  # noqa: F401
+        # Înregistrează check-ul pentru cache-ul partajat
+        from . import caching  # noqa: F401
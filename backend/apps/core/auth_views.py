@@ -9,14 +9,19 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from .serializers import UserProfileSerializer, UserSerializer, UserCreateSerializer, UserUpdateSerializer
 from .permissions import IsSuperAdmin, IsOwnerOrSuperAdmin
+from .pagination import PastBookingsPagination, UserPagination
+from .fieldsets import FIELDSET_PARAMETERS
 from .models import Appointment, Request
-from .api import AppointmentSerializer, RequestSerializer
+from .api import APPOINTMENT_VALUES, REQUEST_VALUES
+from .availability import day_window, spans_day, starts_on
 
 User = get_user_model()
 
@@ -96,18 +101,71 @@ class MeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+# Limitele pentru profilul unui user (UserViewSet.retrieve)
+PROFILE_HISTORY_MAX_DAYS = 366
+PROFILE_PAST_MAX_LIMIT = 100
+
+
+def _bounded_int(request, param, default, maximum):
+    """Parametru întreg pozitiv din query string, plafonat la `maximum` (ValueError dacă e invalid)."""
+    value = request.query_params.get(param)
+    if value in (None, ''):
+        return default
+    value = int(value)
+    if value < 1:
+        raise ValueError(param)
+    return min(value, maximum)
+
+
+def _booking_values(queryset, projection, resource_lookup):
+    """Proiecția .values() a rezervărilor, plus numele resursei și cheia de paginare."""
+    return projection.values(
+        queryset,
+        list(projection.columns),
+        extra=('id', 'start_date', 'end_date', resource_lookup)
+    )
+
+
+def _booking_rows(rows, projection, resource_lookup, resource_type):
+    """Rândurile serializate (aceleași chei ca serializer-ul complet) cu numele și tipul resursei."""
+    keys = list(projection.columns)
+    return [
+        {
+            **projection.row(values, keys),
+            'resource_name': values[resource_lookup],
+            'resource_type': resource_type,
+        }
+        for values in rows
+    ]
+
+
 @extend_schema_view(
     list=extend_schema(
         summary="Listează toți utilizatorii",
         description="Doar SUPERADMIN poate vedea lista completă.",
         tags=['Users'],
+        parameters=FIELDSET_PARAMETERS,
     ),
     retrieve=extend_schema(
         summary="Obține detalii despre un utilizator",
         description="Employee poate vedea doar propriul profil. Returnează informații despre utilizator, "
                     "inclusiv appointments și requests împărțite în trecut/prezent, categoria item-ului "
-                    "pentru fiecare appointment și request, și detalii despre echipă (echipa, coechipieri, manager).",
+                    "pentru fiecare appointment și request, și detalii despre echipă (echipa, coechipieri, manager). "
+                    "Secțiunile `past` conțin doar ultimele `history_days` zile și sunt paginate: următoarea pagină "
+                    "se cere cu `appointments_cursor` / `requests_cursor` din `past_next_cursor`.",
         tags=['Users'],
+        parameters=[
+            OpenApiParameter(name='history_days', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             required=False,
+                             description=f'Câte zile în urmă intră în secțiunile past (maxim {PROFILE_HISTORY_MAX_DAYS})'),
+            OpenApiParameter(name='past_limit', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             required=False,
+                             description=f'Rezultate pe pagină în secțiunile past (maxim {PROFILE_PAST_MAX_LIMIT})'),
+            OpenApiParameter(name='appointments_cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                             required=False, description='Cursorul paginii următoare din appointments.past'),
+            OpenApiParameter(name='requests_cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                             required=False, description='Cursorul paginii următoare din requests.past'),
+        ],
     ),
     create=extend_schema(
         summary="Creează un nou utilizator",
@@ -143,6 +201,7 @@ class UserViewSet(viewsets.ModelViewSet):
     """
     queryset = User.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = UserPagination
     
     def get_serializer_class(self):
         """Returnează serializer-ul corespunzător acțiunii."""
@@ -165,7 +224,8 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Returnează toți utilizatorii pentru orice user autentificat."""
         # Orice user autentificat poate vedea toți utilizatorii
-        return User.objects.all()
+        # (role și team sunt serializate ca text, citite din JOIN)
+        return User.objects.select_related('role', 'team')
     
     def retrieve(self, request, *args, **kwargs):
         """
@@ -175,110 +235,98 @@ class UserViewSet(viewsets.ModelViewSet):
         - Pentru fiecare request: numele room-ului
         - Include toate cererile indiferent de status
         - Detalii despre echipă (echipa, coechipieri, manager)
+        
+        Un număr fix de query-uri, indiferent de istoricul userului: pentru fiecare tip de
+        rezervare unul pentru azi+viitor (împărțit în Python) și unul pentru o pagină din
+        trecut (limitat la ultimele `history_days` zile), plus unul pentru echipă și manager.
         """
-        from apps.core.api import AppointmentSerializer, RequestSerializer
+        try:
+            history_days = _bounded_int(
+                request, 'history_days', settings.USER_PROFILE_HISTORY_DAYS, PROFILE_HISTORY_MAX_DAYS
+            )
+            past_limit = _bounded_int(
+                request, 'past_limit', settings.USER_PROFILE_PAST_PAGE_SIZE, PROFILE_PAST_MAX_LIMIT
+            )
+        except ValueError:
+            return Response(
+                {'error': 'Parametrii "history_days" și "past_limit" trebuie să fie numere întregi pozitive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         instance = self.get_object()
         serializer = self.get_serializer(instance)
         data = serializer.data
         
-        # Obține toate appointment-urile și request-urile utilizatorului
-        now = timezone.now()
-        today = now.date()
-        
-        # Appointments - include toate
-        all_appointments = Appointment.objects.filter(
-            user=instance
-        ).select_related('item', 'user')
-        
-        # Requests - include toate indiferent de status
-        all_requests = Request.objects.filter(
-            user=instance
-        ).select_related('room', 'room__category', 'decided_by')
-        
-        # Organizează appointments în trecut/azi/viitor
-        today = now.date()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-        past_appointments = all_appointments.filter(end_date__lt=today_start)
-        today_appointments = all_appointments.filter(
-            start_date__date=today
-        )
-        future_appointments = all_appointments.filter(start_date__gt=today_end)
-        
-        # Serializează appointments și adaugă numele item-ului
-        def format_appointment(apt):
-            apt_data = AppointmentSerializer(apt).data
-            apt_data['resource_name'] = apt.item.name if apt.item else None
-            apt_data['resource_type'] = 'item'
-            return apt_data
-        
-        past_appointments_data = [format_appointment(apt) for apt in past_appointments]
-        today_appointments_data = [format_appointment(apt) for apt in today_appointments]
-        future_appointments_data = [format_appointment(apt) for apt in future_appointments]
-        
-        # Organizează requests în trecut/azi/viitor (bazat pe start_date)
-        today = now.date()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-        past_requests = all_requests.filter(end_date__lt=today_start)
-        today_requests = all_requests.filter(
-            start_date__date__lte=today,
-            end_date__date__gte=today
-        )
-        future_requests = all_requests.filter(start_date__gt=today_end)
-        
-        # Serializează requests și adaugă numele room-ului
-        def format_request(req):
-            req_data = RequestSerializer(req).data
-            req_data['resource_name'] = req.room.name if req.room else None
-            req_data['resource_type'] = 'room'
-            return req_data
+        today_start, today_end = day_window(timezone.localdate())
+        history_start = today_start - timedelta(days=history_days)
         
-        past_requests_data = [format_request(req) for req in past_requests]
-        today_requests_data = [format_request(req) for req in today_requests]
-        future_requests_data = [format_request(req) for req in future_requests]
+        sections = {}
+        for key, model, projection, resource_lookup, resource_type in (
+            ('appointments', Appointment, APPOINTMENT_VALUES, 'item__name', 'item'),
+            ('requests', Request, REQUEST_VALUES, 'room__name', 'room'),
+        ):
+            bookings = model.objects.filter(user=instance)
+            
+            # Azi și viitor: un singur query, împărțit în Python după start_date
+            # (appointments de azi = încep azi; requests de azi = acoperă ziua de azi)
+            today_rows, future_rows = [], []
+            current = _booking_values(bookings.filter(end_date__gte=today_start), projection, resource_lookup)
+            for values in current.order_by('start_date', 'id'):
+                if values['start_date'] >= today_end:
+                    future_rows.append(values)
+                elif model is Request or values['start_date'] >= today_start:
+                    today_rows.append(values)
+            
+            # Trecut: o pagină (keyset), doar din fereastra de istoric
+            past = PastBookingsPagination(f'{key}_cursor')
+            past_rows = past.page(
+                _booking_values(
+                    bookings.filter(end_date__lt=today_start, end_date__gte=history_start),
+                    projection,
+                    resource_lookup
+                ),
+                request,
+                past_limit
+            )
+            
+            sections[key] = {
+                'past': _booking_rows(past_rows, projection, resource_lookup, resource_type),
+                'today': _booking_rows(today_rows, projection, resource_lookup, resource_type),
+                'future': _booking_rows(future_rows, projection, resource_lookup, resource_type),
+                'past_next_cursor': past.next_cursor(),
+            }
         
-        # Obține detalii despre echipă
+        # Echipa: coechipierii și manager-ul dintr-un singur query
         team_details = None
-        if instance.team:
+        if instance.team_id:
             team = instance.team
-            # Obține toți membrii echipei (excluzând utilizatorul curent)
-            teammates = User.objects.filter(
-                team=team
-            ).exclude(id=instance.id).values(
-                'id', 'username', 'email', 'first_name', 'last_name'
+            members = User.objects.filter(
+                Q(team_id=team.id) | Q(id=team.manager_id)
+            ).order_by('username').values(
+                'id', 'username', 'email', 'first_name', 'last_name', 'team_id'
             )
             
+            teammates = []
             manager_data = None
-            if team.manager:
-                manager_data = {
-                    'id': team.manager.id,
-                    'username': team.manager.username,
-                    'email': team.manager.email,
-                    'first_name': team.manager.first_name,
-                    'last_name': team.manager.last_name,
-                }
+            for member in members:
+                member_team_id = member.pop('team_id')
+                if member['id'] == team.manager_id:
+                    manager_data = dict(member)
+                if member_team_id == team.id and member['id'] != instance.id:
+                    teammates.append(member)
             
             team_details = {
                 'id': team.id,
                 'name': team.name,
                 'manager': manager_data,
-                'teammates': list(teammates),
+                'teammates': teammates,
             }
         
         # Adaugă datele în răspuns organizate în trecut/azi/viitor
-        data['appointments'] = {
-            'past': past_appointments_data,
-            'today': today_appointments_data,
-            'future': future_appointments_data,
-        }
-        data['requests'] = {
-            'past': past_requests_data,
-            'today': today_requests_data,
-            'future': future_requests_data,
-        }
+        data['appointments'] = sections['appointments']
+        data['requests'] = sections['requests']
         data['team_details'] = team_details
+        data['history_days'] = history_days
         
         return Response(data)
     
@@ -306,8 +354,6 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Returnează toate appointment-urile și request-urile unui utilizator pentru o dată specificată.
         """
-        from apps.core.api import AppointmentSerializer, RequestSerializer
-        
         instance = self.get_object()
         date_str = request.query_params.get('date')
         
@@ -325,35 +371,24 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filtrează appointments din ziua specificată
-        appointments = Appointment.objects.filter(
-            user=instance,
-            start_date__date=target_date
-        ).select_related('item', 'user')
+        # Appointments care încep în ziua specificată
+        appointments = _booking_values(
+            Appointment.objects.filter(starts_on(target_date), user=instance),
+            APPOINTMENT_VALUES,
+            'item__name'
+        ).order_by('start_date', 'id')
         
-        # Filtrează requests din ziua specificată (toate statusurile)
+        # Requests din ziua specificată (toate statusurile)
         # Un request este relevant dacă start_date sau end_date se suprapun cu ziua target
-        requests = Request.objects.filter(
-            user=instance
-        ).filter(
-            start_date__date__lte=target_date,
-            end_date__date__gte=target_date
-        ).select_related('room', 'room__category', 'decided_by')
-        
-        # Serializează și adaugă numele resursei pentru fiecare
-        appointments_data = []
-        for apt in appointments:
-            apt_data = AppointmentSerializer(apt).data
-            apt_data['resource_name'] = apt.item.name if apt.item else None
-            apt_data['resource_type'] = 'item'
-            appointments_data.append(apt_data)
+        requests = _booking_values(
+            Request.objects.filter(spans_day(target_date), user=instance),
+            REQUEST_VALUES,
+            'room__name'
+        ).order_by('start_date', 'id')
         
-        requests_data = []
-        for req in requests:
-            req_data = RequestSerializer(req).data
-            req_data['resource_name'] = req.room.name if req.room else None
-            req_data['resource_type'] = 'room'
-            requests_data.append(req_data)
+        # Serializează direct din .values() și adaugă numele resursei pentru fiecare
+        appointments_data = _booking_rows(appointments, APPOINTMENT_VALUES, 'item__name', 'item')
+        requests_data = _booking_rows(requests, REQUEST_VALUES, 'room__name', 'room')
         
         return Response({
             'user_id': instance.id,
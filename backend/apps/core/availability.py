@@ -0,0 +1,220 @@
+"""
+Motor de disponibilitate pentru items și rooms.
+
+Rezervările dintr-o zi (appointments pe items, requests aprobate pe rooms) sunt
+grupate pe resursă într-o singură trecere, iar pentru fiecare resursă intervalele
+sunt păstrate sortate după start_date. Verificarea unei resurse devine astfel o
+căutare în dict, nu o parcurgere a tuturor rezervărilor.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import NamedTuple
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_time
+
+
+class BookingRow(NamedTuple):
+    """Proiecție compactă a unei rezervări (appointment sau request), fără obiecte ORM."""
+    id: int
+    resource_id: int
+    user_id: int
+    user_display: str
+    start_date: datetime
+    end_date: datetime
+
+
+def booking_rows(queryset, resource_field: str) -> list:
+    """
+    Încarcă rezervările dintr-un queryset ca BookingRow, într-un singur query cu values_list.
+
+    Args:
+        queryset: queryset de Appointment / Request deja filtrat
+        resource_field: 'item_id' sau 'room_id'
+    """
+    rows = queryset.values_list(
+        'id', resource_field, 'user_id',
+        'user__first_name', 'user__last_name', 'user__username',
+        'start_date', 'end_date',
+    )
+    return [
+        BookingRow(
+            id=pk,
+            resource_id=resource_id,
+            user_id=user_id,
+            user_display=f"{first_name} {last_name}".strip() or username,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        for pk, resource_id, user_id, first_name, last_name, username, start_date, end_date in rows
+    ]
+
+
+def day_window(target_date):
+    """
+    Returnează intervalul semi-deschis [00:00, 00:00 ziua următoare) pentru o zi,
+    în timezone-ul curent.
+    """
+    start = timezone.make_aware(datetime.combine(target_date, time.min))
+    return start, start + timedelta(days=1)
+
+
+def starts_on(target_date, field: str = 'start_date') -> Q:
+    """
+    Filtru echivalent cu `{field}__date=target_date`, dar pe intervalul semi-deschis
+    [00:00, 00:00 ziua următoare), astfel încât poate folosi indexul pe coloană.
+    """
+    day_start, day_end = day_window(target_date)
+    return Q(**{f'{field}__gte': day_start, f'{field}__lt': day_end})
+
+
+def starts_between(from_date, to_date, field: str = 'start_date') -> Q:
+    """Filtru echivalent cu `{field}__date__gte=from_date, {field}__date__lte=to_date`."""
+    range_start, _ = day_window(from_date)
+    _, range_end = day_window(to_date)
+    return Q(**{f'{field}__gte': range_start, f'{field}__lt': range_end})
+
+
+def spans_day(target_date) -> Q:
+    """
+    Filtru echivalent cu `start_date__date__lte=target_date, end_date__date__gte=target_date`
+    (rezervarea începe cel târziu în ziua respectivă și se termină cel devreme în ea).
+    """
+    day_start, day_end = day_window(target_date)
+    return Q(start_date__lt=day_end, end_date__gte=day_start)
+
+
+def parse_time_window(target_date, start_str=None, end_str=None, allow_datetime=True):
+    """
+    Construiește fereastra de timp [start, end) pentru verificarea disponibilității.
+
+    start/end pot fi ore (HH:MM, combinate cu target_date) sau, dacă allow_datetime,
+    datetime-uri ISO complete. Dacă lipsesc, fereastra acoperă toată ziua.
+
+    Raises:
+        ValueError: dacă formatul este invalid sau end <= start
+    """
+    day_start, day_end = day_window(target_date)
+
+    def _parse(value, default):
+        if not value:
+            return default
+        if not allow_datetime:
+            # Aceeași oră se aplică fiecărei zile, deci doar HH:MM are sens
+            try:
+                parsed_time = datetime.strptime(value, '%H:%M').time()
+            except ValueError:
+                raise ValueError(f'Format invalid: {value} (folosește HH:MM)')
+            return timezone.make_aware(datetime.combine(target_date, parsed_time))
+        parsed_time = parse_time(value) if 'T' not in value else None
+        if parsed_time is not None:
+            return timezone.make_aware(datetime.combine(target_date, parsed_time))
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f'Format invalid: {value}')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    start = _parse(start_str, day_start)
+    end = _parse(end_str, day_end)
+    if end <= start:
+        raise ValueError('end trebuie să fie după start')
+    return start, end
+
+
+class IntervalIndex:
+    """
+    Index de intervale (start_date, end_date) grupate pe resursă.
+
+    Args:
+        bookings: iterabil de obiecte cu start_date / end_date (Appointment sau Request)
+        resource_attr: numele atributului care identifică resursa (ex: 'item_id', 'room_id')
+    """
+
+    def __init__(self, bookings, resource_attr: str):
+        self.resource_attr = resource_attr
+        self._by_resource = defaultdict(list)
+        self._starts = {}
+
+        # O singură trecere peste rezervări
+        for booking in bookings:
+            self._by_resource[getattr(booking, resource_attr)].append(booking)
+
+        for resource_id, resource_bookings in self._by_resource.items():
+            resource_bookings.sort(key=lambda b: (b.start_date, b.end_date))
+            self._starts[resource_id] = [b.start_date for b in resource_bookings]
+
+    def bookings_for(self, resource_id) -> list:
+        """Returnează rezervările resursei, sortate după start_date."""
+        return self._by_resource.get(resource_id, [])
+
+    def is_occupied(self, resource_id) -> bool:
+        """True dacă resursa are cel puțin o rezervare în index."""
+        return resource_id in self._by_resource
+
+    def overlapping(self, resource_id, start, end) -> list:
+        """
+        Returnează rezervările resursei care se suprapun cu [start, end).
+
+        Rezervările care încep la sau după `end` sunt excluse prin bisect,
+        restul sunt filtrate după end_date > start.
+        """
+        starts = self._starts.get(resource_id)
+        if not starts:
+            return []
+        candidates = self._by_resource[resource_id][:bisect_left(starts, end)]
+        return [b for b in candidates if b.end_date > start]
+
+    def is_free(self, resource_id, start, end) -> bool:
+        """True dacă resursa nu are nicio rezervare care se suprapune cu [start, end)."""
+        return not self.overlapping(resource_id, start, end)
+
+    def find_gap(self, resource_id, start, end, duration):
+        """
+        Caută primul interval liber de cel puțin `duration` în [start, end).
+
+        Parcurge rezervările sortate ale resursei, avansând un cursor până la
+        sfârșitul fiecărei rezervări; primul gol suficient de mare câștigă.
+
+        Returns:
+            tuple (slot_start, slot_end) sau None dacă nu există un gol potrivit
+        """
+        cursor = start
+        for booking in self.overlapping(resource_id, start, end):
+            if booking.start_date - cursor >= duration:
+                return cursor, cursor + duration
+            cursor = max(cursor, booking.end_date)
+            if end - cursor < duration:
+                return None
+        if end - cursor >= duration:
+            return cursor, cursor + duration
+        return None
+
+
+def dates_touched(start_date, end_date) -> list:
+    """Zilele (în timezone-ul curent) acoperite de o rezervare [start_date, end_date]."""
+    first = timezone.localtime(start_date).date()
+    last = timezone.localtime(end_date).date()
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def date_range(start_date, end_date) -> list:
+    """Returnează lista zilelor din intervalul închis [start_date, end_date]."""
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+def teammate_display_name(bookings, teammate_ids):
+    """
+    Returnează numele primului teammate care ocupă resursa (sau None).
+
+    Args:
+        bookings: rezervările resursei (BookingRow)
+        teammate_ids: set cu ID-urile coechipierilor
+    """
+    for booking in bookings:
+        if booking.user_id in teammate_ids:
+            return booking.user_display
+    return None
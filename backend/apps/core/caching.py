@@ -0,0 +1,37 @@
+"""
+Verificarea cache-ului partajat între procese.
+
+Snapshot-urile de disponibilitate, datele de referință (refdata.py) și datele pentru
+ordonarea după proximitate sunt invalidate prin cache-ul Django. Invalidarea ajunge la celelalte procese (gunicorn,
+Celery) doar dacă acestea folosesc același cache (Redis). Cu un cache local
+(LocMemCache), fiecare proces și-ar vedea doar propriile invalidări și ar servi date
+vechi, așa că aceste straturi nu folosesc cache-ul deloc; check-ul de mai jos
+semnalează configurația la pornire.
+"""
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backend-uri ale căror date nu sunt vizibile altor procese
+LOCAL_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared_cache() -> bool:
+    """True dacă cache-ul default este comun tuturor proceselor (ex: Redis)."""
+    return not isinstance(caches['default'], LOCAL_CACHE_BACKENDS)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if is_shared_cache():
+        return []
+    return [
+        checks.Warning(
+            'Cache-ul default nu este partajat între procese; snapshot-urile de '
+            'disponibilitate, datele de referință și datele pentru rank=proximity sunt '
+            'citite din baza de date la fiecare cerere.',
+            hint='Setează REDIS_CACHE_URL (ex: redis://redis:6379/1).',
+            id='core.W001',
+        )
+    ]
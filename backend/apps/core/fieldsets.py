@@ -0,0 +1,92 @@
+"""
+Răspunsuri de citire mai mici și mai ieftine pentru listele mari.
+
+- `?fields=a,b` / `?omit=c` (sparse fieldsets) restrâng câmpurile din răspuns, atât
+  pentru serializer-ele cu SparseFieldsetMixin, cât și pentru proiecțiile de mai jos.
+- ValuesProjection serializează liste direct din `.values()`: fără instanțe de model
+  și fără câmpuri DRF per rând, cu aceleași chei ca serializer-ul complet.
+"""
+from datetime import datetime
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(name=FIELDS_PARAM, type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, required=False,
+                     description='Doar aceste câmpuri, separate prin virgulă (ex: id,start_date,end_date)'),
+    OpenApiParameter(name=OMIT_PARAM, type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, required=False,
+                     description='Câmpuri excluse din răspuns, separate prin virgulă (ex: meta)'),
+]
+
+
+def _param_names(request, param):
+    value = request.query_params.get(param)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request, available) -> list:
+    """Câmpurile din `available` cerute prin `?fields=` / `?omit=` (numele necunoscute sunt ignorate)."""
+    available = list(available)
+    if request is None:
+        return available
+    only = _param_names(request, FIELDS_PARAM)
+    omit = _param_names(request, OMIT_PARAM) or set()
+    return [name for name in available if (only is None or name in only) and name not in omit]
+
+
+class SparseFieldsetMixin:
+    """
+    Aplică `?fields=` / `?omit=` din request-ul din context la citire (GET), doar pentru
+    serializer-ul de la rădăcină (sau copilul listei de la rădăcină), nu și celor imbricate.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return fields
+        if self.root is not self and self.root is not self.parent:
+            return fields
+        keep = requested_fields(request, fields)
+        return {name: fields[name] for name in keep}
+
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _represent(value):
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    return value
+
+
+class ValuesProjection:
+    """
+    Serializare read-only dintr-o proiecție `.values()`.
+
+    `columns` mapează cheia din răspuns pe lookup-ul ORM (ex: 'roomCode' -> 'room__code').
+    """
+
+    def __init__(self, **columns):
+        self.columns = columns
+
+    def keys(self, request=None) -> list:
+        return requested_fields(request, self.columns)
+
+    def values(self, queryset, keys, extra=()):
+        """Queryset-ul `.values()` cu lookup-urile pentru `keys` plus `extra` (ex: cheia de paginare)."""
+        lookups = [self.columns[key] for key in keys]
+        return queryset.values(*dict.fromkeys([*lookups, *extra]))
+
+    def row(self, values, keys) -> dict:
+        return {key: _represent(values[self.columns[key]]) for key in keys}
+
+    def serialize(self, queryset, request=None) -> list:
+        keys = self.keys(request)
+        return [self.row(values, keys) for values in self.values(queryset, keys)]
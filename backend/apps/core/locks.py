@@ -0,0 +1,30 @@
+"""
+Lock-uri advisory Postgres la nivel de tranzacție.
+
+Datele derivate din rezervări (bitmap-urile de ocupare, prezența săptămânală) sunt
+recalculate din rândurile vizibile tranzacției curente și apoi suprascrise. Două
+tranzacții concurente care recalculează aceeași cheie (ex: același item în aceeași zi)
+ar pierde fiecare rezervarea celeilalte; lock-ul pe cheie, luat înainte de citire,
+le serializează: a doua citește abia după commit-ul primei.
+"""
+from django.db import connection
+
+
+def advisory_xact_lock(keys) -> None:
+    """
+    Ia lock-urile advisory (pg_advisory_xact_lock) pentru cheile text date.
+
+    Cheile sunt blocate în ordine sortată, așa că tranzacțiile care blochează mulțimi
+    suprapuse nu se pot bloca reciproc (deadlock). Lock-urile sunt eliberate automat
+    la commit / rollback; trebuie apelată într-o tranzacție (transaction.atomic).
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(hashtextextended(key, 0)) '
+            'FROM unnest(%s::text[]) WITH ORDINALITY AS keys(key, position) '
+            'ORDER BY position',
+            [keys],
+        )
@@ -0,0 +1,55 @@
+"""
+Management command pentru reconstruirea prezenței săptămânale (WeeklyPresence).
+
+Prezența este întreținută incremental la fiecare save/delete de Appointment;
+comanda este necesară doar la prima populare sau după importuri directe în baza de date.
+
+Utilizare:
+    python manage.py rebuild_presence
+    python manage.py rebuild_presence --from 2025-01-01 --to 2025-12-31
+"""
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.presence import rebuild_presence
+
+
+class Command(BaseCommand):
+    help = 'Reconstruiește prezența săptămânală per user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from',
+            dest='from_date',
+            default=None,
+            help='Prima zi (YYYY-MM-DD). Default: acum 365 de zile',
+        )
+        parser.add_argument(
+            '--to',
+            dest='to_date',
+            default=None,
+            help='Ultima zi (YYYY-MM-DD). Default: peste 365 de zile',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        try:
+            from_date = (
+                datetime.strptime(options['from_date'], '%Y-%m-%d').date()
+                if options['from_date'] else today - timedelta(days=365)
+            )
+            to_date = (
+                datetime.strptime(options['to_date'], '%Y-%m-%d').date()
+                if options['to_date'] else today + timedelta(days=365)
+            )
+        except ValueError:
+            raise CommandError('Format invalid pentru --from/--to. Folosește YYYY-MM-DD')
+
+        if to_date < from_date:
+            raise CommandError('--to trebuie să fie după sau egal cu --from')
+
+        self.stdout.write(f'Reconstruiesc prezența săptămânală pentru {from_date} - {to_date}...')
+        written = rebuild_presence(from_date, to_date)
+        self.stdout.write(self.style.SUCCESS(f'[OK] {written} rânduri (user, săptămână)'))
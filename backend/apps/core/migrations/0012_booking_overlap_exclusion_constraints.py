@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:04
+
+import apps.core.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.db import migrations, models
+
+# Perechile de rezervări suprapuse pe care constraint-urile de mai jos le-ar respinge
+# (aceleași intervale '[)' ca TsTzRange)
+OVERLAP_QUERIES = {
+    'appointment (item)': '''
+        SELECT a.id, b.id FROM core_appointment a
+        JOIN core_appointment b ON a.item_id = b.item_id AND a.id < b.id
+        WHERE tstzrange(a.start_date, a.end_date) && tstzrange(b.start_date, b.end_date)
+        ORDER BY a.id, b.id
+    ''',
+    'request APPROVED (room)': '''
+        SELECT a.id, b.id FROM core_request a
+        JOIN core_request b ON a.room_id = b.room_id AND a.id < b.id
+        WHERE a.status = 'APPROVED' AND b.status = 'APPROVED'
+          AND tstzrange(a.start_date, a.end_date) && tstzrange(b.start_date, b.end_date)
+        ORDER BY a.id, b.id
+    ''',
+}
+REPORT_LIMIT = 50
+
+
+def check_no_overlaps(apps, schema_editor):
+    """
+    Oprește migrarea, cu lista ID-urilor în conflict, dacă există deja rezervări suprapuse.
+
+    Până acum suprapunerea era verificată doar în clean(), așa că pot exista rânduri care
+    încalcă noile constraint-uri; ele trebuie rezolvate manual (șterse / mutate / respinse)
+    înainte de migrare, nu alese automat.
+    """
+    report = []
+    with schema_editor.connection.cursor() as cursor:
+        for label, query in OVERLAP_QUERIES.items():
+            cursor.execute(query)
+            pairs = cursor.fetchall()
+            if pairs:
+                shown = ', '.join(f'{first}/{second}' for first, second in pairs[:REPORT_LIMIT])
+                more = f' (+{len(pairs) - REPORT_LIMIT} altele)' if len(pairs) > REPORT_LIMIT else ''
+                report.append(f'{label}: {len(pairs)} perechi suprapuse: {shown}{more}')
+    if report:
+        raise RuntimeError(
+            'Nu se pot adăuga constraint-urile de excludere: există rezervări suprapuse. '
+            'Rezolvă perechile de ID-uri de mai jos și rulează din nou migrarea.\n'
+            + '\n'.join(report)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_change_to_datetime_with_dates'),
+    ]
+
+    operations = [
+        # Constraint-ul și index-ul vechi au fost șterse din baza de date împreună cu
+        # coloana start_at (0011), dar au rămas în starea migrațiilor - le scoatem doar din state.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name='appointment',
+                    name='exclude_overlap_per_item_per_date',
+                ),
+                migrations.RemoveIndex(
+                    model_name='appointment',
+                    name='core_appoin_item_id_077209_idx',
+                ),
+            ],
+        ),
+        migrations.RenameIndex(
+            model_name='appointment',
+            new_name='core_appoin_item_id_4b6c0d_idx',
+            old_name='core_appointment_item_start_idx',
+        ),
+        migrations.RunPython(check_no_overlaps, migrations.RunPython.noop),
+        # Fără programări suprapuse pe același item / cereri APPROVED suprapuse pe aceeași cameră
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[(apps.core.models.TsTzRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&'), ('item', '=')], name='exclude_appointment_overlap_per_item', violation_error_code='booking_conflict', violation_error_message='Item-ul este deja rezervat în acest interval.'),
+        ),
+        migrations.AddConstraint(
+            model_name='request',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status', 'APPROVED')), expressions=[(apps.core.models.TsTzRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&'), ('room', '=')], name='exclude_approved_request_overlap_per_room', violation_error_code='booking_conflict', violation_error_message='Camera este deja rezervată (cerere aprobată) în acest interval.'),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:07
+
+import math
+from datetime import datetime, time, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# Copii ale funcțiilor din apps.core.occupancy la momentul acestei migrări
+# (migrările nu importă codul aplicației, care se poate schimba ulterior)
+SLOT_SECONDS = 15 * 60
+SLOTS_PER_DAY = 96
+SLOT_BYTES = 12
+
+
+def day_window(target_date):
+    start = timezone.make_aware(datetime.combine(target_date, time.min))
+    return start, start + timedelta(days=1)
+
+
+def slot_mask(start, end, target_date):
+    day_start, day_end = day_window(target_date)
+    start = max(start, day_start)
+    end = min(end, day_end)
+    if end <= start:
+        return 0
+    first = int((start - day_start).total_seconds() // SLOT_SECONDS)
+    last = min(math.ceil((end - day_start).total_seconds() / SLOT_SECONDS), SLOTS_PER_DAY)
+    return ((1 << (last - first)) - 1) << first
+
+
+def compute_masks(bookings):
+    masks = {}
+    for resource_id, start, end in bookings:
+        first = timezone.localtime(start).date()
+        last = timezone.localtime(end).date()
+        for offset in range((last - first).days + 1):
+            day = first + timedelta(days=offset)
+            masks[(resource_id, day)] = masks.get((resource_id, day), 0) | slot_mask(start, end, day)
+    return masks
+
+
+def mask_to_bytes(mask):
+    return mask.to_bytes(SLOT_BYTES, 'little')
+
+
+def populate_occupancy(apps, schema_editor):
+    """Populează bitmap-urile din programările și cererile aprobate existente."""
+    Appointment = apps.get_model('core', 'Appointment')
+    Request = apps.get_model('core', 'Request')
+    ItemOccupancy = apps.get_model('core', 'ItemOccupancy')
+    RoomOccupancy = apps.get_model('core', 'RoomOccupancy')
+
+    item_masks = compute_masks(
+        Appointment.objects.values_list('item_id', 'start_date', 'end_date').iterator()
+    )
+    ItemOccupancy.objects.bulk_create(
+        [
+            ItemOccupancy(item_id=item_id, date=day, slots=mask_to_bytes(mask))
+            for (item_id, day), mask in item_masks.items() if mask
+        ],
+        batch_size=1000,
+    )
+
+    room_masks = compute_masks(
+        Request.objects.filter(status='APPROVED').values_list('room_id', 'start_date', 'end_date').iterator()
+    )
+    RoomOccupancy.objects.bulk_create(
+        [
+            RoomOccupancy(room_id=room_id, date=day, slots=mask_to_bytes(mask))
+            for (room_id, day), mask in room_masks.items() if mask
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_booking_overlap_exclusion_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slots', models.BinaryField(help_text='96 de biți (little-endian), câte unul pe slot de 15 minute', max_length=12)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='core.item')),
+            ],
+            options={
+                'verbose_name': 'Item Occupancy',
+                'verbose_name_plural': 'Item Occupancy',
+                'db_table': 'core_item_occupancy',
+                'indexes': [models.Index(fields=['date'], name='core_item_o_date_d9fb15_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'date'), name='unique_item_occupancy_per_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slots', models.BinaryField(help_text='96 de biți (little-endian), câte unul pe slot de 15 minute', max_length=12)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='core.room')),
+            ],
+            options={
+                'verbose_name': 'Room Occupancy',
+                'verbose_name_plural': 'Room Occupancy',
+                'db_table': 'core_room_occupancy',
+                'indexes': [models.Index(fields=['date'], name='core_room_o_date_e90ace_idx')],
+                'constraints': [models.UniqueConstraint(fields=('room', 'date'), name='unique_room_occupancy_per_date')],
+            },
+        ),
+        migrations.RunPython(
+            code=populate_occupancy,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:14
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_resource_occupancy_bitmaps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekdays', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), help_text='Zilele din săptămână în care se repetă rezervarea. 0=Luni, 1=Marți, ..., 6=Duminică.', size=None)),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Se repetă la fiecare `interval` săptămâni (1 = în fiecare săptămână)')),
+                ('start_time', models.TimeField(help_text='Ora de început a fiecărei apariții')),
+                ('end_time', models.TimeField(help_text='Ora de sfârșit a fiecărei apariții')),
+                ('start_date', models.DateField(help_text='Prima zi a seriei')),
+                ('until', models.DateField(help_text='Ultima zi a seriei (inclusiv)')),
+                ('materialized_until', models.DateField(blank=True, help_text='Ultima zi pentru care aparițiile au fost create ca Appointment / Request', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='series', to='core.item')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='series', to='core.room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Booking Series',
+                'verbose_name_plural': 'Booking Series',
+                'db_table': 'core_booking_series',
+            },
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='series',
+            field=models.ForeignKey(blank=True, help_text='Seria recurentă din care a fost materializată programarea (dacă este cazul)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='appointments', to='core.bookingseries'),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='series',
+            field=models.ForeignKey(blank=True, help_text='Seria recurentă din care a fost materializată cererea (dacă este cazul)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='core.bookingseries'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingseries',
+            index=models.Index(fields=['until'], name='core_bookin_until_20f9a8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingseries',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('item__isnull', False), ('room__isnull', True)), models.Q(('item__isnull', True), ('room__isnull', False)), _connector='OR'), name='booking_series_single_resource'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingseries',
+            constraint=models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='booking_series_end_time_after_start_time'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingseries',
+            constraint=models.CheckConstraint(condition=models.Q(('until__gte', models.F('start_date'))), name='booking_series_until_after_start_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingseries',
+            constraint=models.CheckConstraint(condition=models.Q(('interval__gte', 1)), name='booking_series_interval_positive'),
+        ),
+    ]
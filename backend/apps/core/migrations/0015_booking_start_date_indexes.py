@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexurile sunt create CONCURRENTLY, fără să blocheze scrierile pe tabele mari.
+    # Pe appointment, `id` la final acoperă și paginarea keyset (AppointmentPagination)
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_booking_series'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['start_date', 'id'], name='core_appoin_start_d_0e5d15_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['user', 'start_date', 'id'], name='core_appoin_user_id_f13564_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(fields=['start_date'], name='core_reques_start_d_6b8163_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(fields=['user', 'start_date'], name='core_reques_user_id_5a6b94_idx'),
+        ),
+    ]
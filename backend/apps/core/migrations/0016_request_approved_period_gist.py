@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:16
+
+import apps.core.models
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_booking_start_date_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='request',
+            index=django.contrib.postgres.indexes.GistIndex(apps.core.models.TsTzRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary()), condition=models.Q(('status', 'APPROVED')), name='request_approved_period_gist'),
+        ),
+    ]
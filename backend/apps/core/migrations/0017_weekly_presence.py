@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:18
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+# Copie a apps.core.presence.compute_presence la momentul acestei migrări
+# (migrările nu importă codul aplicației, care se poate schimba ulterior)
+def compute_presence(rows):
+    masks = {}
+    for user_id, day in rows:
+        key = (user_id, day - timedelta(days=day.weekday()))
+        masks[key] = masks.get(key, 0) | (1 << day.weekday())
+    return masks
+
+
+def populate_presence(apps, schema_editor):
+    """Populează prezența săptămânală din programările existente."""
+    Appointment = apps.get_model('core', 'Appointment')
+    WeeklyPresence = apps.get_model('core', 'WeeklyPresence')
+
+    rows = Appointment.objects.annotate(
+        day=TruncDate('start_date')
+    ).values_list('user_id', 'day').distinct().iterator()
+    WeeklyPresence.objects.bulk_create(
+        [
+            WeeklyPresence(user_id=user_id, week_start=week, days=mask, day_count=bin(mask).count('1'))
+            for (user_id, week), mask in compute_presence(rows).items() if mask
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_request_approved_period_gist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyPresence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(help_text='Ziua de luni a săptămânii ISO')),
+                ('days', models.PositiveSmallIntegerField(default=0, help_text='Bitmask al zilelor cu prezență: bitul 0 = Luni, ..., bitul 6 = Duminică')),
+                ('day_count', models.PositiveSmallIntegerField(default=0, help_text='Numărul de zile cu prezență')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_presence', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Weekly Presence',
+                'verbose_name_plural': 'Weekly Presence',
+                'db_table': 'core_weekly_presence',
+                'indexes': [models.Index(fields=['week_start'], name='core_weekly_week_st_e9cb87_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'week_start'), name='unique_weekly_presence_per_user')],
+            },
+        ),
+        migrations.RunPython(populate_presence, migrations.RunPython.noop),
+    ]
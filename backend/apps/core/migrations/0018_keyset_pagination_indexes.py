@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:22
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexurile sunt create CONCURRENTLY. Programările nu au nevoie de indexuri noi:
+    # cele din 0015 (start_date, id) și (user, start_date, id) acoperă deja paginarea
+    atomic = False
+
+    dependencies = [
+        ('core', '0017_weekly_presence'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(fields=['created_at', 'id'], name='core_reques_created_992317_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='core_reques_user_id_e3961b_idx'),
+        ),
+    ]
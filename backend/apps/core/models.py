@@ -1,12 +1,65 @@
 """
 Django models for Office Smart Appointments Management System.
 """
+from datetime import datetime, timedelta
+
 from django.contrib.auth.models import AbstractUser
 from django.contrib.postgres.constraints import ExclusionConstraint
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GistIndex
+from django.contrib.postgres.fields import ArrayField, DateTimeRangeField, RangeBoundary, RangeOperators
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import CheckConstraint, Q, F
+from django.db.models import CheckConstraint, Func, Q, F
+from django.utils import timezone
+
+
+# Codul erorii de validare / numele constraint-urilor care semnalează o suprapunere de rezervări
+BOOKING_CONFLICT_CODE = 'booking_conflict'
+APPOINTMENT_OVERLAP_CONSTRAINT = 'exclude_appointment_overlap_per_item'
+REQUEST_OVERLAP_CONSTRAINT = 'exclude_approved_request_overlap_per_room'
+
+
+class TsTzRange(Func):
+    """tstzrange(start, end, '[)') - intervalul semi-deschis al unei rezervări."""
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
+class BookingQuerySet(models.QuerySet):
+    """QuerySet comun pentru rezervări (Appointment, Request)."""
+
+    def with_period(self):
+        """Adaugă alias-ul `period` = tstzrange(start_date, end_date, '[)')."""
+        return self.alias(period=TsTzRange('start_date', 'end_date', RangeBoundary()))
+
+    def overlaps(self, *windows):
+        """
+        Rezervările care se suprapun cu cel puțin una dintre ferestrele [start, end) date.
+
+        Filtrul este `tstzrange(start_date, end_date) && tstzrange(start, end)`, exact
+        expresia indexurilor GiST, deci poate fi servit printr-un index probe.
+        Fără ferestre, rezultatul este gol (nu toate rezervările).
+        """
+        if not windows:
+            return self.none()
+        condition = Q()
+        for start, end in windows:
+            condition |= Q(period__overlap=(start, end))
+        return self.with_period().filter(condition)
+
+
+def _check_series_conflict(kind: str, resource_id, start, end) -> None:
+    """
+    Respinge o rezervare care se suprapune cu o apariție nematerializată a unei serii
+    recurente (după orizontul de materializare aparițiile nu există încă ca rânduri).
+    """
+    from .recurrence import series_conflict
+
+    if resource_id and series_conflict(kind, resource_id, start, end):
+        raise ValidationError(
+            'Resursa este rezervată în acest interval de o serie recurentă.',
+            code=BOOKING_CONFLICT_CODE,
+        )
 
 
 class Role(models.Model):
@@ -239,6 +292,16 @@ class Request(models.Model):
         related_name='decided_requests',
     )
     note = models.TextField(blank=True, default='')
+    series = models.ForeignKey(
+        'BookingSeries',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='requests',
+        help_text='Seria recurentă din care a fost materializată cererea (dacă este cazul)',
+    )
+
+    objects = BookingQuerySet.as_manager()
 
     class Meta:
         db_table = 'core_request'
@@ -246,12 +309,34 @@ class Request(models.Model):
         verbose_name_plural = 'Requests'
         indexes = [
             models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['start_date']),
+            models.Index(fields=['user', 'start_date']),
+            # Paginarea keyset a listei de cereri (RequestPagination)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
+            # Căutarea cererilor aprobate care se suprapun cu un interval (BookingQuerySet.overlaps)
+            GistIndex(
+                TsTzRange('start_date', 'end_date', RangeBoundary()),
+                name='request_approved_period_gist',
+                condition=Q(status='APPROVED'),
+            ),
         ]
         constraints = [
             CheckConstraint(
                 check=Q(end_date__gt=F('start_date')),
                 name='request_end_date_after_start_date',
             ),
+            # O cameră nu poate avea două cereri APPROVED care se suprapun
+            ExclusionConstraint(
+                name=REQUEST_OVERLAP_CONSTRAINT,
+                expressions=[
+                    (TsTzRange('start_date', 'end_date', RangeBoundary()), RangeOperators.OVERLAPS),
+                    ('room', RangeOperators.EQUAL),
+                ],
+                condition=Q(status='APPROVED'),
+                violation_error_code=BOOKING_CONFLICT_CODE,
+                violation_error_message='Camera este deja rezervată (cerere aprobată) în acest interval.',
+            ),
         ]
 
     def clean(self) -> None:
@@ -272,6 +357,10 @@ class Request(models.Model):
                 raise ValidationError(
                     {'decided_by': 'Only SUPERADMIN (is_superuser=True) can approve/dismiss requests.'}
                 )
+        
+        # Aparițiile nematerializate ale seriilor nu sunt acoperite de ExclusionConstraint
+        if self.status == self.APPROVED and self.series_id is None:
+            _check_series_conflict('room', self.room_id, self.start_date, self.end_date)
 
     def save(self, *args, **kwargs) -> None:
         """Save with validation."""
@@ -297,6 +386,16 @@ class Appointment(models.Model):
     start_date = models.DateTimeField(help_text="Data și ora de început")
     end_date = models.DateTimeField(help_text="Data și ora de sfârșit")
     created_at = models.DateTimeField(auto_now_add=True)
+    series = models.ForeignKey(
+        'BookingSeries',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='appointments',
+        help_text='Seria recurentă din care a fost materializată programarea (dacă este cazul)',
+    )
+
+    objects = BookingQuerySet.as_manager()
 
     class Meta:
         db_table = 'core_appointment'
@@ -304,12 +403,25 @@ class Appointment(models.Model):
         verbose_name_plural = 'Appointments'
         indexes = [
             models.Index(fields=['item', 'start_date']),
+            # Acoperă și paginarea keyset a listei de programări (AppointmentPagination)
+            models.Index(fields=['start_date', 'id']),
+            models.Index(fields=['user', 'start_date', 'id']),
         ]
         constraints = [
             CheckConstraint(
                 check=Q(end_date__gt=F('start_date')),
                 name='appointment_end_date_after_start_date',
             ),
+            # Un item nu poate avea două programări care se suprapun
+            ExclusionConstraint(
+                name=APPOINTMENT_OVERLAP_CONSTRAINT,
+                expressions=[
+                    (TsTzRange('start_date', 'end_date', RangeBoundary()), RangeOperators.OVERLAPS),
+                    ('item', RangeOperators.EQUAL),
+                ],
+                violation_error_code=BOOKING_CONFLICT_CODE,
+                violation_error_message='Item-ul este deja rezervat în acest interval.',
+            ),
         ]
 
     def clean(self) -> None:
@@ -318,6 +430,10 @@ class Appointment(models.Model):
             raise ValidationError(
                 {'end_date': 'end_date must be after start_date.'}
             )
+        
+        # Aparițiile nematerializate ale seriilor nu sunt acoperite de ExclusionConstraint
+        if self.series_id is None:
+            _check_series_conflict('item', self.item_id, self.start_date, self.end_date)
 
     def save(self, *args, **kwargs) -> None:
         """Save appointment."""
@@ -328,6 +444,243 @@ class Appointment(models.Model):
         return f"Appointment {self.id} - {self.item.name} ({self.start_date} to {self.end_date})"
 
 
+
+class BookingSeries(models.Model):
+    """
+    Rezervare recurentă săptămânală pe un Item sau pe o Room
+    (echivalentul RRULE FREQ=WEEKLY;INTERVAL=interval;BYDAY=weekdays;UNTIL=until).
+
+    Aparițiile nu sunt create toate odată: sunt materializate ca Appointment / Request
+    doar pentru un orizont scurt (vezi recurrence.py), iar după `materialized_until`
+    sunt calculate la citire în interogările de disponibilitate și by-date.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='booking_series',
+    )
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='series',
+    )
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='series',
+    )
+    weekdays = ArrayField(
+        models.IntegerField(),
+        help_text='Zilele din săptămână în care se repetă rezervarea. 0=Luni, 1=Marți, ..., 6=Duminică.'
+    )
+    interval = models.PositiveSmallIntegerField(
+        default=1,
+        help_text='Se repetă la fiecare `interval` săptămâni (1 = în fiecare săptămână)'
+    )
+    start_time = models.TimeField(help_text="Ora de început a fiecărei apariții")
+    end_time = models.TimeField(help_text="Ora de sfârșit a fiecărei apariții")
+    start_date = models.DateField(help_text="Prima zi a seriei")
+    until = models.DateField(help_text="Ultima zi a seriei (inclusiv)")
+    materialized_until = models.DateField(
+        null=True,
+        blank=True,
+        help_text='Ultima zi pentru care aparițiile au fost create ca Appointment / Request'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'core_booking_series'
+        verbose_name = 'Booking Series'
+        verbose_name_plural = 'Booking Series'
+        indexes = [
+            models.Index(fields=['until']),
+        ]
+        constraints = [
+            CheckConstraint(
+                check=(
+                    Q(item__isnull=False, room__isnull=True)
+                    | Q(item__isnull=True, room__isnull=False)
+                ),
+                name='booking_series_single_resource',
+            ),
+            CheckConstraint(
+                check=Q(end_time__gt=F('start_time')),
+                name='booking_series_end_time_after_start_time',
+            ),
+            CheckConstraint(
+                check=Q(until__gte=F('start_date')),
+                name='booking_series_until_after_start_date',
+            ),
+            CheckConstraint(
+                check=Q(interval__gte=1),
+                name='booking_series_interval_positive',
+            ),
+        ]
+
+    def clean(self) -> None:
+        """Validate recurrence data."""
+        if not self.weekdays or any(day not in range(7) for day in self.weekdays):
+            raise ValidationError(
+                {'weekdays': 'weekdays must be a non-empty list of values between 0 and 6.'}
+            )
+
+    def save(self, *args, **kwargs) -> None:
+        """Save with validation."""
+        self.full_clean()
+        super().save(*args, **kwargs)
+
+    @property
+    def resource_kind(self) -> str:
+        """'item' sau 'room', după resursa seriei."""
+        return 'item' if self.item_id else 'room'
+
+    @property
+    def resource_id(self):
+        return self.item_id or self.room_id
+
+    def occurrence_dates(self, from_date, to_date) -> list:
+        """Zilele din [from_date, to_date] în care seria are o apariție."""
+        first = max(from_date, self.start_date)
+        last = min(to_date, self.until)
+        week_zero = self.start_date - timedelta(days=self.start_date.weekday())
+        weekdays = set(self.weekdays)
+        return [
+            first + timedelta(days=i)
+            for i in range((last - first).days + 1)
+            if (first + timedelta(days=i)).weekday() in weekdays
+            and ((first + timedelta(days=i) - week_zero).days // 7) % self.interval == 0
+        ]
+
+    def occurrence_window(self, day):
+        """Intervalul [start, end) al apariției din ziua dată, în timezone-ul curent."""
+        return (
+            timezone.make_aware(datetime.combine(day, self.start_time)),
+            timezone.make_aware(datetime.combine(day, self.end_time)),
+        )
+
+    def build_occurrence(self, day):
+        """
+        Construiește (fără să salveze) apariția din ziua dată: un Appointment pentru item
+        sau un Request aprobat pentru room. Resursa seriei (deja încărcată) este atașată
+        aparițiilor, astfel încât serializarea lor nu mai face câte un query per rând.
+        """
+        start, end = self.occurrence_window(day)
+        if self.item_id:
+            return Appointment(user=self.user, item=self.item, start_date=start, end_date=end, series=self)
+        return Request(
+            user=self.user,
+            room=self.room,
+            status=Request.APPROVED,
+            start_date=start,
+            end_date=end,
+            decided_by=self.user,
+            note=f'Serie recurentă #{self.pk}',
+            series=self,
+        )
+
+    def __str__(self) -> str:
+        resource = self.item if self.item_id else self.room
+        return f"Series {self.id} - {resource} ({self.start_date} to {self.until})"
+
+
+class OccupancyBitmap(models.Model):
+    """
+    Bitset de ocupare pentru o resursă într-o zi: bitul i = slotul de 15 minute i
+    (00:00-00:15 = bitul 0, ..., 23:45-24:00 = bitul 95) are cel puțin o rezervare.
+    
+    Rândurile există doar pentru zilele cu cel puțin un slot ocupat.
+    Sunt întreținute incremental din signals (vezi occupancy.py).
+    """
+    date = models.DateField()
+    slots = models.BinaryField(max_length=12, help_text='96 de biți (little-endian), câte unul pe slot de 15 minute')
+
+    class Meta:
+        abstract = True
+
+
+class ItemOccupancy(OccupancyBitmap):
+    """Ocuparea unui item într-o zi (din Appointments)."""
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name='occupancy',
+    )
+
+    class Meta:
+        db_table = 'core_item_occupancy'
+        verbose_name = 'Item Occupancy'
+        verbose_name_plural = 'Item Occupancy'
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'date'], name='unique_item_occupancy_per_date'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.item_id} @ {self.date}"
+
+
+class RoomOccupancy(OccupancyBitmap):
+    """Ocuparea unei camere într-o zi (din Requests aprobate)."""
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name='occupancy',
+    )
+
+    class Meta:
+        db_table = 'core_room_occupancy'
+        verbose_name = 'Room Occupancy'
+        verbose_name_plural = 'Room Occupancy'
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'date'], name='unique_room_occupancy_per_date'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.room_id} @ {self.date}"
+
+
+class WeeklyPresence(models.Model):
+    """
+    Prezența unui user într-o săptămână ISO: zilele în care are cel puțin o programare.
+    
+    Rândurile există doar pentru săptămânile cu cel puțin o zi de prezență.
+    Sunt întreținute incremental din signals (vezi presence.py).
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='weekly_presence',
+    )
+    week_start = models.DateField(help_text='Ziua de luni a săptămânii ISO')
+    days = models.PositiveSmallIntegerField(
+        default=0,
+        help_text='Bitmask al zilelor cu prezență: bitul 0 = Luni, ..., bitul 6 = Duminică'
+    )
+    day_count = models.PositiveSmallIntegerField(default=0, help_text='Numărul de zile cu prezență')
+
+    class Meta:
+        db_table = 'core_weekly_presence'
+        verbose_name = 'Weekly Presence'
+        verbose_name_plural = 'Weekly Presence'
+        indexes = [
+            models.Index(fields=['week_start']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'week_start'], name='unique_weekly_presence_per_user'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} @ {self.week_start} ({self.day_count} zile)"
+
 # ============================================================================
 # Configuration Notes
 # ============================================================================
@@ -0,0 +1,254 @@
+"""
+Bitmap-uri de ocupare per resursă per zi (sloturi de 15 minute).
+
+Fiecare zi are 96 de sloturi; o resursă ocupată într-un slot are bitul
+corespunzător setat. Bitmap-urile sunt ținute ca int-uri Python în memorie și
+ca bytea de 12 bytes în ItemOccupancy / RoomOccupancy, astfel încât întrebările
+free/busy devin operații AND/OR pe biți în loc de comparații de timestamp-uri.
+
+Un bitmap este recalculat din rezervările resursei în ziua respectivă ori de câte
+ori o rezervare care o atinge este salvată sau ștearsă (vezi signals.py), sub un lock
+advisory pe (resursă, zi), astfel încât două rezervări concurente nu se suprascriu.
+"""
+import math
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from .availability import date_range, dates_touched, day_window
+from .locks import advisory_xact_lock
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOT_BYTES = SLOTS_PER_DAY // 8
+_SLOT_SECONDS = SLOT_MINUTES * 60
+
+
+def slot_mask(start, end, target_date) -> int:
+    """
+    Bitmask-ul sloturilor din `target_date` atinse de intervalul [start, end).
+    Un slot atins parțial este considerat ocupat.
+    """
+    day_start, day_end = day_window(target_date)
+    start = max(start, day_start)
+    end = min(end, day_end)
+    if end <= start:
+        return 0
+    first = int((start - day_start).total_seconds() // _SLOT_SECONDS)
+    last = min(math.ceil((end - day_start).total_seconds() / _SLOT_SECONDS), SLOTS_PER_DAY)
+    return ((1 << (last - first)) - 1) << first
+
+
+def is_slot_aligned(start, end, target_date) -> bool:
+    """
+    True dacă [start, end) este în `target_date` și începe/se termină la granița unui slot.
+    Pentru astfel de ferestre, testul pe bitmap este exact.
+    """
+    day_start, day_end = day_window(target_date)
+    if start < day_start or end > day_end:
+        return False
+    return all((t - day_start).total_seconds() % _SLOT_SECONDS == 0 for t in (start, end))
+
+
+def mask_to_bytes(mask: int) -> bytes:
+    return mask.to_bytes(SLOT_BYTES, 'little')
+
+
+def bytes_to_mask(data) -> int:
+    # psycopg2 întoarce memoryview pentru bytea
+    return int.from_bytes(bytes(data), 'little') if data else 0
+
+
+def busy_ranges(mask: int, target_date) -> list:
+    """Transformă un bitmask în intervale ocupate contigue [(start, end), ...]."""
+    day_start, _ = day_window(target_date)
+    ranges = []
+    slot = 0
+    while mask >> slot:
+        if (mask >> slot) & 1:
+            run_start = slot
+            while (mask >> slot) & 1:
+                slot += 1
+            ranges.append((
+                day_start + timedelta(minutes=run_start * SLOT_MINUTES),
+                day_start + timedelta(minutes=slot * SLOT_MINUTES),
+            ))
+        else:
+            slot += 1
+    return ranges
+
+
+def _kind_config(kind: str):
+    """Returnează (model bitmap, queryset rezervări, câmp resursă) pentru 'item' / 'room'."""
+    from .models import Appointment, ItemOccupancy, Request, RoomOccupancy
+
+    if kind == 'item':
+        return ItemOccupancy, Appointment.objects.all(), 'item_id'
+    if kind == 'room':
+        return RoomOccupancy, Request.objects.filter(status=Request.APPROVED), 'room_id'
+    raise ValueError(f'Tip de resursă necunoscut: {kind}')
+
+
+def compute_masks(bookings, pairs=None) -> dict:
+    """
+    Calculează bitmap-urile din tuple (resource_id, start_date, end_date).
+    Dacă `pairs` este dat, doar perechile (resource_id, date) din el sunt calculate.
+    """
+    masks = dict.fromkeys(pairs, 0) if pairs is not None else {}
+    for resource_id, start, end in bookings:
+        for day in dates_touched(start, end):
+            key = (resource_id, day)
+            if pairs is not None and key not in masks:
+                continue
+            masks[key] = masks.get(key, 0) | slot_mask(start, end, day)
+    return masks
+
+
+def _write_masks(model, field: str, masks: dict) -> None:
+    """Salvează bitmap-urile nenule (upsert) și șterge rândurile pentru cele goale."""
+    fk = field[:-len('_id')]
+    empty = [key for key, mask in masks.items() if not mask]
+    if empty:
+        condition = Q()
+        for resource_id, day in empty:
+            condition |= Q(**{field: resource_id, 'date': day})
+        model.objects.filter(condition).delete()
+
+    rows = [
+        model(**{field: resource_id, 'date': day, 'slots': mask_to_bytes(mask)})
+        for (resource_id, day), mask in masks.items() if mask
+    ]
+    if rows:
+        model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=[fk, 'date'],
+            update_fields=['slots'],
+        )
+
+
+@transaction.atomic
+def refresh_occupancy(kind: str, pairs) -> None:
+    """
+    Recalculează bitmap-urile pentru perechile (resource_id, date) date.
+
+    Citește într-un singur query rezervările resurselor implicate care ating zilele
+    respective, apoi face upsert/delete pe bitmap-uri. Perechile sunt blocate înainte
+    de citire: o tranzacție concurentă pe aceeași resursă și zi așteaptă commit-ul
+    acesteia și recalculează apoi bitmap-ul incluzând și rezervarea de aici.
+    """
+    pairs = {(resource_id, day) for resource_id, day in pairs if resource_id}
+    if not pairs:
+        return
+    advisory_xact_lock(f'occupancy:{kind}:{resource_id}:{day.isoformat()}' for resource_id, day in pairs)
+    model, bookings, field = _kind_config(kind)
+    days = [day for _, day in pairs]
+    range_start, _ = day_window(min(days))
+    _, range_end = day_window(max(days))
+
+    rows = bookings.filter(
+        **{f'{field}__in': {resource_id for resource_id, _ in pairs}},
+    ).overlaps((range_start, range_end)).values_list(field, 'start_date', 'end_date')
+
+    _write_masks(model, field, compute_masks(rows, pairs))
+
+
+@transaction.atomic
+def rebuild_occupancy(kind: str, from_date, to_date) -> int:
+    """
+    Reconstruiește complet bitmap-urile pentru intervalul [from_date, to_date].
+
+    Returns:
+        int: numărul de bitmap-uri nenule scrise
+    """
+    model, bookings, field = _kind_config(kind)
+    range_start, _ = day_window(from_date)
+    _, range_end = day_window(to_date)
+
+    model.objects.filter(date__gte=from_date, date__lte=to_date).delete()
+
+    rows = bookings.overlaps((range_start, range_end)).values_list(field, 'start_date', 'end_date').iterator()
+
+    days = set(date_range(from_date, to_date))
+    masks = {
+        key: mask for key, mask in compute_masks(rows).items()
+        if key[1] in days and mask
+    }
+    _write_masks(model, field, masks)
+    return len(masks)
+
+
+def occupancy_masks(kind: str, resource_ids, days) -> dict:
+    """
+    Citește bitmap-urile pentru resursele și zilele date.
+
+    Args:
+        resource_ids: ID-urile resurselor sau None pentru toate resursele
+
+    Returns:
+        dict: (resource_id, date) -> bitmask (lipsă = resursa e liberă toată ziua)
+    """
+    model, _, field = _kind_config(kind)
+    days = list(days)
+    queryset = model.objects.filter(date__gte=min(days), date__lte=max(days))
+    if resource_ids is not None:
+        queryset = queryset.filter(**{f'{field}__in': list(resource_ids)})
+    return {
+        (resource_id, day): bytes_to_mask(slots)
+        for resource_id, day, slots in queryset.values_list(field, 'date', 'slots')
+    }
+
+
+def day_matrix(kind: str, days: list) -> dict:
+    """
+    Matricea resursă × zi de ocupare (0/1) citită din bitmap-uri: o zi este ocupată
+    dacă resursa are cel puțin un slot ocupat.
+
+    Returns:
+        dict: resource_id -> listă de 0/1, câte o valoare pentru fiecare zi din `days`
+    """
+    day_index = {day: i for i, day in enumerate(days)}
+    matrix = {}
+    for (resource_id, day), mask in occupancy_masks(kind, None, days).items():
+        if mask:
+            row = matrix.setdefault(resource_id, [0] * len(days))
+            row[day_index[day]] = 1
+    return matrix
+
+
+def hourly_popularity(kind: str, resource_id, from_date, to_date) -> dict:
+    """
+    Popularitatea (0-100) pe zi a săptămânii și oră, din bitmap-uri.
+
+    Pentru fiecare (weekday, hour), popularitatea este procentul zilelor de acel tip
+    din interval în care resursa a fost ocupată cel puțin un slot în ora respectivă.
+
+    Returns:
+        dict: weekday (0=Luni) -> {hour: popularity}
+    """
+    days = date_range(from_date, to_date)
+    masks = occupancy_masks(kind, [resource_id], days)
+    slots_per_hour = 60 // SLOT_MINUTES
+    hour_bits = (1 << slots_per_hour) - 1
+
+    day_counts = {}
+    busy_counts = {}
+    for day in days:
+        weekday = day.weekday()
+        day_counts[weekday] = day_counts.get(weekday, 0) + 1
+        mask = masks.get((resource_id, day), 0)
+        if not mask:
+            continue
+        hours = busy_counts.setdefault(weekday, {})
+        for hour in range(24):
+            if (mask >> (hour * slots_per_hour)) & hour_bits:
+                hours[hour] = hours.get(hour, 0) + 1
+
+    return {
+        weekday: {
+            hour: round(100 * count / day_counts[weekday])
+            for hour, count in hours.items()
+        }
+        for weekday, hours in busy_counts.items()
+    }
@@ -0,0 +1,188 @@
+"""
+Paginare keyset (cursor) pentru listele mari: requests, appointments, users.
+
+Pagina următoare este selectată cu o condiție pe cheia de ordonare a ultimului rând
+(ex: `(created_at, id) < (ultimul created_at, ultimul id)`), nu cu OFFSET, așa că
+fiecare pagină este un range scan pe indexul compus corespunzător, indiferent de
+cât de mare e tabelul sau cât de departe în listă se află clientul.
+
+Compatibilitate: cât timp API_PAGINATE_BY_DEFAULT este False, listele sunt paginate
+doar când clientul trimite `cursor` sau `page_size`; altfel răspunsul rămâne lista
+completă, ca înainte.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginare forward-only după `ordering`. Toate câmpurile din `ordering` trebuie să
+    aibă aceeași direcție, iar ultimul să fie unic (de regulă `id`).
+    """
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor invalid'
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+        self.request = None
+        self.next_position = None
+
+    @property
+    def ordering_fields(self) -> list:
+        return [name.lstrip('-') for name in self.ordering]
+
+    def _is_enabled(self, request) -> bool:
+        return settings.API_PAGINATE_BY_DEFAULT or any(
+            param in request.query_params
+            for param in (self.cursor_query_param, self.page_size_query_param)
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, position) -> str:
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        """Poziția (valorile cheii de ordonare ale ultimului rând) din parametrul `cursor`."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.ordering_fields):
+                raise ValueError(encoded)
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering_fields, values)
+            ]
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after(self, position) -> Q:
+        """Condiția "strict după poziție" în ordinea `ordering` (comparație lexicografică)."""
+        condition = Q()
+        for index, (name, value) in enumerate(zip(self.ordering_fields, position)):
+            lookup = 'lt' if self.ordering[index].startswith('-') else 'gt'
+            equal = dict(zip(self.ordering_fields[:index], position[:index]))
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self._is_enabled(request):
+            return None
+        return self.page(queryset, request, self.get_page_size(request))
+
+    def page(self, queryset, request, page_size) -> list:
+        """Pagina de după cursorul din request (mereu paginat, fără comutatorul de compatibilitate)."""
+        self.request = request
+        self.page_size = page_size
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        # Un rând în plus spune dacă există o pagină următoare, fără COUNT
+        rows = list(queryset[:self.page_size + 1])
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            last = rows[-1]
+            # Rândurile pot fi instanțe sau dict-uri din .values() (vezi ValuesProjection)
+            self.next_position = [
+                last[name] if isinstance(last, dict) else getattr(last, name)
+                for name in self.ordering_fields
+            ]
+        else:
+            self.next_position = None
+        return rows
+
+    def next_cursor(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_next_link(self):
+        cursor = self.next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursorul paginii următoare (din câmpul `next` al răspunsului)',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Numărul de rezultate pe pagină (maxim {settings.API_MAX_PAGE_SIZE})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class RequestPagination(KeysetPagination):
+    """Cererile, cele mai noi primele."""
+    ordering = ('-created_at', '-id')
+
+
+class AppointmentPagination(KeysetPagination):
+    """Programările, cele mai târzii primele."""
+    ordering = ('-start_date', '-id')
+
+
+class UserPagination(KeysetPagination):
+    """Utilizatorii, alfabetic după username (unic)."""
+    ordering = ('username',)
+
+
+class PastBookingsPagination(KeysetPagination):
+    """Secțiunile "past" din profilul unui user, cele mai recente primele (cursor separat per secțiune)."""
+    ordering = ('-start_date', '-id')
+
+    def __init__(self, cursor_query_param):
+        super().__init__()
+        self.cursor_query_param = cursor_query_param
@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
 
+from . import refdata
 from .models import OrgPolicy, Team
 from .permissions import IsSuperAdmin
 
@@ -105,6 +106,8 @@ class OrgPolicyViewSet(viewsets.ViewSet):
                 required_days_per_week__isnull=False,
                 required_days_per_week__lt=new_days
             ).update(required_days_per_week=new_days)
+            # update() nu emite signals
+            transaction.on_commit(refdata.teams.invalidate)
             
             return Response({
                 'message': f'Policy actualizat de la {old_days} la {new_days} zile/săptămână',
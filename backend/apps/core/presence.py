@@ -0,0 +1,137 @@
+"""
+Prezența săptămânală per user (WeeklyPresence).
+
+Pentru fiecare user și săptămână ISO (identificată prin ziua de luni) se ține un
+bitmask al zilelor în care userul are cel puțin o programare care începe în ziua
+respectivă (bitul 0 = Luni, ..., bitul 6 = Duminică) și numărul acestor zile.
+
+Rândurile sunt recalculate din signals la fiecare save/delete de Appointment, astfel
+încât verificările de politică de prezență (ex: desk_overquota) sunt o citire a unui
+singur rând, indiferent de cât istoric de rezervări există.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .availability import starts_between
+from .locks import advisory_xact_lock
+
+WORKWEEK_MASK = 0b0011111  # Luni-Vineri
+
+
+def week_start(day):
+    """Ziua de luni a săptămânii ISO din care face parte `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def day_bit(day) -> int:
+    return 1 << day.weekday()
+
+
+def workweek_days(mask: int) -> int:
+    """Numărul de zile Luni-Vineri din bitmask."""
+    return bin(mask & WORKWEEK_MASK).count('1')
+
+
+def compute_presence(rows, pairs=None) -> dict:
+    """
+    Calculează bitmask-urile de prezență din perechi (user_id, zi).
+    Dacă `pairs` este dat, doar perechile (user_id, week_start) din el sunt calculate.
+
+    Returns:
+        dict: (user_id, week_start) -> bitmask
+    """
+    masks = dict.fromkeys(pairs, 0) if pairs is not None else {}
+    for user_id, day in rows:
+        key = (user_id, week_start(day))
+        if pairs is not None and key not in masks:
+            continue
+        masks[key] = masks.get(key, 0) | day_bit(day)
+    return masks
+
+
+def _write_presence(masks: dict) -> None:
+    """Salvează bitmask-urile nenule (upsert) și șterge rândurile pentru cele goale."""
+    from .models import WeeklyPresence
+
+    empty = [key for key, mask in masks.items() if not mask]
+    if empty:
+        condition = Q()
+        for user_id, week in empty:
+            condition |= Q(user_id=user_id, week_start=week)
+        WeeklyPresence.objects.filter(condition).delete()
+
+    rows = [
+        WeeklyPresence(user_id=user_id, week_start=week, days=mask, day_count=bin(mask).count('1'))
+        for (user_id, week), mask in masks.items() if mask
+    ]
+    if rows:
+        WeeklyPresence.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'week_start'],
+            update_fields=['days', 'day_count'],
+        )
+
+
+def _presence_rows(queryset):
+    """Perechi distincte (user_id, zi locală de început) din programări."""
+    return queryset.annotate(
+        day=TruncDate('start_date')
+    ).values_list('user_id', 'day').distinct()
+
+
+@transaction.atomic
+def refresh_presence(pairs) -> None:
+    """
+    Recalculează prezența pentru perechile (user_id, week_start) date,
+    cu un singur query peste programările userilor implicați în săptămânile respective.
+
+    Perechile sunt blocate (advisory lock) înainte de citire, ca două tranzacții care
+    modifică programări ale aceluiași user în aceeași săptămână să nu se suprascrie.
+    """
+    from .models import Appointment
+
+    pairs = {(user_id, week) for user_id, week in pairs if user_id}
+    if not pairs:
+        return
+    advisory_xact_lock(f'presence:{user_id}:{week.isoformat()}' for user_id, week in pairs)
+    weeks = [week for _, week in pairs]
+    rows = _presence_rows(
+        Appointment.objects.filter(
+            starts_between(min(weeks), max(weeks) + timedelta(days=6)),
+            user_id__in={user_id for user_id, _ in pairs},
+        )
+    )
+    _write_presence(compute_presence(rows, pairs))
+
+
+def presence_pairs(bookings) -> set:
+    """Perechile (user_id, week_start) atinse de programări (user_id, start_date)."""
+    return {
+        (user_id, week_start(timezone.localtime(start_date).date()))
+        for user_id, start_date in bookings
+    }
+
+
+@transaction.atomic
+def rebuild_presence(from_date, to_date) -> int:
+    """
+    Reconstruiește complet prezența pentru săptămânile care ating [from_date, to_date].
+
+    Returns:
+        int: numărul de rânduri (user, săptămână) scrise
+    """
+    from .models import Appointment, WeeklyPresence
+
+    first_week = week_start(from_date)
+    last_day = week_start(to_date) + timedelta(days=6)
+
+    WeeklyPresence.objects.filter(week_start__gte=first_week, week_start__lte=last_day).delete()
+    rows = _presence_rows(Appointment.objects.filter(starts_between(first_week, last_day))).iterator()
+    masks = {key: mask for key, mask in compute_presence(rows).items() if mask}
+    _write_presence(masks)
+    return len(masks)
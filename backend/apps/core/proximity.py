@@ -0,0 +1,107 @@
+"""
+Date precalculate pentru ordonarea items după apropierea de coechipieri.
+
+Apropierea dintre items vine din `Item.meta['neighbors']`: lista items vecine
+(ID-uri sau nume), de ex. birourile din aceeași insulă. Vecinătatea este
+simetrică; distanța dintre două items este numărul minim de pași prin graful
+de vecinătate.
+
+Atât componența echipelor, cât și distanțele dintre items sunt ținute în cache
+și invalidate din signals la modificarea unui User / Item. Invalidarea ajunge la
+celelalte procese doar printr-un cache partajat (vezi caching.py); fără el, datele
+sunt calculate la fiecare cerere. CACHE_TIMEOUT limitează oricum cât pot rămâne vechi.
+"""
+from collections import deque
+
+from django.core.cache import cache
+
+from .caching import is_shared_cache
+
+TEAM_ROSTER_KEY = 'proximity:team:{}'
+ITEM_DISTANCES_KEY = 'proximity:item_distances'
+CACHE_TIMEOUT = 60 * 60
+
+
+def team_member_ids(team_id) -> frozenset:
+    """ID-urile membrilor unei echipe (din cache)."""
+    from .models import User
+
+    if team_id is None:
+        return frozenset()
+    if not is_shared_cache():
+        return frozenset(User.objects.filter(team_id=team_id).values_list('id', flat=True))
+    key = TEAM_ROSTER_KEY.format(team_id)
+    members = cache.get(key)
+    if members is None:
+        members = frozenset(User.objects.filter(team_id=team_id).values_list('id', flat=True))
+        cache.set(key, members, timeout=CACHE_TIMEOUT)
+    return members
+
+
+def invalidate_team_rosters(team_ids) -> None:
+    keys = [TEAM_ROSTER_KEY.format(team_id) for team_id in set(team_ids) if team_id is not None]
+    if keys:
+        cache.delete_many(keys)
+
+
+def build_item_distances() -> dict:
+    """
+    Calculează distanțele (în pași) între toate items conectate prin `meta['neighbors']`.
+
+    Returns:
+        dict: item_id -> {item_id vecin (direct sau indirect): distanță}
+    """
+    from .models import Item
+
+    items = list(Item.objects.values_list('id', 'name', 'meta'))
+    ids_by_name = {name: item_id for item_id, name, _ in items}
+    known_ids = {item_id for item_id, _, _ in items}
+
+    graph = {item_id: set() for item_id in known_ids}
+    for item_id, _, meta in items:
+        neighbors = meta.get('neighbors', []) if isinstance(meta, dict) else []
+        for neighbor in neighbors:
+            neighbor_id = neighbor if neighbor in known_ids else ids_by_name.get(neighbor)
+            if neighbor_id is not None and neighbor_id != item_id:
+                graph[item_id].add(neighbor_id)
+                graph[neighbor_id].add(item_id)
+
+    # BFS din fiecare item; se păstrează doar items care au cel puțin un vecin
+    distances = {}
+    for source, edges in graph.items():
+        if not edges:
+            continue
+        reached = {source: 0}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for neighbor in graph[current]:
+                if neighbor not in reached:
+                    reached[neighbor] = reached[current] + 1
+                    queue.append(neighbor)
+        distances[source] = reached
+    return distances
+
+
+def item_distances() -> dict:
+    """Distanțele dintre items (din cache)."""
+    if not is_shared_cache():
+        return build_item_distances()
+    distances = cache.get(ITEM_DISTANCES_KEY)
+    if distances is None:
+        distances = build_item_distances()
+        cache.set(ITEM_DISTANCES_KEY, distances, timeout=CACHE_TIMEOUT)
+    return distances
+
+
+def invalidate_item_distances() -> None:
+    cache.delete(ITEM_DISTANCES_KEY)
+
+
+def distance_to_nearest(item_id, target_ids, distances):
+    """Distanța de la item la cel mai apropiat item din `target_ids` (None dacă nu există drum)."""
+    reached = distances.get(item_id)
+    if not reached:
+        return None
+    found = [reached[target] for target in target_ids if target in reached]
+    return min(found) if found else None
@@ -0,0 +1,210 @@
+"""
+Expandarea și materializarea seriilor de rezervări recurente (BookingSeries).
+
+O serie are aparițiile create ca Appointment / Request doar până la
+`materialized_until` (un orizont scurt, vezi BOOKING_SERIES_HORIZON_DAYS). Aparițiile
+de după orizont sunt "virtuale": sunt calculate la citire și adăugate în snapshot-urile
+de disponibilitate, în matricea de ocupare și în căutarea de sloturi. Un task periodic
+avansează orizontul, astfel încât numărul de rânduri scrise rămâne mic.
+
+Rezervările individuale care s-ar suprapune cu o apariție virtuală sunt respinse la
+validare (series_conflict), la fel ca suprapunerile cu aparițiile materializate.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .availability import BookingRow, IntervalIndex, booking_rows
+
+logger = logging.getLogger(__name__)
+
+
+def horizon_end(today=None):
+    """Ultima zi pentru care aparițiile sunt materializate."""
+    today = today or timezone.localdate()
+    return today + timedelta(days=settings.BOOKING_SERIES_HORIZON_DAYS)
+
+
+def _series_for(kind: str, from_date, to_date, resource_ids=None):
+    """Seriile active în [from_date, to_date] care mai au apariții nematerializate în interval."""
+    from .models import BookingSeries
+
+    queryset = BookingSeries.objects.filter(
+        start_date__lte=to_date,
+        until__gte=from_date,
+    ).filter(
+        Q(materialized_until__isnull=True) | Q(materialized_until__lt=to_date)
+    ).select_related('user')
+    field = 'item_id' if kind == 'item' else 'room_id'
+    if resource_ids is not None:
+        return queryset.filter(**{f'{field}__in': resource_ids})
+    return queryset.filter(**{f'{field}__isnull': False})
+
+
+def _virtual_dates(series, from_date, to_date) -> list:
+    """Zilele aparițiilor nematerializate ale seriei din [from_date, to_date]."""
+    if series.materialized_until is not None:
+        from_date = max(from_date, series.materialized_until + timedelta(days=1))
+    if from_date > to_date:
+        return []
+    return series.occurrence_dates(from_date, to_date)
+
+
+def virtual_booking_rows(kind: str, from_date, to_date, resource_ids=None) -> list:
+    """
+    Aparițiile nematerializate din [from_date, to_date] ca BookingRow (id=None),
+    pentru a fi combinate cu rezervările reale în IntervalIndex.
+    Opțional, doar pentru resursele din `resource_ids`.
+    """
+    rows = []
+    for series in _series_for(kind, from_date, to_date, resource_ids):
+        user = series.user
+        user_display = f"{user.first_name} {user.last_name}".strip() or user.username
+        for day in _virtual_dates(series, from_date, to_date):
+            start, end = series.occurrence_window(day)
+            rows.append(BookingRow(
+                id=None,
+                resource_id=series.resource_id,
+                user_id=series.user_id,
+                user_display=user_display,
+                start_date=start,
+                end_date=end,
+            ))
+    return rows
+
+
+def series_conflict(kind: str, resource_id, start, end):
+    """
+    Prima apariție nematerializată a unei serii pe resursa dată care se suprapune
+    cu [start, end), ca BookingRow (sau None).
+    """
+    first = timezone.localtime(start).date()
+    last = timezone.localtime(end).date()
+    for row in virtual_booking_rows(kind, first, last, [resource_id]):
+        if row.start_date < end and row.end_date > start:
+            return row
+    return None
+
+
+def virtual_occurrences(kind: str, target_date) -> list:
+    """
+    Aparițiile nematerializate din ziua dată, ca instanțe Appointment / Request nesalvate
+    (pentru serializare în endpoint-urile by-date).
+    """
+    return [
+        series.build_occurrence(target_date)
+        for series in _series_for(kind, target_date, target_date).select_related('item', 'room')
+        if _virtual_dates(series, target_date, target_date)
+    ]
+
+
+def _insert_each(model, occurrences) -> list:
+    """Inserează aparițiile una câte una (fiecare în savepoint), sărind peste cele respinse."""
+    inserted = []
+    for occurrence in occurrences:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([occurrence])
+        except IntegrityError:
+            continue
+        inserted.append(occurrence)
+    return inserted
+
+
+@transaction.atomic
+def materialize_series(series, until=None) -> tuple:
+    """
+    Creează în bulk aparițiile seriei până la `until` (default: orizontul curent).
+
+    Aparițiile care se suprapun cu rezervări existente sunt sărite (rezervările
+    individuale au prioritate); restul sunt inserate cu un singur bulk_create.
+    Dacă o rezervare apare între verificare și inserare (constraint-ul de excludere
+    respinge bulk_create-ul), aparițiile sunt inserate una câte una.
+
+    Returns:
+        tuple: (numărul de apariții create, numărul de apariții sărite)
+    """
+    from .models import Appointment, BookingSeries, Request
+    from .signals import refresh_booking_data
+
+    until = min(until or horizon_end(), series.until)
+    first = series.start_date
+    if series.materialized_until is not None:
+        first = max(first, series.materialized_until + timedelta(days=1))
+    if first > until:
+        return 0, 0
+
+    occurrences = [series.build_occurrence(day) for day in series.occurrence_dates(first, until)]
+    if series.item_id:
+        model, field = Appointment, 'item_id'
+        existing = Appointment.objects.filter(item_id=series.item_id)
+    else:
+        model, field = Request, 'room_id'
+        existing = Request.objects.filter(room_id=series.room_id, status=Request.APPROVED)
+
+    created = []
+    if occurrences:
+        range_start = occurrences[0].start_date
+        range_end = occurrences[-1].end_date
+        index = IntervalIndex(
+            booking_rows(existing.overlaps((range_start, range_end)), field),
+            'resource_id'
+        )
+        created = [
+            occurrence for occurrence in occurrences
+            if index.is_free(series.resource_id, occurrence.start_date, occurrence.end_date)
+        ]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(created)
+        except IntegrityError:
+            created = _insert_each(model, created)
+        # bulk_create nu emite signals
+        refresh_booking_data(
+            model,
+            [
+                (getattr(occurrence, field), occurrence.user_id, occurrence.start_date, occurrence.end_date)
+                for occurrence in created
+            ]
+        )
+
+    BookingSeries.objects.filter(pk=series.pk).update(materialized_until=until)
+    series.materialized_until = until
+    return len(created), len(occurrences) - len(created)
+
+
+def materialize_due_series(until=None) -> dict:
+    """
+    Avansează orizontul de materializare pentru toate seriile care îl au în urmă.
+    Fiecare serie este materializată în propria tranzacție; o serie care eșuează este
+    logată și reîncercată la următoarea rulare, fără să le oprească pe celelalte.
+
+    Returns:
+        dict: numărul de serii procesate / eșuate și de apariții create / sărite
+    """
+    from .models import BookingSeries
+
+    until = until or horizon_end()
+    due = BookingSeries.objects.filter(
+        start_date__lte=until,
+    ).filter(
+        Q(materialized_until__isnull=True)
+        | (Q(materialized_until__lt=until) & Q(materialized_until__lt=F('until')))
+    ).order_by('id')
+
+    summary = {'series': 0, 'failed': 0, 'created': 0, 'skipped': 0}
+    for series in due.iterator():
+        try:
+            created, skipped = materialize_series(series, until)
+        except Exception as e:
+            logger.error(f"Materializarea seriei {series.pk} a eșuat: {e}", exc_info=True)
+            summary['failed'] += 1
+            continue
+        summary['series'] += 1
+        summary['created'] += created
+        summary['skipped'] += skipped
+    return summary
@@ -0,0 +1,115 @@
+"""
+Cache de proces pentru datele de referință: rooms, items, categorii de camere, roluri, echipe.
+
+Tabelele sunt mici și citite la aproape fiecare request (validarea room_code / item_name,
+check_availability, statistici), așa că fiecare worker ține o copie în memorie, indexată
+după ID și după cheia de căutare (code / name).
+
+Fiecare tabel are o versiune în cache-ul Django (Redis în producție), comună tuturor
+worker-ilor. Signals schimbă versiunea după commit la orice save/delete; un worker care
+vede o versiune diferită de cea încărcată reîncarcă tabelul cu un singur query. O căutare
+costă deci un GET în Redis în loc de un query în baza de date. Versiunea expiră după
+VERSION_TIMEOUT, așa că o invalidare pierdută ține un tabel vechi cel mult atât.
+
+Fără cache partajat (vezi caching.py), o invalidare nu ar ajunge la celelalte procese,
+așa că tabelele nu sunt ținute în memorie: fiecare căutare citește baza de date.
+
+Instanțele returnate sunt copii, așa că pot fi modificate / atașate altor obiecte fără
+a afecta cache-ul.
+"""
+import copy
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from .caching import is_shared_cache
+from .models import Item, Role, Room, RoomCategory, Team
+
+VERSION_KEY = 'refdata:version:{}'
+VERSION_TIMEOUT = 60 * 60
+
+
+class ReferenceTable:
+    """Un tabel de referință ținut în memorie, indexat după ID și după `key_field`."""
+
+    def __init__(self, name, queryset, key_field):
+        self.name = name
+        self.key_field = key_field
+        self._queryset = queryset
+        self._lock = threading.Lock()
+        # (version, rows, by_id, by_key), înlocuit dintr-o singură atribuire la reîncărcare,
+        # astfel încât un thread care citește nu vede niciodată o combinație parțială
+        self._state = (None, (), {}, {})
+
+    def _current_version(self):
+        if not is_shared_cache():
+            return None
+        key = VERSION_KEY.format(self.name)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=VERSION_TIMEOUT)
+            version = cache.get(key)
+        return version
+
+    def _build(self):
+        rows = tuple(self._queryset().order_by('pk'))
+        by_key = {}
+        for row in rows:
+            # La chei duplicate (ex: Item.name nu este unic) câștigă primul după ID
+            by_key.setdefault(getattr(row, self.key_field), row)
+        return rows, {row.pk: row for row in rows}, by_key
+
+    def _load(self):
+        version = self._current_version()
+        if version is None:
+            # Cache local sau indisponibil: fără versiune comună nu putem ști când e invalid
+            return self._build()
+        state = self._state
+        if version != state[0]:
+            with self._lock:
+                state = self._state
+                if version != state[0]:
+                    state = (version, *self._build())
+                    self._state = state
+        return state[1:]
+
+    def all(self) -> list:
+        """Toate rândurile, ordonate după ID."""
+        rows, _, _ = self._load()
+        return [copy.copy(row) for row in rows]
+
+    def by_id(self, pk):
+        _, by_id, _ = self._load()
+        row = by_id.get(pk)
+        return copy.copy(row) if row is not None else None
+
+    def by_key(self, key):
+        _, _, by_key = self._load()
+        row = by_key.get(key)
+        return copy.copy(row) if row is not None else None
+
+    def invalidate(self) -> None:
+        """Schimbă versiunea comună; toți worker-ii reîncarcă tabelul la următoarea citire."""
+        cache.set(VERSION_KEY.format(self.name), uuid.uuid4().hex, timeout=VERSION_TIMEOUT)
+
+
+rooms = ReferenceTable('rooms', lambda: Room.objects.select_related('category'), 'code')
+items = ReferenceTable('items', Item.objects.all, 'name')
+room_categories = ReferenceTable('room_categories', RoomCategory.objects.all, 'code')
+roles = ReferenceTable('roles', Role.objects.all, 'name')
+teams = ReferenceTable('teams', Team.objects.all, 'name')
+
+# Tabelele de invalidat la modificarea unui model (rooms conțin și categoria)
+TABLES_BY_MODEL = {
+    Room: (rooms,),
+    Item: (items,),
+    RoomCategory: (room_categories, rooms),
+    Role: (roles,),
+    Team: (teams,),
+}
+
+
+def invalidate(model) -> None:
+    for table in TABLES_BY_MODEL.get(model, ()):
+        table.invalidate()
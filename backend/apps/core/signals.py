@@ -0,0 +1,143 @@
+"""
+Signal handlers pentru datele derivate din rezervări.
+
+Orice save/delete pe Appointment sau Request (inclusiv approve/dismiss, care
+apelează save()) invalidează snapshot-urile zilelor acoperite de rezervare și
+recalculează bitmap-urile de ocupare ale resursei și prezența săptămânală a
+userului (doar pentru Appointment) - atât pentru intervalul nou,
+cât și pentru cel vechi dacă rezervarea a fost mutată. Modificarea unei serii
+recurente invalidează snapshot-urile zilelor pe care le acoperă.
+
+Modificările de User / Item invalidează componența echipelor și distanțele dintre
+items folosite la ordonarea după apropierea de coechipieri (vezi proximity.py).
+Modificările tabelelor de referință (Room, Item, RoomCategory, Role, Team) schimbă
+versiunea cache-ului de proces din refdata.py.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .availability import date_range, dates_touched
+from . import refdata
+from .models import Appointment, BookingSeries, Item, Request, Role, Room, RoomCategory, Team, User
+from .occupancy import refresh_occupancy
+from .presence import presence_pairs, refresh_presence
+from .proximity import invalidate_item_distances, invalidate_team_rosters
+from .snapshots import invalidate_dates
+
+
+def _booking_resource(sender):
+    """Returnează (tipul resursei, câmpul FK) pentru modelul de rezervare."""
+    if sender is Appointment:
+        return 'item', 'item_id'
+    return 'room', 'room_id'
+
+
+@receiver(pre_save, sender=Appointment)
+@receiver(pre_save, sender=Request)
+def remember_previous_booking(sender, instance, **kwargs):
+    """Reține resursa și intervalul vechi, pentru a actualiza și zilele de unde a fost mutată."""
+    _, field = _booking_resource(sender)
+    instance._previous_booking = None
+    if instance.pk:
+        instance._previous_booking = sender.objects.filter(
+            pk=instance.pk
+        ).values_list(field, 'user_id', 'start_date', 'end_date').first()
+
+
+def refresh_booking_data(sender, bookings):
+    """
+    Invalidează snapshot-urile și recalculează bitmap-urile (și, pentru programări,
+    prezența săptămânală) pentru rezervările date.
+
+    Apelată din signals și explicit după operațiile bulk (bulk_create nu emite signals).
+
+    Args:
+        sender: Appointment sau Request
+        bookings: tuple (resource_id, user_id, start_date, end_date)
+    """
+    bookings = list(bookings)
+    kind, _ = _booking_resource(sender)
+    pairs = set()
+    for resource_id, _, start_date, end_date in bookings:
+        for day in dates_touched(start_date, end_date):
+            pairs.add((resource_id, day))
+    invalidate_dates(day for _, day in pairs)
+    refresh_occupancy(kind, pairs)
+    if sender is Appointment:
+        refresh_presence(presence_pairs((user_id, start_date) for _, user_id, start_date, _ in bookings))
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=Request)
+def refresh_on_booking_save(sender, instance, **kwargs):
+    """Actualizează datele derivate după salvarea unei rezervări."""
+    _, field = _booking_resource(sender)
+    bookings = [(getattr(instance, field), instance.user_id, instance.start_date, instance.end_date)]
+    previous = getattr(instance, '_previous_booking', None)
+    if previous:
+        bookings.append(previous)
+    refresh_booking_data(sender, bookings)
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=Request)
+def refresh_on_booking_delete(sender, instance, **kwargs):
+    """Actualizează datele derivate după ștergerea unei rezervări."""
+    _, field = _booking_resource(sender)
+    refresh_booking_data(
+        sender,
+        [(getattr(instance, field), instance.user_id, instance.start_date, instance.end_date)]
+    )
+
+
+@receiver(post_save, sender=BookingSeries)
+@receiver(post_delete, sender=BookingSeries)
+def invalidate_series_dates(sender, instance, **kwargs):
+    """Aparițiile virtuale ale seriei fac parte din snapshot-urile zilelor pe care le acoperă."""
+    invalidate_dates(date_range(instance.start_date, instance.until))
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_team(sender, instance, **kwargs):
+    """Reține echipa veche, pentru a invalida și componența ei dacă user-ul a fost mutat."""
+    instance._previous_team_id = None
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'team' not in update_fields:
+        # Ex: actualizarea last_login la autentificare
+        return
+    if instance.pk:
+        instance._previous_team_id = sender.objects.filter(pk=instance.pk).values_list('team_id', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_team(sender, instance, **kwargs):
+    """Invalidează componența echipelor din care face / a făcut parte user-ul."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'team' not in update_fields:
+        return
+    team_ids = [instance.team_id, getattr(instance, '_previous_team_id', None)]
+    transaction.on_commit(lambda: invalidate_team_rosters(team_ids))
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def invalidate_item_graph(sender, instance, **kwargs):
+    """Vecinătățile din Item.meta s-au putut schimba."""
+    transaction.on_commit(invalidate_item_distances)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=RoomCategory)
+@receiver(post_delete, sender=RoomCategory)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_reference_data(sender, instance, **kwargs):
+    """Worker-ii reîncarcă tabelul de referință după commit."""
+    transaction.on_commit(lambda: refdata.invalidate(sender))
@@ -0,0 +1,223 @@
+"""
+Cache pentru snapshot-urile de ocupare per zi (Redis, prin cache-ul Django).
+
+Un snapshot conține toate rezervările unei zile, o dată ca BookingRow (pentru
+check_availability) și o dată serializate (pentru endpoint-urile by-date).
+Rezervările unei zile se schimbă rar comparativ cu cât de des sunt citite, așa că
+snapshot-ul se reconstruiește doar după invalidare (save/delete pe Appointment și
+Request, vezi signals.py) sau după expirarea TTL-ului.
+
+Fiecare zi are o generație în cache; snapshot-ul este salvat împreună cu generația
+citită înainte de a fi construit, iar invalidarea (după commit) schimbă generația.
+Un snapshot construit din date de dinainte de commit și salvat după invalidare rămâne
+astfel marcat cu generația veche și este ignorat la următoarea citire.
+
+Invalidarea trebuie să ajungă la toate procesele, așa că fără un cache partajat
+(vezi caching.py) snapshot-urile nu sunt folosite: fiecare citire interoghează baza de date.
+"""
+import logging
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .availability import booking_rows, day_window, starts_on
+from .caching import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'availability:day:{}'
+GENERATION_KEY = 'availability:generation:{}'
+STATS_HITS_KEY = 'availability:stats:hits'
+STATS_MISSES_KEY = 'availability:stats:misses'
+STATS_REBUILD_COUNT_KEY = 'availability:stats:rebuild_count'
+STATS_REBUILD_MS_TOTAL_KEY = 'availability:stats:rebuild_ms_total'
+STATS_REBUILD_MS_LAST_KEY = 'availability:stats:rebuild_ms_last'
+
+# Contoarele sunt adunate în proces și scrise în cache cel mult o dată în acest interval,
+# nu câte un round trip la fiecare citire
+STATS_FLUSH_SECONDS = 30
+
+
+def _incr(key: str, delta: int = 1) -> None:
+    """Incrementează un contor din cache (îl creează dacă nu există)."""
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Cheia a fost ștearsă între add și incr
+        cache.set(key, delta, timeout=None)
+
+
+class _SnapshotStats:
+    """Contoarele de hit / miss / reconstruire ale procesului, scrise periodic în cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_ms = None
+        self._flushed_at = time.monotonic()
+
+    def record(self, key: str, delta: int = 1, last_ms=None) -> None:
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + delta
+            if last_ms is not None:
+                self._last_ms = last_ms
+            due = time.monotonic() - self._flushed_at >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            last_ms, self._last_ms = self._last_ms, None
+            self._flushed_at = time.monotonic()
+        for key, delta in pending.items():
+            _incr(key, delta)
+        if last_ms is not None:
+            cache.set(STATS_REBUILD_MS_LAST_KEY, last_ms, timeout=None)
+
+
+_stats = _SnapshotStats()
+
+
+def build_day_snapshot(target_date) -> dict:
+    """
+    Construiește snapshot-ul de ocupare pentru o zi direct din baza de date.
+
+    Returns:
+        dict cu:
+        - appointments / approved_requests: BookingRow-uri care se suprapun cu ziua
+        - appointments_data / approved_requests_data: perechi (user_id, date serializate),
+          cu aceeași selecție ca endpoint-urile by-date
+        - item_masks / room_masks: resource_id -> bitmap-ul de sloturi ocupate în zi
+    
+    Toate includ și aparițiile nematerializate ale seriilor recurente (vezi recurrence.py).
+    """
+    from .api import AppointmentSerializer, RequestSerializer
+    from .models import Appointment, Request
+    from .occupancy import occupancy_masks, slot_mask
+    from .recurrence import virtual_booking_rows, virtual_occurrences
+
+    day_start, day_end = day_window(target_date)
+
+    appointments = Appointment.objects.overlaps((day_start, day_end))
+    approved_requests = Request.objects.filter(status=Request.APPROVED).overlaps((day_start, day_end))
+
+    appointments_on_date = Appointment.objects.filter(
+        starts_on(target_date)
+    ).select_related('user', 'item')
+    approved_requests_on_date = Request.objects.filter(
+        status=Request.APPROVED,
+    ).overlaps((day_start, day_end)).select_related('user', 'room', 'room__category', 'decided_by')
+
+    # Aparițiile seriilor recurente de după orizontul de materializare
+    virtual_appointments = virtual_booking_rows('item', target_date, target_date)
+    virtual_requests = virtual_booking_rows('room', target_date, target_date)
+    
+    item_masks = {
+        item_id: mask for (item_id, _), mask in occupancy_masks('item', None, [target_date]).items()
+    }
+    room_masks = {
+        room_id: mask for (room_id, _), mask in occupancy_masks('room', None, [target_date]).items()
+    }
+    for masks, rows in ((item_masks, virtual_appointments), (room_masks, virtual_requests)):
+        for row in rows:
+            masks[row.resource_id] = masks.get(row.resource_id, 0) | slot_mask(row.start_date, row.end_date, target_date)
+    
+    return {
+        'appointments': booking_rows(appointments, 'item_id') + virtual_appointments,
+        'approved_requests': booking_rows(approved_requests, 'room_id') + virtual_requests,
+        'appointments_data': [
+            (apt.user_id, dict(AppointmentSerializer(apt).data))
+            for apt in [*appointments_on_date, *virtual_occurrences('item', target_date)]
+        ],
+        'approved_requests_data': [
+            (req.user_id, dict(RequestSerializer(req).data))
+            for req in [*approved_requests_on_date, *virtual_occurrences('room', target_date)]
+        ],
+        'item_masks': item_masks,
+        'room_masks': room_masks,
+    }
+
+
+def get_day_snapshot(target_date) -> dict:
+    """
+    Returnează snapshot-ul zilei din cache, reconstruindu-l la miss.
+
+    Snapshot-ul și generația zilei sunt citite cu un singur GET multiplu; snapshot-ul
+    este valid doar dacă a fost construit sub generația curentă.
+    Fără cache partajat, snapshot-ul este construit direct din baza de date.
+    """
+    if not is_shared_cache():
+        return build_day_snapshot(target_date)
+
+    key = SNAPSHOT_KEY.format(target_date.isoformat())
+    generation_key = GENERATION_KEY.format(target_date.isoformat())
+    values = cache.get_many([key, generation_key])
+    generation = values.get(generation_key)
+    cached = values.get(key)
+    if generation is not None and cached is not None and cached[0] == generation:
+        _stats.record(STATS_HITS_KEY)
+        return cached[1]
+
+    _stats.record(STATS_MISSES_KEY)
+    if generation is None:
+        # Prima citire a zilei (sau generația a fost evacuată din cache)
+        cache.add(generation_key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(generation_key)
+
+    # Generația este citită înainte de a citi baza de date: dacă un writer face commit
+    # între timp, snapshot-ul de mai jos rămâne sub generația veche
+    started = time.perf_counter()
+    snapshot = build_day_snapshot(target_date)
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+
+    if generation is not None:
+        cache.set(key, (generation, snapshot), timeout=settings.AVAILABILITY_SNAPSHOT_TTL)
+    _stats.record(STATS_REBUILD_COUNT_KEY)
+    _stats.record(STATS_REBUILD_MS_TOTAL_KEY, elapsed_ms, last_ms=elapsed_ms)
+    logger.debug(f"Snapshot de disponibilitate reconstruit pentru {target_date} în {elapsed_ms} ms")
+    return snapshot
+
+
+def invalidate_dates(dates) -> None:
+    """
+    Invalidează snapshot-urile pentru zilele date, după commit-ul tranzacției curente:
+    fiecare zi primește o generație nouă, așa că snapshot-urile construite înainte
+    (inclusiv cele salvate de un cititor concurent după invalidare) nu mai sunt folosite.
+    """
+    keys = [GENERATION_KEY.format(d.isoformat()) for d in set(dates)]
+    if keys:
+        transaction.on_commit(
+            lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+        )
+
+
+def snapshot_stats() -> dict:
+    """Statistici pentru cache-ul de snapshot-uri (hit rate, timp de reconstruire)."""
+    _stats.flush()
+    values = cache.get_many([
+        STATS_HITS_KEY,
+        STATS_MISSES_KEY,
+        STATS_REBUILD_COUNT_KEY,
+        STATS_REBUILD_MS_TOTAL_KEY,
+        STATS_REBUILD_MS_LAST_KEY,
+    ])
+    hits = values.get(STATS_HITS_KEY, 0)
+    misses = values.get(STATS_MISSES_KEY, 0)
+    rebuilds = values.get(STATS_REBUILD_COUNT_KEY, 0)
+    rebuild_ms_total = values.get(STATS_REBUILD_MS_TOTAL_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else None,
+        'rebuilds': rebuilds,
+        'rebuild_ms_avg': round(rebuild_ms_total / rebuilds, 1) if rebuilds else None,
+        'rebuild_ms_last': values.get(STATS_REBUILD_MS_LAST_KEY),
+        'ttl_seconds': settings.AVAILABILITY_SNAPSHOT_TTL,
+        'enabled': is_shared_cache(),
+    }
@@ -0,0 +1,26 @@
+"""
+Celery tasks pentru întreținerea rezervărilor.
+"""
+import logging
+from celery import shared_task
+
+from .recurrence import materialize_due_series
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='core.materialize_booking_series')
+def materialize_booking_series():
+    """
+    Avansează orizontul de materializare al seriilor recurente.
+    
+    Returns:
+        dict: numărul de serii procesate / eșuate și de apariții create / sărite
+    """
+    summary = materialize_due_series()
+    logger.info(
+        f"Serii recurente: {summary['series']} procesate, "
+        f"{summary['created']} apariții create, {summary['skipped']} sărite (conflicte), "
+        f"{summary['failed']} eșuate"
+    )
+    return summary
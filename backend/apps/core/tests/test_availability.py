@@ -0,0 +1,111 @@
+"""
+Teste pentru availability.py: indexul de intervale și ferestrele de timp (fără bază de date).
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.availability import IntervalIndex, parse_time_window
+
+
+def at(hour, minute=0):
+    return datetime(2025, 1, 14, hour, minute, tzinfo=dt_timezone.utc)
+
+
+def booking(resource_id, start, end):
+    return SimpleNamespace(item_id=resource_id, start_date=start, end_date=end)
+
+
+class IntervalIndexOverlappingTests(SimpleTestCase):
+    def setUp(self):
+        self.morning = booking(1, at(9), at(11))
+        self.afternoon = booking(1, at(13), at(15))
+        self.other = booking(2, at(9), at(17))
+        # Ordinea de intrare nu contează: indexul sortează după start_date
+        self.index = IntervalIndex([self.afternoon, self.other, self.morning], 'item_id')
+
+    def test_bookings_are_grouped_and_sorted_per_resource(self):
+        self.assertEqual(self.index.bookings_for(1), [self.morning, self.afternoon])
+        self.assertEqual(self.index.bookings_for(2), [self.other])
+        self.assertEqual(self.index.bookings_for(3), [])
+
+    def test_overlapping_returns_only_intersecting_bookings(self):
+        self.assertEqual(self.index.overlapping(1, at(10), at(14)), [self.morning, self.afternoon])
+        self.assertEqual(self.index.overlapping(1, at(10), at(12)), [self.morning])
+        self.assertEqual(self.index.overlapping(1, at(12), at(16)), [self.afternoon])
+
+    def test_intervals_are_half_open(self):
+        # [9, 11) și [11, 13) nu se suprapun, nici [11, 13) și [13, 15)
+        self.assertEqual(self.index.overlapping(1, at(11), at(13)), [])
+        self.assertTrue(self.index.is_free(1, at(11), at(13)))
+        self.assertFalse(self.index.is_free(1, at(10, 59), at(13)))
+
+    def test_unknown_resource_is_free(self):
+        self.assertEqual(self.index.overlapping(3, at(0), at(23)), [])
+        self.assertFalse(self.index.is_occupied(3))
+        self.assertTrue(self.index.is_occupied(2))
+
+    def test_long_booking_starting_earlier_is_found(self):
+        index = IntervalIndex([booking(1, at(0), at(23)), booking(1, at(8), at(9))], 'item_id')
+        self.assertEqual(len(index.overlapping(1, at(20), at(21))), 1)
+        self.assertEqual(len(index.overlapping(1, at(8), at(8) + timedelta(minutes=30))), 2)
+
+
+class IntervalIndexFindGapTests(SimpleTestCase):
+    def setUp(self):
+        self.index = IntervalIndex([
+            booking(1, at(9), at(10)),
+            booking(1, at(10, 30), at(12)),
+            booking(1, at(11), at(13)),
+        ], 'item_id')
+
+    def test_first_gap_before_bookings(self):
+        self.assertEqual(self.index.find_gap(1, at(8), at(18), timedelta(hours=1)), (at(8), at(9)))
+
+    def test_gap_between_bookings(self):
+        self.assertEqual(
+            self.index.find_gap(1, at(9), at(18), timedelta(minutes=30)),
+            (at(10), at(10, 30))
+        )
+
+    def test_overlapping_bookings_are_merged(self):
+        # [10:30, 12) și [11, 13) acoperă împreună până la 13:00
+        self.assertEqual(self.index.find_gap(1, at(9), at(18), timedelta(hours=1)), (at(13), at(14)))
+
+    def test_no_gap_large_enough(self):
+        self.assertIsNone(self.index.find_gap(1, at(9), at(14), timedelta(hours=2)))
+        self.assertIsNone(self.index.find_gap(1, at(10, 30), at(13), timedelta(minutes=15)))
+
+    def test_free_resource_gap_starts_at_window(self):
+        self.assertEqual(self.index.find_gap(2, at(9), at(18), timedelta(hours=8)), (at(9), at(17)))
+        self.assertIsNone(self.index.find_gap(2, at(9), at(10), timedelta(hours=2)))
+
+
+@override_settings(TIME_ZONE='UTC')
+class ParseTimeWindowTests(SimpleTestCase):
+    day = date(2025, 1, 14)
+
+    def test_defaults_to_whole_day(self):
+        start, end = parse_time_window(self.day)
+        self.assertEqual((start, end), (at(0), at(0) + timedelta(days=1)))
+
+    def test_hours_are_combined_with_date(self):
+        self.assertEqual(parse_time_window(self.day, '09:00', '17:30'), (at(9), at(17, 30)))
+
+    def test_iso_datetimes_are_accepted_by_default(self):
+        start, end = parse_time_window(self.day, '2025-01-14T09:00:00Z', '2025-01-15T09:00:00Z')
+        self.assertEqual(end - start, timedelta(days=1))
+
+    def test_only_hours_when_datetimes_are_not_allowed(self):
+        self.assertEqual(
+            parse_time_window(self.day, '09:00', '17:00', allow_datetime=False),
+            (at(9), at(17))
+        )
+        for value in ('2025-01-14T09:00:00Z', '09:00:00', '9am'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_time_window(self.day, value, None, allow_datetime=False)
+
+    def test_end_must_be_after_start(self):
+        with self.assertRaises(ValueError):
+            parse_time_window(self.day, '10:00', '09:00')
@@ -0,0 +1,72 @@
+"""
+Teste pentru transformarea suprapunerilor de rezervări în 409 (booking_conflict_guard).
+"""
+from contextlib import nullcontext
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError
+from django.test import SimpleTestCase
+
+from apps.core.models import (
+    APPOINTMENT_OVERLAP_CONSTRAINT,
+    BOOKING_CONFLICT_CODE,
+    REQUEST_OVERLAP_CONSTRAINT,
+)
+from apps.core.viewsets import BookingConflict, booking_conflict_guard
+
+
+class DriverError(Exception):
+    """Eroarea psycopg2 din spatele IntegrityError (doar `diag.constraint_name` contează)."""
+
+    def __init__(self, constraint_name):
+        super().__init__(constraint_name)
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+
+def integrity_error(constraint_name):
+    error = IntegrityError('conflicting key value violates exclusion constraint')
+    error.__cause__ = DriverError(constraint_name)
+    return error
+
+
+# Savepoint-ul nu contează aici: sunt testate doar excepțiile
+@mock.patch('apps.core.viewsets.transaction.atomic', nullcontext)
+class BookingConflictGuardTests(SimpleTestCase):
+    def test_exclusion_constraint_validation_becomes_409(self):
+        error = ValidationError({
+            NON_FIELD_ERRORS: [ValidationError('Item-ul este deja rezervat.', code=BOOKING_CONFLICT_CODE)],
+        })
+        with self.assertRaises(BookingConflict) as raised:
+            with booking_conflict_guard():
+                raise error
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual(str(raised.exception.detail), 'Item-ul este deja rezervat.')
+        self.assertEqual(raised.exception.detail.code, BOOKING_CONFLICT_CODE)
+
+    def test_validation_error_list_is_supported(self):
+        with self.assertRaises(BookingConflict):
+            with booking_conflict_guard():
+                raise ValidationError('Camera este deja rezervată.', code=BOOKING_CONFLICT_CODE)
+
+    def test_other_validation_errors_are_reraised(self):
+        error = ValidationError({'end_date': ['end_date must be after start_date.']})
+        with self.assertRaises(ValidationError) as raised:
+            with booking_conflict_guard():
+                raise error
+        self.assertIs(raised.exception, error)
+
+    def test_overlap_constraint_violation_becomes_409(self):
+        for constraint in (APPOINTMENT_OVERLAP_CONSTRAINT, REQUEST_OVERLAP_CONSTRAINT):
+            with self.subTest(constraint=constraint):
+                with self.assertRaises(BookingConflict) as raised:
+                    with booking_conflict_guard():
+                        raise integrity_error(constraint)
+                self.assertEqual(raised.exception.status_code, 409)
+
+    def test_other_integrity_errors_are_reraised(self):
+        for error in (integrity_error('core_user_username_key'), IntegrityError('no cause')):
+            with self.subTest(error=error), self.assertRaises(IntegrityError):
+                with booking_conflict_guard():
+                    raise error
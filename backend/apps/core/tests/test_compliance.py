@@ -0,0 +1,38 @@
+"""
+Teste pentru validarea parametrilor raportului de conformitate (TeamViewSet.compliance).
+"""
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.api import TeamViewSet
+from apps.core.models import Team, User
+
+
+class ComplianceTeamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='x')
+        cls.manager = User.objects.create_user(username='manager', password='x')
+        cls.team = Team.objects.create(name='Ops', manager=cls.manager)
+        cls.other_team = Team.objects.create(name='Sales')
+
+    def compliance(self, user, **params):
+        request = APIRequestFactory().get('/api/teams/compliance/', {'from': '2025-01-06', 'to': '2025-01-12', **params})
+        force_authenticate(request, user=user)
+        return TeamViewSet.as_view({'get': 'compliance'})(request)
+
+    def test_unknown_team_is_not_found_for_superadmin(self):
+        response = self.compliance(self.admin, team_id=self.other_team.id + 100)
+        self.assertEqual(response.status_code, 404)
+
+    def test_non_integer_team_id(self):
+        self.assertEqual(self.compliance(self.admin, team_id='ops').status_code, 400)
+
+    def test_manager_cannot_see_other_teams(self):
+        self.assertEqual(self.compliance(self.manager, team_id=self.other_team.id).status_code, 403)
+        self.assertEqual(self.compliance(self.manager, team_id=self.team.id).status_code, 200)
+
+    def test_interval_is_limited(self):
+        response = self.compliance(self.admin, **{'from': '2024-01-01', 'to': '2025-01-12'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(TeamViewSet.COMPLIANCE_MAX_DAYS), response.data['error'])
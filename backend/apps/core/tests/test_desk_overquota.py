@@ -0,0 +1,111 @@
+"""
+Teste pentru AppointmentViewSet.desk_overquota: rezultatul trebuie să fie același cu
+cel al implementării inițiale (câte un set de query-uri per user).
+"""
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.availability import starts_between, starts_on
+from apps.core.models import Appointment, Item, OrgPolicy, Team, User
+from apps.core.viewsets import AppointmentViewSet
+
+
+def legacy_over_quota(target_date):
+    """Implementarea inițială (per user), folosită ca referință."""
+    week_start = target_date - timedelta(days=target_date.weekday())
+    week_end = week_start + timedelta(days=4)
+    appointments_on_date = Appointment.objects.filter(starts_on(target_date))
+    org_policy = OrgPolicy.get_policy()
+    result = {}
+    for user in set(apt.user for apt in appointments_on_date):
+        distinct_days = Appointment.objects.filter(
+            starts_between(week_start, week_end), user=user
+        ).values('start_date__date').distinct().count()
+        if user.team:
+            required_days = user.team.get_required_days_per_week()
+        else:
+            required_days = org_policy.default_required_days_per_week
+        if distinct_days >= required_days:
+            result[user.id] = {
+                'required_days': required_days,
+                'actual_days': distinct_days,
+                'appointments_on_date': sorted(apt.id for apt in appointments_on_date.filter(user=user)),
+            }
+    return result
+
+
+@override_settings(TIME_ZONE='UTC')
+class DeskOverquotaTests(TestCase):
+    # 2030-01-07 este luni
+    MONDAY = date(2030, 1, 7)
+
+    @classmethod
+    def setUpTestData(cls):
+        policy = OrgPolicy.get_policy()
+        policy.default_required_days_per_week = 2
+        policy.save()
+        strict = Team.objects.create(name='Strict', required_days_per_week=4)
+        relaxed = Team.objects.create(name='Relaxed', required_days_per_week=1)
+        cls.admin = User.objects.create_superuser(username='admin', password='x')
+        users = {
+            'no_team': (None, [0, 2, 2]),
+            'strict_short': (strict, [0, 1, 2]),
+            'strict_ok': (strict, [0, 1, 2, 3]),
+            'relaxed': (relaxed, [2]),
+            # Sâmbăta nu intră în săptămâna de lucru
+            'weekend': (None, [2, 5]),
+            'other_day': (None, [0, 1]),
+        }
+        for number, (name, (team, offsets)) in enumerate(users.items()):
+            user = User.objects.create_user(username=name, password='x', team=team)
+            desk = Item.objects.create(name=f'DESK-{number:03}')
+            for index, offset in enumerate(offsets):
+                day = cls.MONDAY + timedelta(days=offset)
+                Appointment.objects.create(
+                    user=user,
+                    item=desk,
+                    start_date=datetime.combine(day, time(9 + index), tzinfo=dt_timezone.utc),
+                    end_date=datetime.combine(day, time(10 + index), tzinfo=dt_timezone.utc),
+                )
+
+    def over_quota(self, target_date):
+        request = APIRequestFactory().get('/api/appointments/desk-overquota/', {'date': target_date.isoformat()})
+        force_authenticate(request, user=self.admin)
+        response = AppointmentViewSet.as_view({'get': 'desk_overquota'})(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_matches_the_legacy_implementation(self):
+        for offset in range(7):
+            target_date = self.MONDAY + timedelta(days=offset)
+            with self.subTest(target_date=target_date):
+                data = self.over_quota(target_date)
+                self.assertEqual(
+                    {
+                        row['user_id']: {
+                            'required_days': row['required_days'],
+                            'actual_days': row['actual_days'],
+                            'appointments_on_date': sorted(apt['id'] for apt in row['appointments_on_date']),
+                        }
+                        for row in data['over_quota_users']
+                    },
+                    legacy_over_quota(target_date),
+                )
+                self.assertEqual(data['total_over_quota'], len(data['over_quota_users']))
+
+    def test_wednesday(self):
+        data = self.over_quota(self.MONDAY + timedelta(days=2))
+        self.assertEqual(
+            [row['username'] for row in data['over_quota_users']],
+            ['no_team', 'strict_ok', 'relaxed'],
+        )
+        no_team = data['over_quota_users'][0]
+        self.assertEqual((no_team['actual_days'], no_team['required_days']), (2, 2))
+        self.assertEqual(len(no_team['appointments_on_date']), 2)
+
+    def test_day_without_bookings(self):
+        data = self.over_quota(self.MONDAY + timedelta(days=4))
+        self.assertEqual(data['over_quota_users'], [])
+        self.assertEqual(data['week_start'], self.MONDAY.isoformat())
@@ -0,0 +1,23 @@
+"""
+Teste pentru BookingQuerySet (fără bază de date: doar SQL-ul generat).
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase
+
+from apps.core.models import Appointment, Request
+
+
+def at(hour):
+    return datetime(2025, 1, 14, hour, tzinfo=dt_timezone.utc)
+
+
+class BookingQuerySetOverlapsTests(SimpleTestCase):
+    def test_no_windows_matches_nothing(self):
+        self.assertTrue(Appointment.objects.overlaps().query.is_empty())
+        self.assertTrue(Request.objects.filter(status=Request.APPROVED).overlaps(*[]).query.is_empty())
+
+    def test_windows_use_the_range_overlap_operator(self):
+        sql = str(Appointment.objects.overlaps((at(9), at(10)), (at(13), at(14))).query)
+        self.assertEqual(sql.count('&&'), 2)
+        self.assertIn('TSTZRANGE', sql)
@@ -0,0 +1,100 @@
+"""
+Teste pentru bitmap-urile de ocupare din occupancy.py (fără bază de date).
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.occupancy import (
+    SLOTS_PER_DAY,
+    busy_ranges,
+    bytes_to_mask,
+    compute_masks,
+    is_slot_aligned,
+    mask_to_bytes,
+    slot_mask,
+)
+
+DAY = date(2025, 1, 14)
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+def slots(first, last):
+    """Masca sloturilor [first, last)."""
+    return ((1 << (last - first)) - 1) << first
+
+
+@override_settings(TIME_ZONE='UTC')
+class SlotMaskTests(SimpleTestCase):
+    def test_aligned_interval(self):
+        # 09:00-10:00 = sloturile 36..39
+        self.assertEqual(slot_mask(at(9), at(10), DAY), slots(36, 40))
+
+    def test_partially_touched_slots_are_busy(self):
+        # 09:10-09:20 atinge sloturile 36 (09:00-09:15) și 37 (09:15-09:30)
+        self.assertEqual(slot_mask(at(9, 10), at(9, 20), DAY), slots(36, 38))
+
+    def test_end_on_slot_boundary_is_exclusive(self):
+        self.assertEqual(slot_mask(at(9), at(9, 15), DAY), slots(36, 37))
+
+    def test_interval_is_clipped_to_the_day(self):
+        previous_evening = at(22) - timedelta(days=1)
+        self.assertEqual(slot_mask(previous_evening, at(1), DAY), slots(0, 4))
+        self.assertEqual(slot_mask(at(23), at(2) + timedelta(days=1), DAY), slots(92, SLOTS_PER_DAY))
+        self.assertEqual(slot_mask(at(0), at(0) + timedelta(days=1), DAY), slots(0, SLOTS_PER_DAY))
+
+    def test_interval_outside_the_day_is_empty(self):
+        self.assertEqual(slot_mask(at(9) + timedelta(days=1), at(10) + timedelta(days=1), DAY), 0)
+        self.assertEqual(slot_mask(at(9) - timedelta(days=1), at(0), DAY), 0)
+
+    def test_slot_alignment(self):
+        self.assertTrue(is_slot_aligned(at(9), at(10, 45), DAY))
+        self.assertFalse(is_slot_aligned(at(9, 5), at(10), DAY))
+        self.assertFalse(is_slot_aligned(at(23), at(1) + timedelta(days=1), DAY))
+
+
+@override_settings(TIME_ZONE='UTC')
+class BusyRangesTests(SimpleTestCase):
+    def test_empty_mask(self):
+        self.assertEqual(busy_ranges(0, DAY), [])
+
+    def test_contiguous_runs_become_ranges(self):
+        mask = slots(36, 40) | slots(52, 54)
+        self.assertEqual(busy_ranges(mask, DAY), [(at(9), at(10)), (at(13), at(13, 30))])
+
+    def test_adjacent_bookings_merge(self):
+        mask = slot_mask(at(9), at(10), DAY) | slot_mask(at(10), at(11), DAY)
+        self.assertEqual(busy_ranges(mask, DAY), [(at(9), at(11))])
+
+    def test_whole_day(self):
+        self.assertEqual(busy_ranges(slots(0, SLOTS_PER_DAY), DAY), [(at(0), at(0) + timedelta(days=1))])
+
+    def test_round_trip_through_bytes(self):
+        mask = slots(0, 3) | slots(90, SLOTS_PER_DAY)
+        data = mask_to_bytes(mask)
+        self.assertEqual(len(data), 12)
+        self.assertEqual(bytes_to_mask(memoryview(data)), mask)
+        self.assertEqual(bytes_to_mask(None), 0)
+
+
+@override_settings(TIME_ZONE='UTC')
+class ComputeMasksTests(SimpleTestCase):
+    def test_bookings_are_combined_per_resource_and_day(self):
+        next_day = DAY + timedelta(days=1)
+        masks = compute_masks([
+            (1, at(9), at(10)),
+            (1, at(13), at(14)),
+            (2, at(23), at(1, day=next_day)),
+        ])
+        self.assertEqual(masks, {
+            (1, DAY): slots(36, 40) | slots(52, 56),
+            (2, DAY): slots(92, SLOTS_PER_DAY),
+            (2, next_day): slots(0, 4),
+        })
+
+    def test_requested_pairs_without_bookings_are_empty(self):
+        masks = compute_masks([(1, at(9), at(10))], pairs={(1, DAY), (3, DAY)})
+        self.assertEqual(masks, {(1, DAY): slots(36, 40), (3, DAY): 0})
@@ -0,0 +1,72 @@
+"""
+Teste pentru paginarea keyset (pagination.py): cursorul și condiția "după poziție".
+"""
+import base64
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Q
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request as ApiRequest
+from rest_framework.test import APIRequestFactory
+
+from apps.core.models import Request, User
+from apps.core.pagination import RequestPagination, UserPagination
+
+CREATED_AT = datetime(2025, 1, 14, 9, 30, tzinfo=dt_timezone.utc)
+
+
+def api_request(**params):
+    return ApiRequest(APIRequestFactory().get('/api/requests/', params))
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+@override_settings(API_PAGINATE_BY_DEFAULT=False)
+class KeysetCursorTests(SimpleTestCase):
+    def test_cursor_round_trip(self):
+        pagination = RequestPagination()
+        cursor = pagination.encode_cursor([CREATED_AT, 42])
+        self.assertEqual(
+            pagination.decode_cursor(api_request(cursor=cursor), Request),
+            [CREATED_AT, 42]
+        )
+
+    def test_missing_cursor(self):
+        self.assertIsNone(RequestPagination().decode_cursor(api_request(), Request))
+
+    def test_invalid_cursor_is_not_found(self):
+        invalid = {
+            'not base64': '%%%',
+            'not json': base64.urlsafe_b64encode(b'{').decode(),
+            'not a list': raw_cursor({'id': 1}),
+            'wrong length': raw_cursor([CREATED_AT.isoformat()]),
+            'invalid value': raw_cursor(['yesterday', 1]),
+            'invalid id': raw_cursor([CREATED_AT.isoformat(), 'x']),
+        }
+        for label, cursor in invalid.items():
+            with self.subTest(label), self.assertRaises(NotFound) as raised:
+                RequestPagination().decode_cursor(api_request(cursor=cursor), Request)
+            self.assertEqual(str(raised.exception.detail), RequestPagination.invalid_cursor_message)
+
+    def test_descending_after(self):
+        self.assertEqual(
+            RequestPagination()._after([CREATED_AT, 42]),
+            Q(created_at__lt=CREATED_AT) | Q(created_at=CREATED_AT, id__lt=42)
+        )
+
+    def test_ascending_after(self):
+        self.assertEqual(UserPagination()._after(['ana']), Q(username__gt='ana'))
+
+    def test_after_is_a_single_range_condition_in_sql(self):
+        sql = str(User.objects.filter(UserPagination()._after(['ana'])).query)
+        self.assertIn('"core_user"."username" > ana', sql)
+
+    def test_pagination_is_opt_in(self):
+        pagination = RequestPagination()
+        self.assertIsNone(pagination.paginate_queryset(Request.objects.all(), api_request()))
+        self.assertEqual(pagination.get_page_size(api_request(page_size='100000')), pagination.max_page_size)
+        self.assertEqual(pagination.get_page_size(api_request(page_size='x')), pagination.page_size)
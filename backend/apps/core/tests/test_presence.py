@@ -0,0 +1,73 @@
+"""
+Teste pentru calculul prezenței săptămânale din presence.py (fără bază de date).
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from importlib import import_module
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.presence import (
+    WORKWEEK_MASK,
+    compute_presence,
+    day_bit,
+    presence_pairs,
+    week_start,
+    workweek_days,
+)
+
+# 2030-01-07 este luni
+MONDAY = date(2030, 1, 7)
+NEXT_MONDAY = date(2030, 1, 14)
+
+
+class WeekTests(SimpleTestCase):
+    def test_week_start_is_the_iso_monday(self):
+        self.assertEqual(week_start(MONDAY), MONDAY)
+        self.assertEqual(week_start(date(2030, 1, 13)), MONDAY)
+        self.assertEqual(week_start(NEXT_MONDAY), NEXT_MONDAY)
+
+    def test_day_bit(self):
+        self.assertEqual(day_bit(MONDAY), 0b0000001)
+        self.assertEqual(day_bit(date(2030, 1, 13)), 0b1000000)
+
+    def test_workweek_days_ignores_the_weekend(self):
+        self.assertEqual(workweek_days(0), 0)
+        self.assertEqual(workweek_days(WORKWEEK_MASK), 5)
+        self.assertEqual(workweek_days(0b1111111), 5)
+        self.assertEqual(workweek_days(0b1100101), 2)
+
+
+class ComputePresenceTests(SimpleTestCase):
+    ROWS = [
+        (1, date(2030, 1, 7)),
+        (1, date(2030, 1, 9)),
+        (1, date(2030, 1, 12)),
+        (1, date(2030, 1, 15)),
+        (2, date(2030, 1, 9)),
+    ]
+
+    def test_masks_per_user_and_week(self):
+        self.assertEqual(compute_presence(self.ROWS), {
+            (1, MONDAY): 0b0100101,
+            (1, NEXT_MONDAY): 0b0000010,
+            (2, MONDAY): 0b0000100,
+        })
+
+    def test_pairs_restrict_the_result_and_keep_empty_weeks(self):
+        # Perechile fără programări rămân cu masca 0 (rândul lor trebuie șters)
+        self.assertEqual(
+            compute_presence(self.ROWS, {(1, NEXT_MONDAY), (3, MONDAY)}),
+            {(1, NEXT_MONDAY): 0b0000010, (3, MONDAY): 0},
+        )
+
+    def test_migration_copy_matches(self):
+        migration = import_module('apps.core.migrations.0017_weekly_presence')
+        self.assertEqual(migration.compute_presence(self.ROWS), compute_presence(self.ROWS))
+
+
+@override_settings(TIME_ZONE='Europe/Bucharest')
+class PresencePairsTests(SimpleTestCase):
+    def test_week_uses_the_local_start_day(self):
+        # Duminică 22:30 UTC este deja luni în București
+        start = datetime(2030, 1, 13, 22, 30, tzinfo=dt_timezone.utc)
+        self.assertEqual(presence_pairs([(1, start), (2, start)]), {(1, NEXT_MONDAY), (2, NEXT_MONDAY)})
@@ -0,0 +1,44 @@
+"""
+Teste pentru datele de proximitate (proximity.py): distanțele dintre items și cache-ul lor.
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core import proximity
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class DistanceToNearestTests(SimpleTestCase):
+    DISTANCES = {1: {1: 0, 2: 1, 3: 2}, 2: {2: 0, 1: 1, 3: 1}}
+
+    def test_nearest_reachable_target(self):
+        self.assertEqual(proximity.distance_to_nearest(1, {3, 2}, self.DISTANCES), 1)
+        self.assertEqual(proximity.distance_to_nearest(1, {3}, self.DISTANCES), 2)
+
+    def test_unreachable(self):
+        self.assertIsNone(proximity.distance_to_nearest(1, {4}, self.DISTANCES))
+        self.assertIsNone(proximity.distance_to_nearest(4, {1}, self.DISTANCES))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ItemDistancesCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_with_a_bounded_timeout_on_a_shared_cache(self):
+        with mock.patch.object(proximity, 'is_shared_cache', return_value=True), \
+                mock.patch.object(proximity, 'build_item_distances', return_value={1: {1: 0}}) as build, \
+                mock.patch.object(proximity.cache, 'set', wraps=proximity.cache.set) as cache_set:
+            proximity.item_distances()
+            proximity.item_distances()
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], proximity.CACHE_TIMEOUT)
+
+    def test_computed_every_time_on_a_local_cache(self):
+        with mock.patch.object(proximity, 'build_item_distances', return_value={}) as build:
+            proximity.item_distances()
+            proximity.item_distances()
+        self.assertEqual(build.call_count, 2)
@@ -0,0 +1,134 @@
+"""
+Teste pentru seriile de rezervări recurente (BookingSeries, recurrence.py).
+"""
+from datetime import date, datetime, time, timezone as dt_timezone
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.core.api import RequestSerializer
+from apps.core.models import BOOKING_CONFLICT_CODE, Appointment, BookingSeries, Item, Room, User
+from apps.core.recurrence import materialize_due_series, materialize_series
+
+
+def series(**kwargs):
+    defaults = {
+        'weekdays': [0, 2],
+        'interval': 1,
+        'start_time': time(9),
+        'end_time': time(17),
+        'start_date': date(2030, 1, 8),
+        'until': date(2030, 12, 31),
+    }
+    return BookingSeries(**{**defaults, **kwargs})
+
+
+class OccurrenceDatesTests(SimpleTestCase):
+    def test_weekly_on_given_weekdays(self):
+        # 2030-01-08 este marți: prima apariție este miercuri 9
+        self.assertEqual(
+            series().occurrence_dates(date(2030, 1, 1), date(2030, 1, 16)),
+            [date(2030, 1, 9), date(2030, 1, 14), date(2030, 1, 16)]
+        )
+
+    def test_interval_skips_weeks_counted_from_the_start_week(self):
+        self.assertEqual(
+            series(interval=2).occurrence_dates(date(2030, 1, 1), date(2030, 1, 31)),
+            [date(2030, 1, 9), date(2030, 1, 21), date(2030, 1, 23)]
+        )
+
+    def test_range_is_clipped_to_start_date_and_until(self):
+        self.assertEqual(
+            series(until=date(2030, 1, 14)).occurrence_dates(date(2030, 1, 10), date(2030, 2, 28)),
+            [date(2030, 1, 14)]
+        )
+        self.assertEqual(series().occurrence_dates(date(2029, 1, 1), date(2029, 12, 31)), [])
+
+    def test_single_day_range(self):
+        self.assertEqual(series().occurrence_dates(date(2030, 1, 16), date(2030, 1, 16)), [date(2030, 1, 16)])
+        self.assertEqual(series().occurrence_dates(date(2030, 1, 15), date(2030, 1, 15)), [])
+
+
+@override_settings(TIME_ZONE='UTC')
+class BuildOccurrenceTests(SimpleTestCase):
+    def test_room_occurrence_reuses_the_loaded_room(self):
+        room = Room(id=5, code='meetingRoom1', name='Meeting 1')
+        occurrence = series(user=User(id=1, username='ana'), room=room).build_occurrence(date(2030, 1, 9))
+        self.assertIs(occurrence.room, room)
+        self.assertEqual(occurrence.start_date, datetime(2030, 1, 9, 9, tzinfo=dt_timezone.utc))
+        # Fără query pentru camera fiecărei apariții (SimpleTestCase nu permite query-uri)
+        self.assertEqual(RequestSerializer(occurrence).data['roomCode'], 'meetingRoom1')
+
+
+@override_settings(TIME_ZONE='UTC')
+class SeriesConflictTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', password='x')
+        cls.other = User.objects.create_user(username='ion', password='x')
+        cls.item = Item.objects.create(name='DESK-001')
+        # Nematerializată: toate aparițiile sunt virtuale
+        series(user=cls.user, item=cls.item).save()
+
+    def appointment(self, day, start, end):
+        return Appointment(
+            user=self.other,
+            item=self.item,
+            start_date=datetime.combine(day, start, tzinfo=dt_timezone.utc),
+            end_date=datetime.combine(day, end, tzinfo=dt_timezone.utc),
+        )
+
+    def test_booking_over_a_virtual_occurrence_is_rejected(self):
+        with self.assertRaises(ValidationError) as raised:
+            self.appointment(date(2030, 1, 9), time(10), time(11)).save()
+        self.assertIn(BOOKING_CONFLICT_CODE, [error.code for error in raised.exception.error_dict['__all__']])
+
+    def test_booking_outside_the_occurrences_is_accepted(self):
+        # Marți nu face parte din serie; miercuri după 17:00 nici
+        self.appointment(date(2030, 1, 15), time(10), time(11)).save()
+        self.appointment(date(2030, 1, 16), time(17), time(18)).save()
+        self.assertEqual(Appointment.objects.count(), 2)
+
+
+@override_settings(TIME_ZONE='UTC')
+class MaterializeSeriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', password='x')
+        cls.other = User.objects.create_user(username='ion', password='x')
+        cls.item = Item.objects.create(name='DESK-001')
+
+    def test_booking_created_after_the_check_is_skipped(self):
+        booked = series(user=self.user, item=self.item)
+        booked.save()
+        # Rezervarea apare între verificare și inserare: verificarea nu o vede,
+        # constraint-ul de excludere respinge bulk_create-ul
+        Appointment.objects.bulk_create([Appointment(
+            user=self.other,
+            item=self.item,
+            start_date=datetime(2030, 1, 14, 10, tzinfo=dt_timezone.utc),
+            end_date=datetime(2030, 1, 14, 11, tzinfo=dt_timezone.utc),
+        )])
+        with mock.patch('apps.core.recurrence.booking_rows', return_value=[]):
+            self.assertEqual(materialize_series(booked, date(2030, 1, 16)), (2, 1))
+        self.assertEqual(
+            sorted(apt.start_date.date() for apt in Appointment.objects.filter(series=booked)),
+            [date(2030, 1, 9), date(2030, 1, 16)]
+        )
+        booked.refresh_from_db()
+        self.assertEqual(booked.materialized_until, date(2030, 1, 16))
+
+    def test_failed_series_does_not_stop_the_others(self):
+        first = series(user=self.user, item=self.item)
+        first.save()
+        second = series(user=self.other, item=Item.objects.create(name='DESK-002'))
+        second.save()
+        with mock.patch(
+            'apps.core.recurrence.materialize_series',
+            side_effect=[IntegrityError('exclude_appointment_overlap_per_item'), (3, 0)],
+        ) as materialize:
+            summary = materialize_due_series(date(2030, 1, 16))
+        self.assertEqual(summary, {'series': 1, 'failed': 1, 'created': 3, 'skipped': 0})
+        self.assertEqual([call.args[0].pk for call in materialize.call_args_list], [first.pk, second.pk])
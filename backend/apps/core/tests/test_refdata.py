@@ -0,0 +1,84 @@
+"""
+Teste pentru cache-ul de proces al datelor de referință (refdata.py).
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.models import Item
+from apps.core.refdata import ReferenceTable
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FakeQuerySet:
+    """Înlocuiește queryset-ul tabelului; numără încărcările."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+
+    def __call__(self):
+        return self
+
+    def order_by(self, *fields):
+        self.loads += 1
+        return sorted(self.rows, key=lambda row: row.pk)
+
+
+def fake_items():
+    return FakeQuerySet([
+        Item(id=2, name='DESK-002'),
+        Item(id=1, name='DESK-001'),
+        Item(id=3, name='DESK-001'),
+    ])
+
+
+# LocMemCache ține locul Redis: testele rulează într-un singur proces
+@override_settings(CACHES=LOCMEM_CACHE)
+@mock.patch('apps.core.refdata.is_shared_cache', lambda: True)
+class ReferenceTableTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.queryset = fake_items()
+        self.table = ReferenceTable('test-items', self.queryset, 'name')
+
+    def test_lookups(self):
+        self.assertEqual([row.pk for row in self.table.all()], [1, 2, 3])
+        self.assertEqual(self.table.by_id(2).name, 'DESK-002')
+        # La chei duplicate câștigă primul după ID
+        self.assertEqual(self.table.by_key('DESK-001').pk, 1)
+        self.assertIsNone(self.table.by_id(4))
+        self.assertIsNone(self.table.by_key('DESK-004'))
+
+    def test_loaded_once_per_version(self):
+        self.table.all()
+        self.table.by_id(1)
+        self.table.by_key('DESK-002')
+        self.assertEqual(self.queryset.loads, 1)
+
+    def test_invalidate_reloads_all_indexes_together(self):
+        self.table.all()
+        self.queryset.rows = [Item(id=1, name='DESK-100')]
+        self.table.invalidate()
+        self.assertEqual(self.table.by_key('DESK-100').pk, 1)
+        self.assertIsNone(self.table.by_id(2))
+        self.assertEqual(len(self.table.all()), 1)
+        self.assertEqual(self.queryset.loads, 2)
+
+    def test_returned_rows_are_copies(self):
+        self.table.by_id(1).name = 'changed'
+        self.assertEqual(self.table.by_id(1).name, 'DESK-001')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LocalCacheTests(SimpleTestCase):
+    def test_every_lookup_reads_the_database_without_a_shared_cache(self):
+        queryset = fake_items()
+        table = ReferenceTable('test-items', queryset, 'name')
+        self.assertEqual(table.by_id(2).name, 'DESK-002')
+        queryset.rows = [Item(id=2, name='DESK-200')]
+        # Fără invalidare: o redenumire din alt proces este văzută imediat
+        self.assertEqual(table.by_id(2).name, 'DESK-200')
+        self.assertEqual(queryset.loads, 2)
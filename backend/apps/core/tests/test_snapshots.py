@@ -0,0 +1,87 @@
+"""
+Teste pentru cache-ul de snapshot-uri per zi (generații și invalidare după commit).
+"""
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core import snapshots
+from apps.core.caching import check_shared_cache, is_shared_cache
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+REDIS_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis:6379/1'}}
+
+
+# LocMemCache ține locul Redis: testele rulează într-un singur proces
+@override_settings(CACHES=LOCMEM_CACHE, AVAILABILITY_SNAPSHOT_TTL=600)
+@mock.patch('apps.core.snapshots.transaction.on_commit', lambda callback: callback())
+@mock.patch('apps.core.snapshots.is_shared_cache', lambda: True)
+class DaySnapshotTests(SimpleTestCase):
+    day = date(2025, 1, 14)
+
+    def setUp(self):
+        # Contoarele adunate în proces de testele anterioare
+        snapshots._stats.flush()
+        cache.clear()
+
+    def test_snapshot_is_built_once_and_then_served_from_cache(self):
+        with mock.patch.object(snapshots, 'build_day_snapshot', return_value={'v': 1}) as build:
+            self.assertEqual(snapshots.get_day_snapshot(self.day), {'v': 1})
+            self.assertEqual(snapshots.get_day_snapshot(self.day), {'v': 1})
+        self.assertEqual(build.call_count, 1)
+
+    def test_invalidation_forces_a_rebuild(self):
+        with mock.patch.object(snapshots, 'build_day_snapshot', side_effect=[{'v': 1}, {'v': 2}]):
+            snapshots.get_day_snapshot(self.day)
+            snapshots.invalidate_dates([self.day])
+            self.assertEqual(snapshots.get_day_snapshot(self.day), {'v': 2})
+
+    def test_stale_snapshot_saved_after_invalidation_is_ignored(self):
+        def build_while_writer_commits(target_date):
+            # Cititorul a citit datele vechi; writer-ul face commit și invalidează
+            # înainte ca cititorul să salveze snapshot-ul
+            snapshots.invalidate_dates([target_date])
+            return {'v': 'stale'}
+
+        with mock.patch.object(snapshots, 'build_day_snapshot', side_effect=build_while_writer_commits):
+            self.assertEqual(snapshots.get_day_snapshot(self.day), {'v': 'stale'})
+        with mock.patch.object(snapshots, 'build_day_snapshot', return_value={'v': 'fresh'}) as build:
+            self.assertEqual(snapshots.get_day_snapshot(self.day), {'v': 'fresh'})
+        build.assert_called_once_with(self.day)
+
+    def test_other_days_are_not_invalidated(self):
+        other_day = date(2025, 1, 15)
+        with mock.patch.object(snapshots, 'build_day_snapshot', return_value={'v': 1}) as build:
+            snapshots.get_day_snapshot(other_day)
+            snapshots.invalidate_dates([self.day])
+            snapshots.get_day_snapshot(other_day)
+        self.assertEqual(build.call_count, 1)
+
+    def test_stats_are_flushed_when_read(self):
+        with mock.patch.object(snapshots, 'build_day_snapshot', return_value={'v': 1}):
+            snapshots.get_day_snapshot(self.day)
+            snapshots.get_day_snapshot(self.day)
+        stats = snapshots.snapshot_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['rebuilds']), (1, 1, 1))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LocalCacheTests(SimpleTestCase):
+    def test_snapshots_are_bypassed_without_a_shared_cache(self):
+        day = date(2025, 1, 14)
+        with mock.patch.object(snapshots, 'build_day_snapshot', return_value={'v': 1}) as build:
+            snapshots.get_day_snapshot(day)
+            snapshots.get_day_snapshot(day)
+        self.assertEqual(build.call_count, 2)
+        self.assertFalse(snapshots.snapshot_stats()['enabled'])
+
+    def test_local_cache_is_reported(self):
+        self.assertFalse(is_shared_cache())
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['core.W001'])
+
+    @override_settings(CACHES=REDIS_CACHE)
+    def test_redis_is_shared(self):
+        self.assertTrue(is_shared_cache())
+        self.assertEqual(check_shared_cache(None), [])
@@ -5,29 +5,153 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
 from drf_spectacular.types import OpenApiTypes
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from django.db.models import Q, Count
-from django.db.models.functions import TruncDate
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from itertools import groupby
 
-from .models import Request, Appointment, OrgPolicy
-from .api import RequestSerializer, AppointmentSerializer
+from .models import (
+    Request,
+    Appointment,
+    BookingSeries,
+    OrgPolicy,
+    WeeklyPresence,
+    BOOKING_CONFLICT_CODE,
+    APPOINTMENT_OVERLAP_CONSTRAINT,
+    REQUEST_OVERLAP_CONSTRAINT,
+)
+from .api import (
+    RequestSerializer,
+    AppointmentSerializer,
+    AppointmentBatchSerializer,
+    BookingSeriesSerializer,
+    REQUEST_VALUES,
+    APPOINTMENT_VALUES,
+)
+from .fieldsets import FIELDS_PARAM, FIELDSET_PARAMETERS, OMIT_PARAM, requested_fields
+from . import refdata
+from .pagination import AppointmentPagination, RequestPagination
 from .permissions import IsSuperAdmin, IsOwnerOrSuperAdmin
+from .snapshots import get_day_snapshot, snapshot_stats
+from .recurrence import virtual_booking_rows
+from .proximity import distance_to_nearest, item_distances, team_member_ids
+from .presence import workweek_days
+from .occupancy import (
+    SLOT_MINUTES,
+    busy_ranges,
+    day_matrix,
+    hourly_popularity,
+    is_slot_aligned,
+    occupancy_masks,
+    slot_mask,
+)
+from .availability import (
+    IntervalIndex,
+    booking_rows,
+    date_range,
+    day_window,
+    parse_time_window,
+    starts_on,
+    teammate_display_name,
+)
 from apps.notify.services import (
     notify_appointment_summary,
+    notify_appointment_batch_summary,
     notify_request_status,
     notify_desk_release_batch,
 )
 
 
+# Numărul maxim de zile acceptat de /availability/range/ (o lună + marjă)
+AVAILABILITY_RANGE_MAX_DAYS = 62
+
+# Limitele pentru /availability/slots/
+SLOT_SEARCH_MAX_DATES = 31
+SLOT_SEARCH_MAX_LIMIT = 100
+# Câte resurse sunt verificate odată (rezervările sunt încărcate doar pentru ele)
+SLOT_SEARCH_CHUNK_SIZE = 50
+
+
+class BookingConflict(APIException):
+    """Rezervarea se suprapune cu o programare / cerere aprobată existentă."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Resursa este deja rezervată în acest interval.'
+    default_code = BOOKING_CONFLICT_CODE
+
+
+def _booking_conflict_message(error):
+    """Returnează mesajul de suprapunere dintr-un ValidationError Django (sau None)."""
+    if hasattr(error, 'error_dict'):
+        errors = error.error_dict.get(NON_FIELD_ERRORS, [])
+    else:
+        errors = error.error_list
+    for err in errors:
+        if err.code == BOOKING_CONFLICT_CODE:
+            return err.message
+    return None
+
+
+@contextmanager
+def booking_conflict_guard():
+    """
+    Rulează scrierea unei rezervări într-un savepoint și transformă suprapunerile în 409.
+    
+    Suprapunerile sunt detectate fie de full_clean() (validarea ExclusionConstraint),
+    fie - pentru request-uri concurente - direct de Postgres (IntegrityError).
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except DjangoValidationError as e:
+        message = _booking_conflict_message(e)
+        if message is None:
+            raise
+        raise BookingConflict(message)
+    except IntegrityError as e:
+        constraint = getattr(getattr(e.__cause__, 'diag', None), 'constraint_name', None)
+        if constraint not in (APPOINTMENT_OVERLAP_CONSTRAINT, REQUEST_OVERLAP_CONSTRAINT):
+            raise
+        raise BookingConflict()
+
+
+def _projected_list(view, projection):
+    """
+    `list` pentru viewset-urile cu proiecție .values(): aceleași filtre, permisiuni și
+    paginare ca ModelViewSet.list, dar fără instanțe de model și fără serializer per rând.
+    """
+    request = view.request
+    keys = projection.keys(request)
+    extra = ['id', *getattr(view.paginator, 'ordering_fields', ())]
+    queryset = projection.values(view.filter_queryset(view.get_queryset()), keys, extra)
+    page = view.paginate_queryset(queryset)
+    rows = [projection.row(values, keys) for values in (page if page is not None else queryset)]
+    if page is not None:
+        return view.get_paginated_response(rows)
+    return Response(rows)
+
+
+def _select_fields(request, rows):
+    """Aplică `?fields=` / `?omit=` pe rânduri deja serializate (ex: din snapshot-ul zilei)."""
+    if not rows or not (request.query_params.get(FIELDS_PARAM) or request.query_params.get(OMIT_PARAM)):
+        return rows
+    keys = requested_fields(request, rows[0])
+    return [{key: row[key] for key in keys} for row in rows]
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=['Requests'], 
         summary='Listează cererile',
         description='Returnează lista de cereri. Employee vede doar propriile cereri, SUPERADMIN vede toate. '
-                    'Fiecare cerere include roomCode (ex: meetingRoom1, beerPointArea, meetingLarge1).'
+                    'Fiecare cerere include roomCode (ex: meetingRoom1, beerPointArea, meetingLarge1).',
+        parameters=FIELDSET_PARAMETERS,
     ),
     retrieve=extend_schema(
         tags=['Requests'], 
@@ -89,6 +213,7 @@ class RequestViewSet(viewsets.ModelViewSet):
     queryset = Request.objects.all()
     serializer_class = RequestSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RequestPagination
     
     def get_permissions(self):
         """Permisiuni diferite pentru acțiuni diferite."""
@@ -102,12 +227,19 @@ class RequestViewSet(viewsets.ModelViewSet):
         """Filtrează cererile în funcție de permisiuni."""
         user = self.request.user
         
+        # roomCode, user și decided_by sunt citite din JOIN, nu per rând
+        queryset = Request.objects.select_related('user', 'room', 'decided_by')
+        
         # SUPERADMIN vede tot
         if user.is_superuser:
-            return Request.objects.all()
+            return queryset
         
         # Employee vede doar propriile cereri
-        return Request.objects.filter(user=user)
+        return queryset.filter(user=user)
+    
+    def list(self, request, *args, **kwargs):
+        """Lista cererilor, serializată direct din .values() (fără instanțe de model)."""
+        return _projected_list(self, REQUEST_VALUES)
     
     def perform_create(self, serializer):
         """Creează cererea cu utilizatorul curent și statusul WAITING."""
@@ -115,6 +247,11 @@ class RequestViewSet(viewsets.ModelViewSet):
         # dar îl setăm explicit pentru claritate
         serializer.save(user=self.request.user, status=Request.WAITING)
     
+    def perform_update(self, serializer):
+        """Salvează modificările; suprapunerea cu o cerere aprobată returnează 409."""
+        with booking_conflict_guard():
+            serializer.save()
+    
     def update(self, request, *args, **kwargs):
         """Actualizează cererea cu validări speciale."""
         instance = self.get_object()
@@ -143,7 +280,13 @@ class RequestViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=['Requests'],
         summary='Aprobă o cerere',
-        description='Doar SUPERADMIN poate aproba cereri.',
+        description='Doar SUPERADMIN poate aproba cereri. Returnează 409 dacă există deja o cerere aprobată '
+                    'care se suprapune pe aceeași cameră.',
+        responses={
+            200: RequestSerializer,
+            400: {'description': 'Cererea nu este în status WAITING'},
+            409: {'description': 'Camera este deja rezervată în acest interval'},
+        },
     )
     @action(detail=True, methods=['post'], permission_classes=[IsSuperAdmin])
     def approve(self, request, pk=None):
@@ -158,7 +301,9 @@ class RequestViewSet(viewsets.ModelViewSet):
         
         request_obj.status = Request.APPROVED
         request_obj.decided_by = request.user
-        request_obj.save()
+        # Camera nu poate avea două cereri aprobate care se suprapun (409 la conflict)
+        with booking_conflict_guard():
+            request_obj.save()
         
         # Trimite notificare prin email după ce statusul este schimbat
         from django.db import transaction
@@ -214,6 +359,7 @@ class RequestViewSet(viewsets.ModelViewSet):
                 required=True,
                 description='Data pentru care se caută request-urile (format: YYYY-MM-DD). Ex: 2025-01-15'
             ),
+            *FIELDSET_PARAMETERS,
         ],
         responses={
             200: {
@@ -229,7 +375,18 @@ class RequestViewSet(viewsets.ModelViewSet):
                                     'type': 'array',
                                     'items': {'type': 'object'}
                                 },
-                                'total': {'type': 'integer'}
+                                'total': {'type': 'integer'},
+                                'slot_minutes': {'type': 'integer'},
+                                'busy_slots': {
+                                    'type': 'array',
+                                    'items': {
+                                        'type': 'object',
+                                        'properties': {
+                                            'start': {'type': 'string', 'format': 'date-time'},
+                                            'end': {'type': 'string', 'format': 'date-time'}
+                                        }
+                                    }
+                                }
                             }
                         }
                     }
@@ -245,8 +402,6 @@ class RequestViewSet(viewsets.ModelViewSet):
         Returnează toate request-urile care au fost făcute pentru o cameră specificată (după roomCode)
         și pentru o dată specificată (după start_date).
         """
-        from apps.core.models import Room
-        
         room_code = request.query_params.get('roomCode')
         date_str = request.query_params.get('date')
         
@@ -263,9 +418,8 @@ class RequestViewSet(viewsets.ModelViewSet):
             )
         
         # Verifică dacă camera există
-        try:
-            room = Room.objects.get(code=room_code)
-        except Room.DoesNotExist:
+        room = refdata.rooms.by_key(room_code)
+        if room is None:
             return Response(
                 {'error': f'Camera cu codul "{room_code}" nu a fost găsită'},
                 status=status.HTTP_404_NOT_FOUND
@@ -282,30 +436,43 @@ class RequestViewSet(viewsets.ModelViewSet):
         
         # Filtrează request-urile după room și start_date
         requests = Request.objects.filter(
-            room=room,
-            start_date__date=target_date
-        ).select_related('user', 'room', 'room__category', 'decided_by')
+            starts_on(target_date),
+            room=room
+        )
         
         # Aplică permisiunile: Employee vede doar propriile, SUPERADMIN vede toate
         user = request.user
         if not user.is_superuser:
             requests = requests.filter(user=user)
         
-        serializer = self.get_serializer(requests, many=True)
+        requests_data = REQUEST_VALUES.serialize(requests, request)
+        
+        # Intervalele ocupate ale camerei în ziua respectivă (toate request-urile aprobate),
+        # citite din bitmap-ul de sloturi al zilei
+        room_mask = occupancy_masks('room', [room.id], [target_date]).get((room.id, target_date), 0)
         
         return Response({
             'roomCode': room_code,
             'roomName': room.name,
             'date': target_date.isoformat(),
-            'requests': serializer.data,
-            'total': len(serializer.data)
+            'requests': requests_data,
+            'total': len(requests_data),
+            'slot_minutes': SLOT_MINUTES,
+            'busy_slots': [
+                {'start': start.isoformat(), 'end': end.isoformat()}
+                for start, end in busy_ranges(room_mask, target_date)
+            ]
         })
 
 
 @extend_schema_view(
-    list=extend_schema(tags=['Appointments'], summary='Listează programările'),
+    list=extend_schema(tags=['Appointments'], summary='Listează programările', parameters=FIELDSET_PARAMETERS),
     retrieve=extend_schema(tags=['Appointments'], summary='Obține detalii despre o programare'),
-    create=extend_schema(tags=['Appointments'], summary='Creează o programare nouă'),
+    create=extend_schema(
+        tags=['Appointments'],
+        summary='Creează o programare nouă',
+        description='Returnează 409 dacă item-ul are deja o programare care se suprapune cu intervalul cerut.',
+    ),
     update=extend_schema(tags=['Appointments'], summary='Actualizează o programare'),
     destroy=extend_schema(tags=['Appointments'], summary='Șterge o programare'),
 )
@@ -322,6 +489,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AppointmentPagination
     
     def get_permissions(self):
         """Permisiuni diferite pentru acțiuni diferite."""
@@ -340,17 +508,25 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         # Employee vede doar propriile programări
         return Appointment.objects.filter(user=user)
     
+    def list(self, request, *args, **kwargs):
+        """Lista programărilor, serializată direct din .values() (fără instanțe de model)."""
+        return _projected_list(self, APPOINTMENT_VALUES)
+    
     def perform_create(self, serializer):
         """Creează programarea - orice utilizator autentificat."""
         # User-ul este setat automat la utilizatorul curent
         if 'user' not in serializer.validated_data:
-            appointment = serializer.save(user=self.request.user)
+            save_kwargs = {'user': self.request.user}
         else:
             # Dacă user este specificat, verifică că este utilizatorul curent (sau SUPERADMIN)
             if serializer.validated_data['user'] != self.request.user and not self.request.user.is_superuser:
                 from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied("Nu poți crea programări pentru alți utilizatori.")
-            appointment = serializer.save()
+            save_kwargs = {}
+        
+        # Item-ul nu poate avea două programări care se suprapun (409 la conflict)
+        with booking_conflict_guard():
+            appointment = serializer.save(**save_kwargs)
         
         # Trimite notificare prin email după ce appointment-ul este creat cu succes
         # Folosim transaction.on_commit pentru a ne asigura că appointment-ul este salvat
@@ -372,6 +548,11 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         
         return super().update(request, *args, **kwargs)
     
+    def perform_update(self, serializer):
+        """Salvează modificările; suprapunerea cu o altă programare returnează 409."""
+        with booking_conflict_guard():
+            serializer.save()
+    
     def destroy(self, request, *args, **kwargs):
         """Șterge programarea - doar proprietarul poate șterge propria programare."""
         instance = self.get_object()
@@ -386,6 +567,121 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         
         return super().destroy(request, *args, **kwargs)
     
+    @extend_schema(
+        tags=['Appointments'],
+        summary='Creează mai multe programări într-un singur request',
+        description='Creează toate programările sau niciuna (ex: același birou pentru toată săptămâna). '
+                    'Item-urile sunt rezolvate după nume într-un singur query, suprapunerile sunt verificate '
+                    'pentru tot batch-ul deodată, iar utilizatorul primește un singur email de rezumat. '
+                    f'Maxim {AppointmentBatchSerializer.MAX_APPOINTMENTS} programări per batch.',
+        request=AppointmentBatchSerializer,
+        responses={
+            201: {
+                'description': 'Programările create',
+                'content': {
+                    'application/json': {
+                        'schema': {
+                            'type': 'object',
+                            'properties': {
+                                'appointments': {
+                                    'type': 'array',
+                                    'items': {'type': 'object'}
+                                },
+                                'total': {'type': 'integer'}
+                            }
+                        }
+                    }
+                }
+            },
+            400: {'description': 'Date invalide (item inexistent, interval invalid, suprapuneri în batch)'},
+            403: {'description': 'Programări pentru alt utilizator fără drepturi de SUPERADMIN'},
+            409: {'description': 'Cel puțin o programare se suprapune cu o programare existentă'}
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch_create(self, request):
+        """
+        Creează un batch de programări într-o singură tranzacție.
+        
+        Conflictele cu programările existente sunt verificate printr-un singur query;
+        constrângerea de excludere din baza de date rămâne plasa de siguranță pentru
+        request-urile concurente.
+        """
+        from .signals import refresh_booking_data
+        
+        serializer = AppointmentBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        owner = serializer.validated_data.get('user', request.user)
+        if owner != request.user and not request.user.is_superuser:
+            from rest_framework.exceptions import PermissionDenied
+            raise PermissionDenied("Nu poți crea programări pentru alți utilizatori.")
+        
+        entries = serializer.validated_data['appointments']
+        
+        # Toate suprapunerile cu programările existente, într-un singur query
+        overlap = Q()
+        for entry in entries:
+            overlap |= Q(item=entry['item'], start_date__lt=entry['end_date'], end_date__gt=entry['start_date'])
+        # plus aparițiile virtuale ale seriilor recurente (bulk_create nu apelează clean())
+        existing = IntervalIndex(
+            booking_rows(Appointment.objects.filter(overlap), 'item_id')
+            + virtual_booking_rows(
+                'item',
+                min(timezone.localtime(entry['start_date']).date() for entry in entries),
+                max(timezone.localtime(entry['end_date']).date() for entry in entries),
+                {entry['item'].id for entry in entries},
+            ),
+            'resource_id'
+        )
+        conflicts = [
+            index for index, entry in enumerate(entries)
+            if not existing.is_free(entry['item'].id, entry['start_date'], entry['end_date'])
+        ]
+        if conflicts:
+            return Response(
+                {
+                    'error': 'Unele item-uri sunt deja rezervate în intervalele cerute.',
+                    'conflicts': [
+                        {
+                            'index': index,
+                            'item_name': entries[index]['item'].name,
+                            'start_date': entries[index]['start_date'].isoformat(),
+                            'end_date': entries[index]['end_date'].isoformat(),
+                        }
+                        for index in conflicts
+                    ]
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        appointments = [
+            Appointment(
+                user=owner,
+                item=entry['item'],
+                start_date=entry['start_date'],
+                end_date=entry['end_date'],
+            )
+            for entry in entries
+        ]
+        
+        # bulk_create nu apelează save()/signals: snapshot-urile și bitmap-urile
+        # sunt actualizate explicit, în aceeași tranzacție
+        with booking_conflict_guard():
+            Appointment.objects.bulk_create(appointments)
+            refresh_booking_data(
+                Appointment,
+                [(apt.item_id, apt.user_id, apt.start_date, apt.end_date) for apt in appointments]
+            )
+        
+        transaction.on_commit(lambda: notify_appointment_batch_summary(owner, appointments))
+        
+        data = AppointmentSerializer(appointments, many=True).data
+        return Response(
+            {'appointments': data, 'total': len(data)},
+            status=status.HTTP_201_CREATED
+        )
+    
     @extend_schema(
         tags=['Appointments'],
         summary='Listează utilizatorii over-quota pentru birouri',
@@ -436,7 +732,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         Calcul:
         1. Găsește toate appointment-urile pentru birouri (ItemCategory.slug="birou") în ziua specificată
         2. Pentru fiecare user, calculează numărul de zile distincte din săptămâna de lucru (Luni-Vineri)
-           în care au cel puțin o rezervare pe item de tip "birou"
+           în care au cel puțin o rezervare pe item de tip "birou" (din WeeklyPresence)
         3. Compară cu required_days (fallback: team override → org default)
         4. Returnează doar userii care au atins deja norma
         
@@ -459,9 +755,11 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         
         # Găsește toate appointment-urile în ziua specificată
         # Notă: ItemCategory a fost eliminat, deci nu mai filtram după categorie
-        appointments_on_date = Appointment.objects.filter(
-            start_date__date=target_date
-        ).select_related('user', 'item', 'user__team')
+        appointments_on_date = list(
+            Appointment.objects.filter(
+                starts_on(target_date)
+            ).select_related('user', 'item', 'user__team').order_by('user_id', 'id')
+        )
         
         # Calculează săptămâna de lucru (Luni-Vineri)
         # Luni = 0, Vineri = 4, Sâmbătă = 5, Duminică = 6
@@ -469,7 +767,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         week_start = target_date - timedelta(days=days_since_monday)  # Luni
         week_end = week_start + timedelta(days=4)  # Vineri (săptămâna de lucru: 5 zile)
         
-        if not appointments_on_date.exists():
+        if not appointments_on_date:
             return Response({
                 'date': target_date.isoformat(),
                 'week_start': week_start.isoformat(),
@@ -479,52 +777,50 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 'message': 'Nu există rezervări de birouri în această zi'
             })
         
-        # Obține policy-ul organizațional
-        org_policy = OrgPolicy.get_policy()
+        # Prezența săptămânală a userilor cu rezervare în ziua specificată (un rând per user),
+        # împreună cu required_days (fallback: team override → org default), într-un singur query
+        org_default = Subquery(
+            OrgPolicy.objects.filter(pk=1).values('default_required_days_per_week')[:1]
+        )
+        policy_default = OrgPolicy._meta.get_field('default_required_days_per_week').default
+        presence = WeeklyPresence.objects.filter(
+            week_start=week_start,
+            user_id__in={apt.user_id for apt in appointments_on_date}
+        ).annotate(
+            required_days=Coalesce('user__team__required_days_per_week', org_default, Value(policy_default)),
+        ).values_list('user_id', 'days', 'required_days')
+        quotas = {}
+        for user_id, days, required_days in presence:
+            # Doar zilele din săptămâna de lucru (Luni-Vineri)
+            actual_days = workweek_days(days)
+            if actual_days >= required_days:
+                quotas[user_id] = {'actual_days': actual_days, 'required_days': required_days}
         
         over_quota_users = []
-        
-        # Pentru fiecare user care are rezervare în ziua specificată
-        users_with_appointments = set(apt.user for apt in appointments_on_date)
-        
-        for user in users_with_appointments:
-            # Găsește toate appointment-urile ale userului în săptămâna de lucru (Luni-Vineri)
-            week_appointments = Appointment.objects.filter(
-                user=user,
-                start_date__date__gte=week_start,
-                start_date__date__lte=week_end
-            )
-            
-            # Numără zilele distincte în care userul are cel puțin o rezervare
-            distinct_days = week_appointments.values('start_date__date').distinct().count()
-            
-            # Determină required_days pentru user (team override → org default)
-            if user.team:
-                required_days = user.team.get_required_days_per_week()
-            else:
-                required_days = org_policy.default_required_days_per_week
-            
-            # Verifică dacă userul a atins deja norma
-            if distinct_days >= required_days:
-                over_quota_users.append({
-                    'user_id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'team': user.team.name if user.team else None,
-                    'required_days': required_days,
-                    'actual_days': distinct_days,
-                    'appointments_on_date': [
-                        {
-                            'id': apt.id,
-                            'item': apt.item.name,
-                            'start_date': apt.start_date.isoformat(),
-                            'end_date': apt.end_date.isoformat(),
-                        }
-                        for apt in appointments_on_date.filter(user=user)
-                    ]
-                })
+        for user_id, user_appointments in groupby(appointments_on_date, key=lambda apt: apt.user_id):
+            if user_id not in quotas:
+                continue
+            user_appointments = list(user_appointments)
+            user = user_appointments[0].user
+            over_quota_users.append({
+                'user_id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'team': user.team.name if user.team else None,
+                'required_days': quotas[user_id]['required_days'],
+                'actual_days': quotas[user_id]['actual_days'],
+                'appointments_on_date': [
+                    {
+                        'id': apt.id,
+                        'item': apt.item.name,
+                        'start_date': apt.start_date.isoformat(),
+                        'end_date': apt.end_date.isoformat(),
+                    }
+                    for apt in user_appointments
+                ]
+            })
         
         response_data = {
             'date': target_date.isoformat(),
@@ -561,6 +857,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 required=True,
                 description='Data pentru care se caută appointment-urile (format: YYYY-MM-DD). Ex: 2024-01-15'
             ),
+            *FIELDSET_PARAMETERS,
         ],
         responses={
             200: {
@@ -590,8 +887,6 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         Returnează toate appointment-urile și request-urile approved din ziua specificată.
         Include și toate cererile care au fost approved pentru ziua respectivă.
         """
-        from apps.core.api import RequestSerializer
-        
         date_str = request.query_params.get('date')
         if not date_str:
             return Response(
@@ -607,39 +902,115 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filtrează appointment-urile din ziua specificată
-        appointments = Appointment.objects.filter(
-            start_date__date=target_date
-        ).select_related('user', 'item')
-        
-        # Filtrează request-urile approved din ziua specificată
-        # Un request este relevant dacă start_date sau end_date se suprapun cu ziua target
-        approved_requests = Request.objects.filter(
-            status=Request.APPROVED
-        ).filter(
-            start_date__date__lte=target_date,
-            end_date__date__gte=target_date
-        ).select_related('user', 'room', 'room__category', 'decided_by')
+        # Appointment-urile și request-urile approved din ziua specificată vin din snapshot-ul
+        # zilei (cache); un request este relevant dacă intervalul lui acoperă ziua target
+        snapshot = get_day_snapshot(target_date)
+        appointments_data = snapshot['appointments_data']
+        requests_data = snapshot['approved_requests_data']
         
         # Aplică permisiunile: Employee vede doar propriile, SUPERADMIN vede toate
         user = request.user
         if not user.is_superuser:
-            appointments = appointments.filter(user=user)
-            approved_requests = approved_requests.filter(user=user)
+            appointments_data = [row for row in appointments_data if row[0] == user.id]
+            requests_data = [row for row in requests_data if row[0] == user.id]
         
-        appointments_serializer = self.get_serializer(appointments, many=True)
-        requests_serializer = RequestSerializer(approved_requests, many=True)
+        appointments_data = _select_fields(request, [data for _, data in appointments_data])
+        requests_data = _select_fields(request, [data for _, data in requests_data])
         
         return Response({
             'date': target_date.isoformat(),
-            'appointments': appointments_serializer.data,
-            'approved_requests': requests_serializer.data,
-            'total_appointments': len(appointments_serializer.data),
-            'total_approved_requests': len(requests_serializer.data),
-            'total': len(appointments_serializer.data) + len(requests_serializer.data)
+            'appointments': appointments_data,
+            'approved_requests': requests_data,
+            'total_appointments': len(appointments_data),
+            'total_approved_requests': len(requests_data),
+            'total': len(appointments_data) + len(requests_data)
         })
 
 
+@extend_schema_view(
+    list=extend_schema(tags=['Booking Series'], summary='Listează seriile de rezervări recurente'),
+    retrieve=extend_schema(tags=['Booking Series'], summary='Obține detalii despre o serie recurentă'),
+    create=extend_schema(
+        tags=['Booking Series'],
+        summary='Creează o serie de rezervări recurente',
+        description='Rezervare săptămânală (ex: același birou în fiecare marți și joi) până la `until`. '
+                    'Aparițiile sunt create ca programări/cereri aprobate doar pentru următoarele zile '
+                    '(BOOKING_SERIES_HORIZON_DAYS); cele de după orizont sunt luate în calcul la verificarea '
+                    'disponibilității și sunt create automat pe măsură ce orizontul avansează. '
+                    'Aparițiile care se suprapun cu rezervări existente sunt sărite. '
+                    'Seriile pe camere pot fi create doar de SUPERADMIN.',
+    ),
+    destroy=extend_schema(
+        tags=['Booking Series'],
+        summary='Șterge o serie recurentă',
+        description='Șterge seria și aparițiile ei viitoare; aparițiile trecute rămân.',
+    ),
+)
+class BookingSeriesViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet pentru seriile de rezervări recurente.
+    
+    Permisiuni:
+    - GET: Employee vede doar propriile serii, SUPERADMIN vede toate
+    - POST: orice utilizator autentificat pentru items, doar SUPERADMIN pentru rooms
+    - DELETE: doar proprietarul seriei
+    """
+    queryset = BookingSeries.objects.all()
+    serializer_class = BookingSeriesSerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    
+    def get_queryset(self):
+        """Filtrează seriile în funcție de permisiuni."""
+        queryset = BookingSeries.objects.select_related('user')
+        if self.request.user.is_superuser:
+            return queryset
+        return queryset.filter(user=self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        """Creează seria și materializează aparițiile din orizontul curent."""
+        from .recurrence import materialize_series
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        # Aparițiile pe camere sunt create ca cereri deja aprobate
+        if serializer.validated_data.get('room') and not request.user.is_superuser:
+            return Response(
+                {'detail': 'Doar SUPERADMIN poate crea serii recurente pentru camere.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        with booking_conflict_guard():
+            series = serializer.save(user=request.user)
+            created, skipped = materialize_series(series)
+        
+        return Response(
+            {
+                **self.get_serializer(series).data,
+                'materialized': {'created': created, 'skipped': skipped},
+            },
+            status=status.HTTP_201_CREATED
+        )
+    
+    def destroy(self, request, *args, **kwargs):
+        """Șterge seria - doar proprietarul; aparițiile viitoare sunt șterse odată cu ea."""
+        instance = self.get_object()
+        
+        if instance.user != request.user:
+            return Response(
+                {'detail': 'Nu ai permisiunea să ștergi această serie.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        now = timezone.now()
+        with transaction.atomic():
+            instance.appointments.filter(start_date__gte=now).delete()
+            instance.requests.filter(start_date__gte=now).delete()
+            instance.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class AvailabilityViewSet(viewsets.ViewSet):
     """
     ViewSet pentru verificarea disponibilității resurselor (items/rooms).
@@ -649,6 +1020,8 @@ class AvailabilityViewSet(viewsets.ViewSet):
     @extend_schema(
         summary="Verifică disponibilitatea items/rooms pentru o dată",
         description="Returnează pentru fiecare item/room dacă e liber sau ocupat. "
+                    "Opțional, start/end restrâng verificarea la un interval orar: o resursă e ocupată "
+                    "doar dacă are o rezervare care se suprapune cu intervalul. "
                     "Pentru resurse ocupate, indică dacă e ocupată de un teammate și numele teammate-ului.",
         tags=['Availability'],
         parameters=[
@@ -666,6 +1039,30 @@ class AvailabilityViewSet(viewsets.ViewSet):
                 required=True,
                 description='Data pentru care se verifică disponibilitatea (format: YYYY-MM-DD)'
             ),
+            OpenApiParameter(
+                name='start',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Începutul intervalului (HH:MM sau datetime ISO). Implicit: 00:00 din ziua specificată'
+            ),
+            OpenApiParameter(
+                name='end',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Sfârșitul intervalului (HH:MM sau datetime ISO). Implicit: sfârșitul zilei specificate'
+            ),
+            OpenApiParameter(
+                name='rank',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=['proximity'],
+                description='"proximity": ordonează free_items după distanța (Item.meta["neighbors"]) până la '
+                            'cel mai apropiat item rezervat de un teammate în interval; fiecare item liber '
+                            'primește teammate_distance (null dacă nu există drum)'
+            ),
         ],
         responses={
             200: {'description': 'Listă de resurse cu statusul lor de disponibilitate'},
@@ -676,11 +1073,12 @@ class AvailabilityViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='check')
     def check_availability(self, request):
         """
-        Verifică disponibilitatea items/rooms pentru o dată specificată.
+        Verifică disponibilitatea items/rooms pentru o dată specificată
+        (opțional restrânsă la intervalul [start, end)).
         Returnează liste separate pentru resurse libere și ocupate.
         Pentru resurse ocupate, indică dacă e ocupată de un teammate.
         """
-        from apps.core.models import Room, Item, User
+        from apps.core.models import Item, User
         from apps.core.api import RoomSerializer, ItemSerializer
         
         user_id = request.query_params.get('user_id')
@@ -714,60 +1112,91 @@ class AvailabilityViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Obține toate items și rooms
-        all_items = Item.objects.filter(status=Item.ACTIVE)
-        all_rooms = Room.objects.all().select_related('category')
-        
-        # Obține appointments pentru ziua specificată
-        appointments = Appointment.objects.filter(
-            start_date__date=target_date
-        ).select_related('user', 'item')
-        
-        # Obține approved requests pentru ziua specificată
-        approved_requests = Request.objects.filter(
-            status=Request.APPROVED
-        ).filter(
-            start_date__date__lte=target_date,
-            end_date__date__gte=target_date
-        ).select_related('user', 'room')
-        
-        # Verifică dacă user-ul are teammates (din aceeași echipă)
-        user_team = target_user.team
-        teammate_ids = set()
-        if user_team:
-            teammates = User.objects.filter(team=user_team).exclude(id=target_user.id)
-            teammate_ids = set(teammates.values_list('id', flat=True))
+        rank = request.query_params.get('rank')
+        if rank not in (None, '', 'proximity'):
+            return Response(
+                {'error': 'Parametrul "rank" poate fi doar "proximity"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            window_start, window_end = parse_time_window(
+                target_date,
+                request.query_params.get('start'),
+                request.query_params.get('end'),
+            )
+        except ValueError as e:
+            return Response(
+                {'error': f'Interval invalid pentru start/end: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Toate items active și rooms, din cache-ul de referință
+        all_items = [item for item in refdata.items.all() if item.status == Item.ACTIVE]
+        all_rooms = refdata.rooms.all()
+        
+        # Rezervările zilei vin din snapshot-ul din cache; doar ferestrele care ies
+        # din ziua cerută (datetime-uri ISO) sunt citite direct din baza de date
+        day_start, day_end = day_window(target_date)
+        snapshot = None
+        if day_start <= window_start and window_end <= day_end:
+            snapshot = get_day_snapshot(target_date)
+            appointments = snapshot['appointments']
+            approved_requests = snapshot['approved_requests']
+        else:
+            appointments = booking_rows(
+                Appointment.objects.overlaps((window_start, window_end)),
+                'item_id'
+            )
+            approved_requests = booking_rows(
+                Request.objects.filter(status=Request.APPROVED).overlaps((window_start, window_end)),
+                'room_id'
+            )
+        
+        # Teammates (din aceeași echipă), din componența echipei ținută în cache
+        teammate_ids = team_member_ids(target_user.team_id) - {target_user.id}
+        
+        # Indexează rezervările pe resursă (o singură trecere peste rezervările zilei)
+        item_index = IntervalIndex(appointments, 'resource_id')
+        room_index = IntervalIndex(approved_requests, 'resource_id')
+        
+        # Resursele ocupate în fereastră: pentru ferestre aliniate la sloturi de 15 minute
+        # răspunsul vine din bitmap-urile zilei (AND pe biți), altfel din intervalele exacte
+        if snapshot is not None and is_slot_aligned(window_start, window_end, target_date):
+            window_bits = slot_mask(window_start, window_end, target_date)
+            busy_item_ids = {
+                item_id for item_id, mask in snapshot['item_masks'].items() if mask & window_bits
+            }
+            busy_room_ids = {
+                room_id for room_id, mask in snapshot['room_masks'].items() if mask & window_bits
+            }
+        else:
+            busy_item_ids = {
+                apt.resource_id for apt in appointments
+                if apt.start_date < window_end and apt.end_date > window_start
+            }
+            busy_room_ids = {
+                req.resource_id for req in approved_requests
+                if req.start_date < window_end and req.end_date > window_start
+            }
         
         # Verifică disponibilitatea items
         free_items = []
         occupied_items = []
         
-        for item in all_items:
-            # Verifică dacă item-ul este ocupat în ziua specificată
-            item_appointments = [apt for apt in appointments if apt.item_id == item.id]
-            
-            if not item_appointments:
+        for item, item_data in zip(all_items, ItemSerializer(all_items, many=True).data):
+            if item.id not in busy_item_ids:
                 # Item-ul este liber
-                item_data = ItemSerializer(item).data
                 item_data['is_available'] = True
                 item_data['occupied_by_teammate'] = False
                 item_data['teammate_name'] = None
                 free_items.append(item_data)
             else:
-                # Item-ul este ocupat
-                # Verifică dacă e ocupat de un teammate
-                occupied_by_teammate = False
-                teammate_name = None
-                
-                for apt in item_appointments:
-                    if apt.user_id in teammate_ids:
-                        occupied_by_teammate = True
-                        teammate_name = f"{apt.user.first_name} {apt.user.last_name}".strip() or apt.user.username
-                        break
-                
-                item_data = ItemSerializer(item).data
+                # Item-ul este ocupat - verifică dacă e ocupat de un teammate
+                item_appointments = item_index.overlapping(item.id, window_start, window_end)
+                teammate_name = teammate_display_name(item_appointments, teammate_ids)
                 item_data['is_available'] = False
-                item_data['occupied_by_teammate'] = occupied_by_teammate
+                item_data['occupied_by_teammate'] = teammate_name is not None
                 item_data['teammate_name'] = teammate_name
                 occupied_items.append(item_data)
         
@@ -775,39 +1204,41 @@ class AvailabilityViewSet(viewsets.ViewSet):
         free_rooms = []
         occupied_rooms = []
         
-        for room in all_rooms:
-            # Verifică dacă room-ul este ocupat în ziua specificată
-            room_requests = [req for req in approved_requests if req.room_id == room.id]
-            
-            if not room_requests:
+        for room, room_data in zip(all_rooms, RoomSerializer(all_rooms, many=True).data):
+            if room.id not in busy_room_ids:
                 # Room-ul este liber
-                room_data = RoomSerializer(room).data
                 room_data['is_available'] = True
                 room_data['occupied_by_teammate'] = False
                 room_data['teammate_name'] = None
                 free_rooms.append(room_data)
             else:
-                # Room-ul este ocupat
-                # Verifică dacă e ocupat de un teammate
-                occupied_by_teammate = False
-                teammate_name = None
-                
-                for req in room_requests:
-                    if req.user_id in teammate_ids:
-                        occupied_by_teammate = True
-                        teammate_name = f"{req.user.first_name} {req.user.last_name}".strip() or req.user.username
-                        break
-                
-                room_data = RoomSerializer(room).data
+                # Room-ul este ocupat - verifică dacă e ocupat de un teammate
+                room_requests = room_index.overlapping(room.id, window_start, window_end)
+                teammate_name = teammate_display_name(room_requests, teammate_ids)
                 room_data['is_available'] = False
-                room_data['occupied_by_teammate'] = occupied_by_teammate
+                room_data['occupied_by_teammate'] = teammate_name is not None
                 room_data['teammate_name'] = teammate_name
                 occupied_rooms.append(room_data)
         
+        if rank == 'proximity':
+            # Items rezervate de teammates în fereastră; items libere ordonate după distanța
+            # (în graful de vecinătate din Item.meta) până la cel mai apropiat dintre ele
+            teammate_item_ids = {
+                apt.resource_id for apt in appointments
+                if apt.user_id in teammate_ids
+                and apt.start_date < window_end and apt.end_date > window_start
+            }
+            distances = item_distances() if teammate_item_ids else {}
+            for item_data in free_items:
+                item_data['teammate_distance'] = distance_to_nearest(item_data['id'], teammate_item_ids, distances)
+            free_items.sort(key=lambda data: (data['teammate_distance'] is None, data['teammate_distance'] or 0))
+        
         return Response({
             'user_id': target_user.id,
             'username': target_user.username,
             'date': target_date.isoformat(),
+            'start': window_start.isoformat(),
+            'end': window_end.isoformat(),
             'free_items': free_items,
             'occupied_items': occupied_items,
             'free_rooms': free_rooms,
@@ -817,6 +1248,370 @@ class AvailabilityViewSet(viewsets.ViewSet):
             'total_free_rooms': len(free_rooms),
             'total_occupied_rooms': len(occupied_rooms),
         })
+    
+    @extend_schema(
+        summary="Matrice de ocupare items/rooms pe un interval de zile",
+        description="Returnează pentru fiecare item activ și fiecare room o listă de 0/1 (câte o valoare pe zi) "
+                    "care indică dacă resursa are cel puțin o rezervare în ziua respectivă. "
+                    f"Intervalul maxim este de {AVAILABILITY_RANGE_MAX_DAYS} zile. "
+                    "Potrivit pentru vizualizările pe săptămână/lună (un singur request în loc de unul pe zi).",
+        tags=['Availability'],
+        parameters=[
+            OpenApiParameter(
+                name='from',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Prima zi din interval (format: YYYY-MM-DD)'
+            ),
+            OpenApiParameter(
+                name='to',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Ultima zi din interval, inclusiv (format: YYYY-MM-DD)'
+            ),
+        ],
+        responses={
+            200: {
+                'description': 'Matricea de ocupare resursă × zi',
+                'content': {
+                    'application/json': {
+                        'example': {
+                            'from': '2025-01-13',
+                            'to': '2025-01-17',
+                            'days': ['2025-01-13', '2025-01-14', '2025-01-15', '2025-01-16', '2025-01-17'],
+                            'items': [
+                                {'id': 1, 'name': 'DESK-001', 'occupancy': [1, 0, 0, 1, 0]}
+                            ],
+                            'rooms': [
+                                {'id': 1, 'code': 'meetingRoom1', 'name': 'Meeting Room 1', 'occupancy': [0, 0, 1, 0, 0]}
+                            ],
+                        }
+                    }
+                }
+            },
+            400: {'description': 'Parametri lipsă sau invalizi'}
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='range')
+    def availability_range(self, request):
+        """
+        Returnează matricea de ocupare resursă × zi pentru intervalul [from, to].
+        Folosește câte un singur query pentru items, rooms și bitmap-urile de ocupare.
+        """
+        from apps.core.models import Room, Item
+        
+        from_str = request.query_params.get('from')
+        to_str = request.query_params.get('to')
+        
+        if not from_str or not to_str:
+            return Response(
+                {'error': 'Parametrii "from" și "to" sunt obligatorii (format: YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            from_date = datetime.strptime(from_str, '%Y-%m-%d').date()
+            to_date = datetime.strptime(to_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Format invalid pentru from/to. Folosește YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if to_date < from_date:
+            return Response(
+                {'error': '"to" trebuie să fie după sau egal cu "from"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        days = date_range(from_date, to_date)
+        if len(days) > AVAILABILITY_RANGE_MAX_DAYS:
+            return Response(
+                {'error': f'Intervalul maxim este de {AVAILABILITY_RANGE_MAX_DAYS} zile'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        items = Item.objects.filter(status=Item.ACTIVE).values('id', 'name')
+        rooms = Room.objects.values('id', 'code', 'name')
+        
+        # Ocuparea vine din bitmap-urile per resursă per zi (un query pe tabel de bitmap-uri),
+        # plus aparițiile seriilor recurente încă nematerializate
+        item_matrix = day_matrix('item', days)
+        room_matrix = day_matrix('room', days)
+        day_index = {day: i for i, day in enumerate(days)}
+        for matrix, kind in ((item_matrix, 'item'), (room_matrix, 'room')):
+            for row in virtual_booking_rows(kind, from_date, to_date):
+                occupancy = matrix.setdefault(row.resource_id, [0] * len(days))
+                occupancy[day_index[timezone.localtime(row.start_date).date()]] = 1
+        empty_row = [0] * len(days)
+        
+        return Response({
+            'from': from_date.isoformat(),
+            'to': to_date.isoformat(),
+            'days': [day.isoformat() for day in days],
+            'items': [
+                {**item, 'occupancy': item_matrix.get(item['id'], empty_row)}
+                for item in items
+            ],
+            'rooms': [
+                {**room, 'occupancy': room_matrix.get(room['id'], empty_row)}
+                for room in rooms
+            ],
+        })
+    
+    @extend_schema(
+        summary="Caută primele N resurse libere într-un interval orar",
+        description="Pentru zilele date, caută items (sau rooms) care au un interval liber de cel puțin "
+                    "`duration` minute în fereastra [start, end) în FIECARE dintre zile. "
+                    "Returnează primele `limit` resurse găsite, împreună cu primul slot liber pentru fiecare zi. "
+                    "Căutarea se oprește imediat ce s-au găsit `limit` rezultate.",
+        tags=['Availability'],
+        parameters=[
+            OpenApiParameter(
+                name='dates',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description=f'Listă de zile separate prin virgulă (YYYY-MM-DD), maxim {SLOT_SEARCH_MAX_DATES}. '
+                            'Ex: 2025-01-14,2025-01-16'
+            ),
+            OpenApiParameter(
+                name='start',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Începutul ferestrei (HH:MM). Implicit: 00:00'
+            ),
+            OpenApiParameter(
+                name='end',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Sfârșitul ferestrei (HH:MM). Implicit: sfârșitul zilei'
+            ),
+            OpenApiParameter(
+                name='duration',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Durata minimă a slotului, în minute. Implicit: toată fereastra'
+            ),
+            OpenApiParameter(
+                name='resource_type',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=['item', 'room'],
+                description='Tipul resursei căutate. Implicit: item (sau room dacă este dat room_category)'
+            ),
+            OpenApiParameter(
+                name='room_category',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Codul categoriei de camere (ex: MEETING). Implică resource_type=room'
+            ),
+            OpenApiParameter(
+                name='items',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description='Listă de nume de items separate prin virgulă, la care se restrânge căutarea'
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description=f'Numărul maxim de resurse returnate (implicit 10, maxim {SLOT_SEARCH_MAX_LIMIT})'
+            ),
+        ],
+        responses={
+            200: {
+                'description': 'Primele resurse cu slot liber',
+                'content': {
+                    'application/json': {
+                        'example': {
+                            'resource_type': 'item',
+                            'dates': ['2025-01-14', '2025-01-16'],
+                            'duration_minutes': 480,
+                            'results': [
+                                {
+                                    'id': 3,
+                                    'name': 'DESK-003',
+                                    'slots': [
+                                        {'date': '2025-01-14', 'start': '2025-01-14T09:00:00Z', 'end': '2025-01-14T17:00:00Z'},
+                                        {'date': '2025-01-16', 'start': '2025-01-16T09:00:00Z', 'end': '2025-01-16T17:00:00Z'},
+                                    ]
+                                }
+                            ],
+                            'total': 1,
+                        }
+                    }
+                }
+            },
+            400: {'description': 'Parametri lipsă sau invalizi'}
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='slots')
+    def find_slots(self, request):
+        """
+        Caută primele N resurse (items sau rooms) care au un slot liber de durata cerută
+        în fereastra [start, end) pentru toate zilele date.
+        """
+        from apps.core.models import Room, Item
+        
+        dates_str = request.query_params.get('dates')
+        if not dates_str:
+            return Response(
+                {'error': 'Parametrul "dates" este obligatoriu (ex: 2025-01-14,2025-01-16)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            dates = sorted({
+                datetime.strptime(d.strip(), '%Y-%m-%d').date()
+                for d in dates_str.split(',') if d.strip()
+            })
+        except ValueError:
+            return Response(
+                {'error': 'Format invalid pentru dates. Folosește YYYY-MM-DD separate prin virgulă'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not dates or len(dates) > SLOT_SEARCH_MAX_DATES:
+            return Response(
+                {'error': f'Parametrul "dates" trebuie să conțină între 1 și {SLOT_SEARCH_MAX_DATES} zile'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Fereastra de timp pentru fiecare zi
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end')
+        try:
+            windows = [parse_time_window(d, start_str, end_str, allow_datetime=False) for d in dates]
+        except ValueError as e:
+            return Response(
+                {'error': f'Interval invalid pentru start/end: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            duration_str = request.query_params.get('duration')
+            if duration_str:
+                duration = timedelta(minutes=int(duration_str))
+                if duration <= timedelta(0):
+                    raise ValueError
+            else:
+                # Implicit: resursa trebuie să fie liberă toată fereastra
+                duration = min(end - start for start, end in windows)
+            limit = min(int(request.query_params.get('limit', 10)), SLOT_SEARCH_MAX_LIMIT)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': 'Parametrii "duration" și "limit" trebuie să fie numere întregi pozitive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        room_category = request.query_params.get('room_category')
+        item_names = [n.strip() for n in request.query_params.get('items', '').split(',') if n.strip()]
+        resource_type = request.query_params.get('resource_type') or ('room' if room_category else 'item')
+        
+        if resource_type not in ('item', 'room'):
+            return Response(
+                {'error': 'Parametrul "resource_type" trebuie să fie "item" sau "room"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if resource_type == 'item':
+            resources = Item.objects.filter(status=Item.ACTIVE)
+            if item_names:
+                resources = resources.filter(name__in=item_names)
+            resources = resources.order_by('id').values('id', 'name')
+            # Un singur filtru de suprapunere pentru toate ferestrele
+            bookings, resource_field = Appointment.objects.overlaps(*windows), 'item_id'
+        else:
+            resources = Room.objects.all()
+            if room_category:
+                resources = resources.filter(category__code=room_category)
+            resources = resources.order_by('id').values('id', 'code', 'name')
+            bookings = Request.objects.filter(status=Request.APPROVED).overlaps(*windows)
+            resource_field = 'room_id'
+        
+        results = []
+        last_id = 0
+        # Parcurge resursele în ordine, câte un chunk odată, și se oprește după primele
+        # `limit` potriviri: rezervările sunt citite doar pentru resursele verificate
+        while len(results) < limit:
+            chunk = list(resources.filter(id__gt=last_id)[:SLOT_SEARCH_CHUNK_SIZE])
+            if not chunk:
+                break
+            last_id = chunk[-1]['id']
+            resource_ids = [resource['id'] for resource in chunk]
+            index = IntervalIndex(
+                booking_rows(bookings.filter(**{f'{resource_field}__in': resource_ids}), resource_field)
+                # Aparițiile seriilor recurente de după orizontul de materializare
+                + virtual_booking_rows(resource_type, min(dates), max(dates), resource_ids),
+                'resource_id'
+            )
+            
+            for resource in chunk:
+                slots = []
+                for day, (start, end) in zip(dates, windows):
+                    gap = index.find_gap(resource['id'], start, end, duration)
+                    if gap is None:
+                        break
+                    slots.append({
+                        'date': day.isoformat(),
+                        'start': gap[0].isoformat(),
+                        'end': gap[1].isoformat(),
+                    })
+                else:
+                    results.append({**resource, 'slots': slots})
+                    if len(results) >= limit:
+                        break
+        
+        return Response({
+            'resource_type': resource_type,
+            'dates': [d.isoformat() for d in dates],
+            'duration_minutes': int(duration.total_seconds() // 60),
+            'results': results,
+            'total': len(results),
+        })
+    
+    @extend_schema(
+        summary="Statistici pentru cache-ul de snapshot-uri de disponibilitate",
+        description="Doar SUPERADMIN. Returnează numărul de hit-uri/miss-uri, hit rate-ul și timpul "
+                    "de reconstruire a snapshot-urilor per zi folosite de check, by-date și appandreq. "
+                    "`enabled` este false fără cache partajat (REDIS_CACHE_URL).",
+        tags=['Availability'],
+        responses={
+            200: {
+                'description': 'Statistici cache',
+                'content': {
+                    'application/json': {
+                        'example': {
+                            'hits': 1520,
+                            'misses': 38,
+                            'hit_rate': 0.9756,
+                            'rebuilds': 38,
+                            'rebuild_ms_avg': 41.2,
+                            'rebuild_ms_last': 37,
+                            'ttl_seconds': 600,
+                            'enabled': True,
+                        }
+                    }
+                }
+            },
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsSuperAdmin])
+    def cache_stats(self, request):
+        """Returnează statisticile cache-ului de snapshot-uri per zi."""
+        return Response(snapshot_stats())
 
 
 class AppAndReqViewSet(viewsets.ViewSet):
@@ -873,8 +1668,6 @@ class AppAndReqViewSet(viewsets.ViewSet):
         Returnează toate appointment-urile și request-urile approved din ziua specificată.
         Include și toate cererile care au fost approved pentru ziua respectivă.
         """
-        from apps.core.api import RequestSerializer
-        
         date_str = request.query_params.get('date')
         if not date_str:
             return Response(
@@ -890,36 +1683,28 @@ class AppAndReqViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filtrează appointment-urile din ziua specificată
-        appointments = Appointment.objects.filter(
-            start_date__date=target_date
-        ).select_related('user', 'item')
-        
-        # Filtrează request-urile approved din ziua specificată
-        # Un request este relevant dacă start_date sau end_date se suprapun cu ziua target
-        approved_requests = Request.objects.filter(
-            status=Request.APPROVED
-        ).filter(
-            start_date__date__lte=target_date,
-            end_date__date__gte=target_date
-        ).select_related('user', 'room', 'room__category', 'decided_by')
+        # Appointment-urile și request-urile approved din ziua specificată vin din snapshot-ul
+        # zilei (cache); un request este relevant dacă intervalul lui acoperă ziua target
+        snapshot = get_day_snapshot(target_date)
+        appointments_data = snapshot['appointments_data']
+        requests_data = snapshot['approved_requests_data']
         
         # Aplică permisiunile: Employee vede doar propriile, SUPERADMIN vede toate
         user = request.user
         if not user.is_superuser:
-            appointments = appointments.filter(user=user)
-            approved_requests = approved_requests.filter(user=user)
+            appointments_data = [row for row in appointments_data if row[0] == user.id]
+            requests_data = [row for row in requests_data if row[0] == user.id]
         
-        appointments_serializer = AppointmentSerializer(appointments, many=True)
-        requests_serializer = RequestSerializer(approved_requests, many=True)
+        appointments_data = _select_fields(request, [data for _, data in appointments_data])
+        requests_data = _select_fields(request, [data for _, data in requests_data])
         
         return Response({
             'date': target_date.isoformat(),
-            'appointments': appointments_serializer.data,
-            'approved_requests': requests_serializer.data,
-            'total_appointments': len(appointments_serializer.data),
-            'total_approved_requests': len(requests_serializer.data),
-            'total': len(appointments_serializer.data) + len(requests_serializer.data)
+            'appointments': appointments_data,
+            'approved_requests': requests_data,
+            'total_appointments': len(appointments_data),
+            'total_approved_requests': len(requests_data),
+            'total': len(appointments_data) + len(requests_data)
         })
 
 
@@ -996,10 +1781,9 @@ class ItemOccupancyStatsViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Verifică dacă item-ul există
-        try:
-            item = Item.objects.get(id=item_id, status=Item.ACTIVE)
-        except Item.DoesNotExist:
+        # Verifică dacă item-ul există (din cache-ul de referință)
+        item = refdata.items.by_id(item_id)
+        if item is None or item.status != Item.ACTIVE:
             return Response(
                 {'error': f'Item cu ID-ul {item_id} nu a fost găsit sau nu este activ'},
                 status=status.HTTP_404_NOT_FOUND
@@ -1042,6 +1826,13 @@ class ItemOccupancyStatsViewSet(viewsets.ViewSet):
         
         # Creează un dict pentru a stoca datele din baza de date
         stats_dict = {}
+        if not rows:
+            # Fără statistici precalculate: popularitatea din bitmap-urile ultimelor 12 săptămâni
+            today = timezone.localdate()
+            popularity = hourly_popularity('item', item.id, today - timedelta(weeks=12), today)
+            for weekday_index, hours in popularity.items():
+                if weekday_index < len(weekdays):
+                    stats_dict[weekdays[weekday_index]] = hours
         for row in rows:
             weekday, hour, popularity = row
             if weekday not in stats_dict:
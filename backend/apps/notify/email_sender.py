@@ -2,18 +2,41 @@
 Funcții pentru renderizarea și trimiterea email-urilor din EmailOutbox.
 
 Acest modul procesează mesajele din coada EmailOutbox și le trimite efectiv.
+
+Worker-ii (task-ul Celery, comanda send_emails) revendică mesajele în batch-uri cu
+SELECT ... FOR UPDATE SKIP LOCKED (claim_outbox_batch), așa că pot goli coada în paralel
+fără trimiteri duble și fără mesaje sărite. Un batch revendicat poate fi trimis pe mai
+multe conexiuni în paralel (EMAIL_DISPATCH_WORKERS), în limita ratei provider-ului
+(vezi ratelimit.py).
 """
 import logging
-from django.core.mail import EmailMultiAlternatives
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F, Q
 
 from .models import EmailOutbox, EmailDelivery
+from .ratelimit import rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Un mesaj revendicat și netrimis în acest interval (ex: worker căzut) poate fi revendicat din nou
+LOCK_TIMEOUT = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+# Un batch revendicat trebuie să poată fi trimis, la rata provider-ului, în acest interval,
+# cu o marjă suficientă până la LOCK_TIMEOUT (altfel alt worker l-ar revendica din nou)
+CLAIM_SEND_BUDGET = LOCK_TIMEOUT / 2
+# Un mesaj eșuat este reprogramat după RETRY_BACKOFF * 2^(încercări - 1): 30s, 1min, 2min...
+RETRY_BACKOFF = timedelta(seconds=30)
+
+# Erori după care conexiunea de email este redeschisă și mesajul retrimis o dată
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
 
 def render_email_template(outbox: EmailOutbox) -> tuple[str, str]:
     """
@@ -48,44 +71,31 @@ def render_email_template(outbox: EmailOutbox) -> tuple[str, str]:
         raise
 
 
-def send_email_from_outbox(outbox: EmailOutbox) -> bool:
+def build_email_message(outbox: EmailOutbox) -> EmailMultiAlternatives:
     """
-    Trimite un email din outbox folosind Django's email backend.
+    Construiește mesajul email (text + HTML) pentru un mesaj din outbox.
     
     Args:
         outbox: instanță EmailOutbox de procesat
         
     Returns:
-        bool: True dacă email-ul a fost trimis cu succes, False altfel
+        EmailMultiAlternatives: mesajul, gata de trimis
     """
-    try:
-        # Renderizează template-urile
-        html_content, text_content = render_email_template(outbox)
-        
-        # Creează mesajul email
-        subject = _get_email_subject(outbox.template)
-        from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com')
-        
-        msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,  # Versiunea text (pentru clienți care nu suportă HTML)
-            from_email=from_email,
-            to=[outbox.to],
-        )
-        msg.attach_alternative(html_content, "text/html")  # Versiunea HTML
-        
-        # Trimite email-ul
-        msg.send()
-        
-        logger.info(f"Email trimis cu succes către {outbox.to} (outbox_id={outbox.id})")
-        return True
-        
-    except Exception as e:
-        logger.error(
-            f"Eroare la trimiterea email-ului pentru outbox {outbox.id}: {e}",
-            exc_info=True
-        )
-        return False
+    # Renderizează template-urile
+    html_content, text_content = render_email_template(outbox)
+    
+    # Creează mesajul email
+    subject = _get_email_subject(outbox.template)
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com')
+    
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,  # Versiunea text (pentru clienți care nu suportă HTML)
+        from_email=from_email,
+        to=[outbox.to],
+    )
+    msg.attach_alternative(html_content, "text/html")  # Versiunea HTML
+    return msg
 
 
 def _get_email_subject(template_name: str) -> str:
@@ -100,85 +110,298 @@ def _get_email_subject(template_name: str) -> str:
     """
     subjects = {
         'appointment_summary': 'Rezumat Programare - Molson Coors',
+        'appointment_batch_summary': 'Rezumat Programări - Molson Coors',
         'request_status': 'Status Cerere Rezervare - Molson Coors',
         'desk_release_ask': 'Cerere de Eliberare Birou - Molson Coors',
     }
     return subjects.get(template_name, 'Notificare - Molson Coors')
 
 
+def claimable_query(now, max_attempts: int) -> Q:
+    """Mesajele netrimise, programate până acum, neblocate (sau cu lock expirat), cu încercări rămase."""
+    return (
+        Q(sent_at__isnull=True, scheduled_at__lte=now, attempts__lt=max_attempts)
+        & (Q(locked_at__isnull=True) | Q(locked_at__lt=now - LOCK_TIMEOUT))
+    )
+
+
 @transaction.atomic
-def process_outbox_message(outbox: EmailOutbox, max_attempts: int = 3) -> bool:
+def claim_outbox_batch(batch_size: int, max_attempts: int = MAX_ATTEMPTS, ids=None) -> list:
     """
-    Procesează un mesaj din outbox: încearcă să-l trimită și actualizează statusul.
+    Revendică atomic un batch de mesaje pentru worker-ul curent.
+    
+    SELECT ... FOR UPDATE SKIP LOCKED, în ordinea (scheduled_at, id), sare peste rândurile
+    pe care alți worker-i le revendică în același moment, iar un singur UPDATE setează
+    locked_at și incrementează attempts. După commit, locked_at ține mesajele departe de
+    ceilalți worker-i până la LOCK_TIMEOUT (ex: dacă worker-ul cade în timpul trimiterii).
     
     Args:
-        outbox: instanță EmailOutbox de procesat
-        max_attempts: numărul maxim de încercări înainte de a marca ca eșuat
+        batch_size: numărul maxim de mesaje revendicate
+        max_attempts: mesajele cu atâtea încercări nu mai sunt revendicate
+        ids: opțional, doar dintre aceste ID-uri
         
     Returns:
-        bool: True dacă a fost trimis cu succes, False altfel
+        list: mesajele EmailOutbox revendicate (cu attempts deja incrementat)
     """
-    # Verifică dacă mesajul a fost deja trimis
-    if outbox.sent_at:
-        logger.debug(f"Outbox {outbox.id} a fost deja trimis la {outbox.sent_at}")
-        return True
+    now = timezone.now()
+    queryset = EmailOutbox.objects.filter(claimable_query(now, max_attempts))
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    claimed_ids = list(
+        queryset.order_by('scheduled_at', 'id')
+        .select_for_update(skip_locked=True)
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not claimed_ids:
+        return []
     
-    # Verifică dacă a depășit numărul maxim de încercări
-    if outbox.attempts >= max_attempts:
-        logger.warning(
-            f"Outbox {outbox.id} a depășit numărul maxim de încercări ({max_attempts})"
-        )
-        # Marchează ca eșuat definitiv
-        outbox.error = f"Depășit numărul maxim de încercări ({max_attempts})"
-        outbox.save(update_fields=['error'])
-        return False
-    
-    # Blochează mesajul pentru procesare (pentru a evita procesarea paralelă)
-    if outbox.locked_at:
-        # Verifică dacă lock-ul a expirat (ex: mai mult de 10 minute)
-        lock_age = timezone.now() - outbox.locked_at
-        if lock_age.total_seconds() < 600:  # 10 minute
-            logger.debug(f"Outbox {outbox.id} este deja blocat")
-            return False
-        # Lock-ul a expirat, continuăm procesarea
+    EmailOutbox.objects.filter(id__in=claimed_ids).update(locked_at=now, attempts=F('attempts') + 1)
+    return list(EmailOutbox.objects.filter(id__in=claimed_ids).order_by('scheduled_at', 'id'))
+
+
+@transaction.atomic
+def record_outbox_results(results, max_attempts: int = MAX_ATTEMPTS) -> None:
+    """
+    Salvează rezultatul trimiterii pentru mesaje revendicate.
     
-    # Blochează mesajul
-    outbox.locked_at = timezone.now()
-    outbox.attempts += 1
-    outbox.save(update_fields=['locked_at', 'attempts'])
+    Mesajele trimise sunt marcate cu un singur UPDATE și primesc câte un EmailDelivery SENT;
+    cele eșuate sunt deblocate și reprogramate cu backoff exponențial (RETRY_BACKOFF),
+    ca să nu fie revendicate din nou imediat, iar la ultima încercare primesc
+    un EmailDelivery FAILED.
     
-    try:
-        # Încearcă să trimită email-ul
-        success = send_email_from_outbox(outbox)
-        
-        if success:
-            # Marchează ca trimis
-            outbox.sent_at = timezone.now()
-            outbox.locked_at = None
-            outbox.error = ""
-            outbox.save(update_fields=['sent_at', 'locked_at', 'error'])
-            
-            # Creează înregistrare de delivery pentru audit
-            EmailDelivery.objects.create(
+    Args:
+        results: listă de (outbox, error) - error este None dacă mesajul a fost trimis
+        max_attempts: numărul maxim de încercări
+    """
+    now = timezone.now()
+    sent = [outbox for outbox, error in results if error is None]
+    if sent:
+        EmailOutbox.objects.filter(id__in=[outbox.id for outbox in sent]).update(
+            sent_at=now, locked_at=None, error=""
+        )
+        EmailDelivery.objects.bulk_create([
+            EmailDelivery(
                 outbox=outbox,
                 status='SENT',
                 provider_message_id='',  # Poate fi completat dacă folosești un provider extern
+                created_at=now,
             )
-            
-            return True
+            for outbox in sent
+        ])
+    
+    exhausted = []
+    for outbox, error in results:
+        if error is None:
+            continue
+        if outbox.attempts >= max_attempts:
+            error = f"{error} (depășit numărul maxim de încercări: {max_attempts})"
+            exhausted.append(outbox)
         else:
-            # Eroare la trimitere
-            outbox.error = "Eroare la trimiterea email-ului"
-            outbox.locked_at = None  # Deblochează pentru a permite reîncercarea
-            outbox.save(update_fields=['error', 'locked_at'])
-            
-            return False
-            
+            outbox.scheduled_at = now + RETRY_BACKOFF * 2 ** max(outbox.attempts - 1, 0)
+        EmailOutbox.objects.filter(id=outbox.id).update(
+            error=error, locked_at=None, scheduled_at=outbox.scheduled_at
+        )
+        outbox.error = error
+    if exhausted:
+        EmailDelivery.objects.bulk_create([
+            EmailDelivery(outbox=outbox, status='FAILED', created_at=now)
+            for outbox in exhausted
+        ])
+    
+    for outbox in sent:
+        outbox.sent_at = now
+        outbox.error = ""
+
+
+def _send_over(connection, outbox: EmailOutbox, message: EmailMultiAlternatives, limiter):
+    """
+    Trimite un mesaj pe conexiunea deschisă, reconectând o dată dacă sesiunea a căzut.
+    Fiecare încercare consumă un token din limiter (rata provider-ului).
+    
+    Returns:
+        tuple: (error, connected) - error este None dacă mesajul a fost trimis;
+        connected este False dacă conexiunea a rămas închisă (reconectare eșuată
+        sau sesiune căzută din nou)
+    """
+    for attempt in range(2):
+        limiter.acquire()
+        try:
+            if connection.send_messages([message]) != 1:
+                return "Backend-ul de email nu a acceptat mesajul", True
+            logger.info(f"Email trimis cu succes către {outbox.to} (outbox_id={outbox.id})")
+            return None, True
+        except RECONNECT_ERRORS as e:
+            # Sesiunea SMTP a fost închisă de server (timeout, limită de mesaje pe sesiune etc.)
+            logger.warning(f"Conexiunea de email a căzut la outbox {outbox.id}: {e}; reconectare")
+            connection.close()
+            if attempt:
+                return str(e) or "Conexiunea de email a căzut", False
+            try:
+                connection.open()
+            except Exception as open_error:
+                return str(open_error) or "Eroare la reconectarea la serverul de email", False
+        except Exception as e:
+            logger.error(
+                f"Eroare la trimiterea email-ului pentru outbox {outbox.id}: {e}",
+                exc_info=True
+            )
+            return str(e) or "Eroare la trimiterea email-ului", True
+
+
+def max_claim_size(batch_size: int, limiter) -> int:
+    """
+    Numărul de mesaje revendicate odată, limitat la câte pot fi trimise în CLAIM_SEND_BUDGET
+    cu partea procesului curent din rata limiter-ului (process_rate, vezi ratelimit.py),
+    ca lock-urile să nu expire în timp ce batch-ul așteaptă la limită.
+    """
+    if limiter.rate <= 0:
+        return batch_size
+    budget = int(limiter.process_rate * CLAIM_SEND_BUDGET.total_seconds())
+    return max(1, min(batch_size, budget))
+
+
+def deliver_outbox_batch(batch) -> list:
+    """
+    Trimite mesajele revendicate printr-o singură conexiune la backend-ul de email.
+    
+    Cu backend-ul SMTP, sesiunea (TCP + TLS + autentificare) este deschisă o singură dată
+    pentru tot batch-ul; rezultatul este totuși înregistrat per mesaj, iar o sesiune
+    căzută este redeschisă automat. Dacă după un mesaj conexiunea a rămas închisă, este
+    redeschisă o dată înainte de mesajul următor; dacă nici atunci nu se poate conecta,
+    restul batch-ului este marcat ca eșuat (și reîncercat mai târziu).
+    
+    Returns:
+        list: (outbox, error) pentru fiecare mesaj - error este None dacă a fost trimis
+    """
+    results = []
+    messages = []
+    for outbox in batch:
+        try:
+            messages.append((outbox, build_email_message(outbox)))
+        except Exception as e:
+            results.append((outbox, str(e) or "Eroare la renderizarea email-ului"))
+    if not messages:
+        return results
+    
+    limiter = rate_limiter()
+    connection = get_connection()
+    try:
+        connection.open()
     except Exception as e:
-        # Eroare neașteptată
-        outbox.error = str(e)
-        outbox.locked_at = None
-        outbox.save(update_fields=['error', 'locked_at'])
-        logger.error(f"Eroare neașteptată la procesarea outbox {outbox.id}: {e}", exc_info=True)
-        return False
+        logger.error(f"Nu s-a putut deschide conexiunea de email: {e}", exc_info=True)
+        return results + [(outbox, str(e) or "Eroare la conectarea la serverul de email") for outbox, _ in messages]
+    
+    connected = True
+    try:
+        for index, (outbox, message) in enumerate(messages):
+            if not connected:
+                try:
+                    connection.open()
+                except Exception as e:
+                    logger.error(f"Nu s-a putut redeschide conexiunea de email: {e}", exc_info=True)
+                    error = str(e) or "Eroare la reconectarea la serverul de email"
+                    results.extend((outbox, error) for outbox, _ in messages[index:])
+                    break
+            message.connection = connection
+            error, connected = _send_over(connection, outbox, message, limiter)
+            results.append((outbox, error))
+    finally:
+        connection.close()
+    return results
+
+
+def deliver_outbox_parallel(batch, workers: int) -> list:
+    """
+    Trimite mesajele revendicate în paralel, pe cel mult `workers` conexiuni.
+    
+    Trimiterea este I/O-bound (așteptarea răspunsului SMTP / API), așa că batch-ul este
+    împărțit în `workers` părți trimise din thread-uri separate, fiecare cu propria
+    conexiune (deliver_outbox_batch). Thread-urile nu accesează baza de date; rezultatele
+    sunt salvate de apelant. Rata totală rămâne limitată de bucket-ul backend-ului.
+    
+    Args:
+        batch: mesajele EmailOutbox revendicate
+        workers: numărul maxim de conexiuni simultane
+        
+    Returns:
+        list: (outbox, error) pentru fiecare mesaj - error este None dacă a fost trimis
+    """
+    workers = min(workers, len(batch))
+    if workers <= 1:
+        return deliver_outbox_batch(batch)
+    
+    chunks = [batch[index::workers] for index in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='email-dispatch') as pool:
+        return [result for results in pool.map(deliver_outbox_batch, chunks) for result in results]
+
 
+def drain_outbox(batch_size: int = 50, max_messages=None, on_result=None, workers=None) -> dict:
+    """
+    Golește coada: revendică batch-uri până nu mai sunt mesaje (sau până la max_messages),
+    le trimite și salvează rezultatele. Poate rula în paralel pe mai mulți worker-i.
+    
+    Args:
+        batch_size: numărul de mesaje revendicate odată (limitat de max_claim_size)
+        max_messages: numărul maxim de mesaje de procesat (default: toate)
+        on_result: opțional, apelat cu (outbox, error) pentru fiecare mesaj
+        workers: conexiuni paralele per batch (default: settings.EMAIL_DISPATCH_WORKERS)
+        
+    Returns:
+        dict: Rezumat cu numărul de mesaje procesate, trimise și eșuate
+    """
+    if workers is None:
+        workers = settings.EMAIL_DISPATCH_WORKERS
+    batch_size = max_claim_size(batch_size, rate_limiter())
+    processed = sent = failed = 0
+    while max_messages is None or processed < max_messages:
+        limit = batch_size if max_messages is None else min(batch_size, max_messages - processed)
+        batch = claim_outbox_batch(limit)
+        if not batch:
+            break
+        results = deliver_outbox_parallel(batch, workers)
+        record_outbox_results(results)
+        for outbox, error in results:
+            processed += 1
+            if error is None:
+                sent += 1
+            else:
+                failed += 1
+            if on_result is not None:
+                on_result(outbox, error)
+    return {
+        'processed': processed,
+        'sent': sent,
+        'failed': failed,
+        'total': processed,
+    }
+
+
+def process_outbox_message(outbox: EmailOutbox, max_attempts: int = MAX_ATTEMPTS) -> bool:
+    """
+    Procesează un mesaj din outbox: îl revendică, încearcă să-l trimită și actualizează statusul.
+    
+    Args:
+        outbox: instanță EmailOutbox de procesat
+        max_attempts: numărul maxim de încercări înainte de a marca ca eșuat
+        
+    Returns:
+        bool: True dacă a fost trimis cu succes, False altfel
+    """
+    # Verifică dacă mesajul a fost deja trimis
+    if outbox.sent_at:
+        logger.debug(f"Outbox {outbox.id} a fost deja trimis la {outbox.sent_at}")
+        return True
+    
+    # Blochează mesajul (dacă nu este deja revendicat de alt worker sau epuizat)
+    claimed = claim_outbox_batch(1, max_attempts, ids=[outbox.id])
+    if not claimed:
+        logger.debug(f"Outbox {outbox.id} este blocat, trimis sau fără încercări rămase")
+        return False
+    
+    results = deliver_outbox_batch(claimed)
+    record_outbox_results(results, max_attempts)
+    claimed_outbox, error = results[0]
+    outbox.attempts = claimed_outbox.attempts
+    outbox.sent_at = claimed_outbox.sent_at
+    outbox.error = claimed_outbox.error
+    return error is None
@@ -8,16 +8,15 @@ Utilizare:
     python manage.py send_emails
     python manage.py send_emails --batch-size 50
     python manage.py send_emails --max-messages 100
+    python manage.py send_emails --workers 8
 """
-import logging
+import time
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.db.models import Q
 
 from apps.notify.models import EmailOutbox
-from apps.notify.email_sender import process_outbox_message
-
-logger = logging.getLogger(__name__)
+from apps.notify.email_sender import MAX_ATTEMPTS, claimable_query, drain_outbox
 
 
 class Command(BaseCommand):
@@ -36,6 +35,12 @@ class Command(BaseCommand):
             default=None,
             help='Numărul maxim de mesaje de procesat (default: toate)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Numărul de conexiuni de email paralele (default: EMAIL_DISPATCH_WORKERS)',
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -45,87 +50,56 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         batch_size = options['batch_size']
         max_messages = options['max_messages']
+        workers = options['workers']
         dry_run = options['dry_run']
         
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN MODE - Nu se vor trimite email-uri efectiv'))
-        
-        # Găsește mesajele care trebuie procesate:
-        # - Nu au fost trimise (sent_at is None)
-        # - Sunt programate pentru acum sau în trecut (scheduled_at <= now)
-        # - Nu sunt blocate sau lock-ul a expirat
-        now = timezone.now()
-        
-        # Query pentru mesaje de procesat
-        pending_query = Q(sent_at__isnull=True) & Q(scheduled_at__lte=now)
-        
-        # Exclude mesajele care sunt blocate recent (lock-ul nu a expirat)
-        # Lock-ul expiră după 10 minute
-        lock_expiry = now - timezone.timedelta(minutes=10)
-        pending_query &= (
-            Q(locked_at__isnull=True) | 
-            Q(locked_at__lt=lock_expiry)
-        )
-        
-        pending_messages = EmailOutbox.objects.filter(pending_query).order_by('scheduled_at', 'id')
-        
-        if max_messages:
-            pending_messages = pending_messages[:max_messages]
-        
-        total_count = pending_messages.count()
-        
-        if total_count == 0:
-            self.stdout.write(self.style.SUCCESS('Nu există mesaje de procesat'))
-            return
-        
-        self.stdout.write(f'Găsite {total_count} mesaje de procesat')
-        
-        processed = 0
-        sent = 0
-        failed = 0
-        
-        # Procesează în batch-uri
-        for i in range(0, total_count, batch_size):
-            batch = pending_messages[i:i + batch_size]
             
-            for outbox in batch:
+            # Doar listează mesajele care ar fi revendicate, fără a le bloca
+            pending_messages = EmailOutbox.objects.filter(
+                claimable_query(timezone.now(), MAX_ATTEMPTS)
+            ).order_by('scheduled_at', 'id')
+            if max_messages:
+                pending_messages = pending_messages[:max_messages]
+            
+            processed = sent = failed = 0
+            for outbox in pending_messages.iterator(chunk_size=batch_size):
                 processed += 1
-                
-                if dry_run:
+                sent += 1
+                self.stdout.write(
+                    f'[DRY RUN] Ar procesa: {outbox.to} - {outbox.template} '
+                    f'(outbox_id={outbox.id})'
+                )
+        else:
+            def report(outbox, error):
+                if error is None:
                     self.stdout.write(
-                        f'[DRY RUN] Ar procesa: {outbox.to} - {outbox.template} '
-                        f'(outbox_id={outbox.id})'
-                    )
-                    sent += 1
-                    continue
-                
-                try:
-                    success = process_outbox_message(outbox)
-                    if success:
-                        sent += 1
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f'✓ Trimis: {outbox.to} - {outbox.template} '
-                                f'(outbox_id={outbox.id})'
-                            )
+                        self.style.SUCCESS(
+                            f'✓ Trimis: {outbox.to} - {outbox.template} '
+                            f'(outbox_id={outbox.id})'
                         )
-                    else:
-                        failed += 1
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'✗ Eșuat: {outbox.to} - {outbox.template} '
-                                f'(outbox_id={outbox.id}, attempts={outbox.attempts})'
-                            )
-                        )
-                except Exception as e:
-                    failed += 1
-                    logger.error(f'Eroare la procesarea outbox {outbox.id}: {e}', exc_info=True)
+                    )
+                else:
                     self.stdout.write(
-                        self.style.ERROR(
-                            f'✗ Eroare: {outbox.to} - {outbox.template} '
-                            f'(outbox_id={outbox.id}): {e}'
+                        self.style.WARNING(
+                            f'✗ Eșuat: {outbox.to} - {outbox.template} '
+                            f'(outbox_id={outbox.id}, attempts={outbox.attempts}): {error}'
                         )
                     )
+            
+            # Mesajele sunt revendicate în batch-uri (FOR UPDATE SKIP LOCKED), așa că
+            # comanda poate rula în paralel cu worker-ii Celery
+            started = time.monotonic()
+            result = drain_outbox(
+                batch_size=batch_size, max_messages=max_messages, on_result=report, workers=workers
+            )
+            elapsed = time.monotonic() - started
+            processed, sent, failed = result['processed'], result['sent'], result['failed']
+        
+        if processed == 0:
+            self.stdout.write(self.style.SUCCESS('Nu există mesaje de procesat'))
+            return
         
         # Rezumat
         self.stdout.write('')
@@ -134,5 +108,7 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'  Procesate: {processed}'))
         self.stdout.write(self.style.SUCCESS(f'  Trimise: {sent}'))
         self.stdout.write(self.style.WARNING(f'  Eșuate: {failed}'))
+        if not dry_run:
+            self.stdout.write(self.style.SUCCESS(f'  Durată: {elapsed:.2f}s ({processed / max(elapsed, 1e-6):.1f} mesaje/s)'))
         self.stdout.write(self.style.SUCCESS('=' * 50))
 
@@ -0,0 +1,96 @@
+"""
+Management command: server SMTP local care acceptă și numără mesajele, fără să le livreze.
+
+Folosit pentru a măsura throughput-ul trimiterii (send_emails --workers N, EMAIL_RATE_*)
+fără un provider real. Necesită pachetul opțional aiosmtpd (pip install aiosmtpd).
+
+Utilizare:
+    python manage.py smtp_sink
+    python manage.py smtp_sink --port 8025 --latency 200
+
+Apoi, în alt terminal:
+    EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend EMAIL_HOST=localhost \\
+    EMAIL_PORT=8025 EMAIL_USE_TLS=False python manage.py send_emails --workers 8
+"""
+import asyncio
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class CountingHandler:
+    """Handler aiosmtpd care numără mesajele primite, cu o latență opțională per mesaj."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.count = 0
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            # Simulează timpul de răspuns al provider-ului
+            await asyncio.sleep(self.latency)
+        with self._lock:
+            self.count += 1
+        return '250 Message accepted'
+
+
+class Command(BaseCommand):
+    help = 'Pornește un server SMTP local care numără mesajele primite (teste de throughput)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            default='127.0.0.1',
+            help='Adresa pe care ascultă serverul (default: 127.0.0.1)',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8025,
+            help='Portul pe care ascultă serverul (default: 8025)',
+        )
+        parser.add_argument(
+            '--latency',
+            type=int,
+            default=0,
+            help='Latența simulată per mesaj, în milisecunde (default: 0)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Intervalul de raportare, în secunde (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError('Pachetul aiosmtpd nu este instalat (pip install aiosmtpd)')
+
+        handler = CountingHandler(latency=options['latency'] / 1000)
+        controller = Controller(handler, hostname=options['host'], port=options['port'])
+        controller.start()
+        self.stdout.write(self.style.SUCCESS(
+            f"Server SMTP pornit pe {options['host']}:{options['port']} (Ctrl+C pentru oprire)"
+        ))
+
+        started = time.monotonic()
+        last_count, last_time = 0, started
+        try:
+            while True:
+                time.sleep(options['interval'])
+                now, count = time.monotonic(), handler.count
+                if count != last_count:
+                    rate = (count - last_count) / (now - last_time)
+                    self.stdout.write(f'Primite: {count} (+{count - last_count}, {rate:.1f} mesaje/s)')
+                last_count, last_time = count, now
+        except KeyboardInterrupt:
+            pass
+        finally:
+            controller.stop()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Total primite: {handler.count} în {elapsed:.1f}s'))
@@ -85,8 +85,8 @@ class EmailOutbox(models.Model):
     Mesaje programate de trimis (transactional outbox pattern).
     
     Acest model este coada noastră de email-uri. Când vrem să trimitem un email,
-    creăm un rând aici. Un worker (Celery) procesează periodic aceste mesaje
-    și le trimite efectiv.
+    creăm un rând aici. După commit, un task Celery trimite imediat mesajul
+    (vezi services._dispatch_on_commit); un sweep periodic prinde mesajele rămase.
     
     Pattern-ul "transactional outbox" asigură că:
     - Dacă creăm un NotificationEvent în aceeași tranzacție cu un Appointment,
@@ -0,0 +1,141 @@
+"""
+Limitarea ratei de trimitere a email-urilor per backend de email.
+
+Fiecare backend din settings.EMAIL_RATE_LIMITS are o rată de `rate` mesaje/secundă și o
+rafală maximă de `burst` mesaje. Thread-urile care trimit (vezi deliver_outbox_parallel)
+își rezervă câte un loc înainte de fiecare mesaj și așteaptă cât e nevoie, astfel încât
+trimiterea rulează aproape de cota provider-ului fără să fie throttled.
+
+Cu un cache partajat (Redis, vezi apps.core.caching) limita este comună tuturor
+proceselor care trimit (worker-i Celery, comanda send_emails): SharedRateLimiter
+numără mesajele într-o fereastră de timp cu un INCR atomic. Fără cache partajat,
+fiecare proces are propriul TokenBucket, cu rata împărțită la
+settings.EMAIL_SENDER_PROCESSES (numărul de procese care trimit simultan).
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.caching import is_shared_cache
+
+RATE_WINDOW_KEY = 'email:rate:{}:{}'
+
+
+class TokenBucket:
+    """Token bucket thread-safe, local procesului; `rate` <= 0 înseamnă fără limită."""
+
+    def __init__(self, rate: float, burst: int = 1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    @property
+    def process_rate(self) -> float:
+        """Rata disponibilă procesului curent (mesaje/secundă)."""
+        return self.rate
+
+    def acquire(self) -> float:
+        """
+        Consumă un token, așteptând dacă bucket-ul e gol.
+
+        Token-ul este rezervat sub lock (numărul de token-uri poate deveni negativ), iar
+        așteptarea are loc în afara lock-ului, astfel încât thread-urile care așteaptă
+        sunt eliberate în ordine, la intervale de 1 / rate.
+
+        Returns:
+            float: secundele așteptate
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class SharedRateLimiter:
+    """
+    Limită comună tuturor proceselor, ținută în cache: cel mult `burst` mesaje în fiecare
+    fereastră de burst / rate secunde (media rămâne `rate` mesaje/secundă).
+
+    Ferestrele sunt aliniate la ceasul sistemului, așa că toate procesele numără în
+    aceeași cheie; un mesaj peste limită așteaptă fereastra următoare.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1, processes: int = 1,
+                 clock=time.time, sleep=time.sleep):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.processes = max(1, processes)
+        self.window = self.burst / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+
+    @property
+    def process_rate(self) -> float:
+        """Partea estimată a procesului curent din rata comună (mesaje/secundă)."""
+        return self.rate / self.processes
+
+    def acquire(self) -> float:
+        """
+        Ocupă un loc în fereastra curentă, așteptând ferestrele următoare dacă e plină.
+
+        Returns:
+            float: secundele așteptate
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            now = self._clock()
+            window = int(now // self.window)
+            key = RATE_WINDOW_KEY.format(self.name, window)
+            cache.add(key, 0, timeout=math.ceil(self.window * 2))
+            try:
+                count = cache.incr(key)
+            except ValueError:
+                # Cheia a expirat între add și incr
+                continue
+            if count <= self.burst:
+                return waited
+            wait = (window + 1) * self.window - now
+            self._sleep(wait)
+            waited += wait
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def rate_limiter(backend: str = None):
+    """
+    Limitatorul (comun în proces) pentru backend-ul de email dat (default: EMAIL_BACKEND):
+    SharedRateLimiter cu un cache partajat, altfel un TokenBucket cu rata împărțită la
+    EMAIL_SENDER_PROCESSES.
+    """
+    backend = backend or settings.EMAIL_BACKEND
+    with _buckets_lock:
+        bucket = _buckets.get(backend)
+        if bucket is None:
+            limits = getattr(settings, 'EMAIL_RATE_LIMITS', {}).get(backend, {})
+            rate, burst = limits.get('rate', 0), limits.get('burst', 1)
+            processes = max(1, getattr(settings, 'EMAIL_SENDER_PROCESSES', 1))
+            if is_shared_cache():
+                bucket = SharedRateLimiter(backend, rate, burst, processes)
+            else:
+                bucket = TokenBucket(rate / processes, max(1, burst // processes))
+            _buckets[backend] = bucket
+        return bucket
@@ -47,6 +47,23 @@ def _want(user, field_name: str) -> bool:
     return getattr(prefs, field_name, True)
 
 
+def _dispatch_on_commit(outbox=None) -> None:
+    """
+    Pornește trimiterea imediat după commit-ul tranzacției care a scris în outbox.
+    
+    Un singur mesaj nou este trimis cu send_single_email; un fan-out (mai multe mesaje)
+    pornește process_email_queue, care le trimite în batch-uri. Dacă task-ul nu poate fi
+    pus în coadă, mesajele rămân în outbox pentru sweep-ul periodic (beat).
+    """
+    from django.conf import settings
+    if not settings.EMAIL_DISPATCH_ON_COMMIT:
+        return
+    
+    from .tasks import enqueue_email_dispatch
+    outbox_id = outbox.id if outbox is not None else None
+    transaction.on_commit(lambda: enqueue_email_dispatch(outbox_id))
+
+
 @transaction.atomic
 def notify_appointment_summary(appointment):
     """
@@ -97,7 +114,7 @@ def notify_appointment_summary(appointment):
     }
     
     # Creează mesajul în outbox (sau îl găsește dacă există deja - idempotency)
-    EmailOutbox.objects.get_or_create(
+    outbox, created = EmailOutbox.objects.get_or_create(
         idempotency_key=_idempotency(str(event.id), user.email, "appointment_summary"),
         defaults={
             "event": event,
@@ -108,6 +125,68 @@ def notify_appointment_summary(appointment):
             "scheduled_at": timezone.now(),
         }
     )
+    if created:
+        _dispatch_on_commit(outbox)
+
+
+@transaction.atomic
+def notify_appointment_batch_summary(user, appointments):
+    """
+    Creează un singur eveniment și un singur mesaj în outbox pentru un batch de programări.
+    
+    Apelat după ce se creează mai multe Appointment-uri într-un singur request
+    (ex: același birou pentru toată săptămâna), în locul câte unui email per programare.
+    
+    Args:
+        user: User - proprietarul programărilor
+        appointments: listă de Appointment (cu item încărcat)
+    """
+    if not appointments or not _want(user, "appointment_summary"):
+        return
+    
+    appointments = sorted(appointments, key=lambda apt: apt.start_date)
+    
+    event = NotificationEvent.objects.create(
+        type=NotificationType.APPOINTMENT_SUMMARY,
+        actor=None,
+        subject_user=user,
+        payload={
+            "appointment_ids": [apt.id for apt in appointments],
+            "item_ids": sorted({apt.item_id for apt in appointments}),
+        }
+    )
+    
+    context = {
+        "user": {
+            "first_name": user.first_name or user.username,
+            "last_name": user.last_name or "",
+        },
+        "appointments": [
+            {
+                "item": {
+                    "name": apt.item.name,
+                },
+                "start_at": timezone.localtime(apt.start_date).strftime('%d.%m.%Y %H:%M'),
+                "end_at": timezone.localtime(apt.end_date).strftime('%d.%m.%Y %H:%M'),
+            }
+            for apt in appointments
+        ],
+        "total": len(appointments),
+    }
+    
+    outbox, created = EmailOutbox.objects.get_or_create(
+        idempotency_key=_idempotency(str(event.id), user.email, "appointment_batch_summary"),
+        defaults={
+            "event": event,
+            "to": user.email,
+            "template": "appointment_batch_summary",
+            "locale": "ro",
+            "context": context,
+            "scheduled_at": timezone.now(),
+        }
+    )
+    if created:
+        _dispatch_on_commit(outbox)
 
 
 @transaction.atomic
@@ -158,7 +237,7 @@ def notify_request_status(request_obj):
     }
     
     # Creează mesajul în outbox
-    EmailOutbox.objects.get_or_create(
+    outbox, created = EmailOutbox.objects.get_or_create(
         idempotency_key=_idempotency(str(event.id), user.email, "request_status"),
         defaults={
             "event": event,
@@ -169,6 +248,8 @@ def notify_request_status(request_obj):
             "scheduled_at": timezone.now(),
         }
     )
+    if created:
+        _dispatch_on_commit(outbox)
 
 
 @transaction.atomic
@@ -179,39 +260,59 @@ def notify_desk_release_batch(date_obj, overquota_users, requester_user):
     Apelat după ce se calculează lista de utilizatori over-quota.
     Trimite email fiecărui user care are birou rezervat și a atins deja norma.
     
+    Fan-out în bulk: userii și preferințele lor sunt încărcați cu un singur query,
+    iar evenimentele și mesajele din outbox sunt scrise cu câte un bulk_create,
+    indiferent de câți useri primesc cererea.
+    
     Args:
         date_obj: date object - data pentru care se cere eliberarea
         overquota_users: list de dict-uri cu informații despre useri (din desk_overquota)
         requester_user: User - user-ul care cere eliberarea (cel care nu găsește birou)
+    
+    Returns:
+        int: numărul de mesaje trimise spre outbox
     """
+    # Importăm aici pentru a evita circular imports
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    
+    user_ids = {user_data.get('user_id') for user_data in overquota_users if user_data.get('user_id')}
+    if not user_ids:
+        return 0
+    
+    # Userii și preferințele lor (JOIN pe email_prefs) într-un singur query
+    users = User.objects.select_related('email_prefs').in_bulk(user_ids)
+    
+    now = timezone.now()
+    requester_context = {
+        "first_name": requester_user.first_name or requester_user.username,
+        "last_name": requester_user.last_name or "",
+        "email": requester_user.email,
+    }
+    events = []
+    messages = []
     for user_data in overquota_users:
-        user_id = user_data.get('user_id')
-        if not user_id:
-            continue
-        
-        # Importăm aici pentru a evita circular imports
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        user = users.get(user_data.get('user_id'))
+        if user is None:
             continue
         
         # Verifică preferințele
         if not _want(user, "desk_release_ask"):
             continue  # User-ul nu vrea notificări pentru eliberare birou
         
-        # Creează evenimentul
-        event = NotificationEvent.objects.create(
+        # ID-ul (UUID) evenimentului este generat în Python, deci cheia de idempotency
+        # se poate calcula înainte de INSERT
+        event = NotificationEvent(
             type=NotificationType.DESK_RELEASE_ASK,
             actor=requester_user,  # Cine cere eliberarea
             subject_user=user,  # Cine trebuie să elibereze
+            created_at=now,
             payload={
                 "date": date_obj.isoformat(),
                 "requester_id": requester_user.id,
             }
         )
+        events.append(event)
         
         # Context pentru template
         context = {
@@ -220,24 +321,23 @@ def notify_desk_release_batch(date_obj, overquota_users, requester_user):
                 "last_name": user.last_name or "",
             },
             "date": date_obj.strftime('%d.%m.%Y'),  # Format mai prietenos: 15.01.2024
-            "requester": {
-                "first_name": requester_user.first_name or requester_user.username,
-                "last_name": requester_user.last_name or "",
-                "email": requester_user.email,
-            },
+            "requester": requester_context,
             "appointments": user_data.get('appointments_on_date', []),
         }
         
-        # Creează mesajul în outbox
-        EmailOutbox.objects.get_or_create(
+        messages.append(EmailOutbox(
             idempotency_key=_idempotency(str(event.id), user.email, "desk_release_ask"),
-            defaults={
-                "event": event,
-                "to": user.email,
-                "template": "desk_release_ask",
-                "locale": "ro",
-                "context": context,
-                "scheduled_at": timezone.now(),
-            }
-        )
-
+            event=event,
+            to=user.email,
+            template="desk_release_ask",
+            locale="ro",
+            context=context,
+            scheduled_at=now,
+        ))
+    
+    NotificationEvent.objects.bulk_create(events)
+    # Mesajele deja existente (aceeași cheie de idempotency) sunt ignorate
+    EmailOutbox.objects.bulk_create(messages, ignore_conflicts=True)
+    if messages:
+        _dispatch_on_commit()
+    return len(messages)
@@ -3,101 +3,51 @@ Celery tasks pentru procesarea notificărilor prin email.
 """
 import logging
 from celery import shared_task
-from django.utils import timezone
-from django.db.models import Q
 
 from .models import EmailOutbox
-from .email_sender import process_outbox_message
+from .email_sender import drain_outbox, process_outbox_message
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(name='notify.process_email_queue', bind=True)
-def process_email_queue(self, batch_size=50, max_messages=None):
+def process_email_queue(self, batch_size=50, max_messages=None, workers=None):
     """
     Task Celery pentru procesarea cozii de email-uri.
     
-    Acest task rulează periodic (configurat în beat schedule) și procesează
-    mesajele din EmailOutbox care nu au fost încă trimise.
+    Pornit imediat după commit pentru fan-out-uri (vezi enqueue_email_dispatch) și periodic,
+    ca plasă de siguranță (beat schedule), pentru mesajele rămase netrimise.
     
     Args:
         batch_size: Numărul de mesaje de procesat într-un batch (default: 50)
         max_messages: Numărul maxim de mesaje de procesat (default: toate)
+        workers: Conexiuni de email paralele (default: settings.EMAIL_DISPATCH_WORKERS)
     
     Returns:
         dict: Rezumat cu numărul de mesaje procesate, trimise și eșuate
     """
-    now = timezone.now()
-    
-    # Query pentru mesaje de procesat
-    pending_query = Q(sent_at__isnull=True) & Q(scheduled_at__lte=now)
-    
-    # Exclude mesajele care sunt blocate recent (lock-ul nu a expirat)
-    # Lock-ul expiră după 10 minute
-    lock_expiry = now - timezone.timedelta(minutes=10)
-    pending_query &= (
-        Q(locked_at__isnull=True) | 
-        Q(locked_at__lt=lock_expiry)
+    def log_result(outbox, error):
+        if error is None:
+            logger.info(
+                f'✓ Email trimis: {outbox.to} - {outbox.template} '
+                f'(outbox_id={outbox.id})'
+            )
+        else:
+            logger.warning(
+                f'✗ Email eșuat: {outbox.to} - {outbox.template} '
+                f'(outbox_id={outbox.id}, attempts={outbox.attempts})'
+            )
+    
+    # Mesajele sunt revendicate în batch-uri (FOR UPDATE SKIP LOCKED), așa că mai multe
+    # instanțe ale task-ului pot rula în paralel
+    result = drain_outbox(
+        batch_size=batch_size, max_messages=max_messages, on_result=log_result, workers=workers
     )
     
-    pending_messages = EmailOutbox.objects.filter(pending_query).order_by('scheduled_at', 'id')
-    
-    if max_messages:
-        pending_messages = pending_messages[:max_messages]
-    
-    total_count = pending_messages.count()
-    
-    if total_count == 0:
+    if result['processed'] == 0:
         logger.info('Nu există mesaje de procesat')
-        return {
-            'processed': 0,
-            'sent': 0,
-            'failed': 0,
-            'total': 0
-        }
-    
-    logger.info(f'Găsite {total_count} mesaje de procesat')
-    
-    processed = 0
-    sent = 0
-    failed = 0
-    
-    # Procesează în batch-uri
-    for i in range(0, total_count, batch_size):
-        batch = pending_messages[i:i + batch_size]
-        
-        for outbox in batch:
-            processed += 1
-            
-            try:
-                success = process_outbox_message(outbox)
-                if success:
-                    sent += 1
-                    logger.info(
-                        f'✓ Email trimis: {outbox.to} - {outbox.template} '
-                        f'(outbox_id={outbox.id})'
-                    )
-                else:
-                    failed += 1
-                    logger.warning(
-                        f'✗ Email eșuat: {outbox.to} - {outbox.template} '
-                        f'(outbox_id={outbox.id}, attempts={outbox.attempts})'
-                    )
-            except Exception as e:
-                failed += 1
-                logger.error(
-                    f'✗ Eroare la procesarea outbox {outbox.id}: {e}',
-                    exc_info=True
-                )
-    
-    result = {
-        'processed': processed,
-        'sent': sent,
-        'failed': failed,
-        'total': total_count
-    }
-    
-    logger.info(f'Procesare completă: {result}')
+    else:
+        logger.info(f'Procesare completă: {result}')
     return result
 
 
@@ -106,7 +56,8 @@ def send_single_email(self, outbox_id):
     """
     Task pentru trimiterea unui singur email din outbox.
     
-    Utilizat pentru retry-uri sau trimitere imediată.
+    Pornit imediat după commit-ul fiecărui mesaj nou din outbox (vezi enqueue_email_dispatch);
+    utilizat și pentru retry-uri manuale.
     
     Args:
         outbox_id: ID-ul mesajului din EmailOutbox
@@ -131,3 +82,25 @@ def send_single_email(self, outbox_id):
         logger.error(f'Eroare la trimiterea email-ului outbox_id={outbox_id}: {e}', exc_info=True)
         return False
 
+
+def enqueue_email_dispatch(outbox_id=None) -> None:
+    """
+    Pune în coadă trimiterea imediată a mesajelor noi din outbox (apelat după commit).
+    
+    Cu outbox_id trimite doar acel mesaj (send_single_email), altfel golește coada
+    (process_email_queue). Publicarea nu reîncearcă: dacă broker-ul nu este disponibil,
+    request-ul nu este blocat, iar mesajele sunt trimise de sweep-ul periodic.
+    
+    Args:
+        outbox_id: opțional, ID-ul mesajului din EmailOutbox
+    """
+    try:
+        if outbox_id is not None:
+            send_single_email.apply_async(args=(outbox_id,), retry=False, ignore_result=True)
+        else:
+            process_email_queue.apply_async(retry=False, ignore_result=True)
+    except Exception as e:
+        logger.warning(
+            f'Trimiterea imediată nu a putut fi pusă în coadă (outbox_id={outbox_id}): {e}; '
+            f'mesajele vor fi trimise de sweep-ul periodic'
+        )
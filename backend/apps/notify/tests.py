@@ -1,3 +1,295 @@
-from django.test import TestCase
+"""
+Teste pentru trimiterea email-urilor din EmailOutbox (email_sender.py).
+"""
+import smtplib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .email_sender import (
+    CLAIM_SEND_BUDGET,
+    MAX_ATTEMPTS,
+    RETRY_BACKOFF,
+    claim_outbox_batch,
+    deliver_outbox_batch,
+    drain_outbox,
+    max_claim_size,
+    record_outbox_results,
+)
+from .models import EmailDelivery, EmailOutbox, NotificationEvent, NotificationType
+from . import ratelimit
+from .ratelimit import SharedRateLimiter, TokenBucket
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FailingBackend(BaseEmailBackend):
+    """Backend de email care refuză orice mesaj."""
+
+    def send_messages(self, email_messages):
+        raise RuntimeError('Serverul de email nu răspunde')
+
+
+def create_outbox(count=1, **kwargs):
+    event = NotificationEvent.objects.create(type=NotificationType.REQUEST_STATUS)
+    return [
+        EmailOutbox.objects.create(
+            event=event,
+            to=f'user{index}@example.com',
+            template='request_status',
+            idempotency_key=f'{event.id}-{index}',
+            **kwargs
+        )
+        for index in range(count)
+    ]
+
+
+class ClaimOutboxTests(TestCase):
+    def test_claim_locks_and_counts_the_attempt(self):
+        outbox, = create_outbox()
+        claimed = claim_outbox_batch(10)
+        self.assertEqual([row.id for row in claimed], [outbox.id])
+        self.assertEqual(claimed[0].attempts, 1)
+        self.assertIsNotNone(claimed[0].locked_at)
+        # Mesajul blocat nu mai poate fi revendicat până la LOCK_TIMEOUT
+        self.assertEqual(claim_outbox_batch(10), [])
+
+    def test_claim_skips_scheduled_sent_and_exhausted_messages(self):
+        now = timezone.now()
+        create_outbox(scheduled_at=now + timedelta(minutes=1))
+        create_outbox(sent_at=now)
+        create_outbox(attempts=MAX_ATTEMPTS)
+        ready = create_outbox(2)
+        self.assertEqual([row.id for row in claim_outbox_batch(10)], [row.id for row in ready])
+
+    def test_claim_respects_batch_size_and_ids(self):
+        first, second, third = create_outbox(3)
+        self.assertEqual([row.id for row in claim_outbox_batch(1, ids=[second.id, third.id])], [second.id])
+        self.assertEqual([row.id for row in claim_outbox_batch(10)], [first.id, third.id])
+
+
+class RecordOutboxResultsTests(TestCase):
+    def test_sent_and_failed_results(self):
+        create_outbox(2)
+        sent, failed = claim_outbox_batch(10)
+        before = timezone.now()
+        record_outbox_results([(sent, None), (failed, 'timeout')])
+
+        sent.refresh_from_db()
+        self.assertIsNotNone(sent.sent_at)
+        self.assertIsNone(sent.locked_at)
+        self.assertEqual(EmailDelivery.objects.get(outbox=sent).status, 'SENT')
+
+        failed.refresh_from_db()
+        self.assertIsNone(failed.sent_at)
+        self.assertIsNone(failed.locked_at)
+        self.assertEqual(failed.error, 'timeout')
+        self.assertGreaterEqual(failed.scheduled_at, before + RETRY_BACKOFF)
+        self.assertFalse(EmailDelivery.objects.filter(outbox=failed).exists())
+
+    def test_last_attempt_is_recorded_as_failed(self):
+        create_outbox(attempts=MAX_ATTEMPTS - 1)
+        outbox, = claim_outbox_batch(10)
+        record_outbox_results([(outbox, 'timeout')])
+        self.assertEqual(EmailDelivery.objects.get(outbox=outbox).status, 'FAILED')
+        self.assertEqual(claim_outbox_batch(10), [])
+
+
+@override_settings(EMAIL_BACKEND='apps.notify.tests.FailingBackend')
+class RetryBackoffTests(TestCase):
+    def test_failed_message_is_retried_once_per_drain_with_backoff(self):
+        outbox, = create_outbox()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            before = timezone.now()
+            result = drain_outbox(workers=1)
+            self.assertEqual((result['processed'], result['failed']), (1, 1))
+            outbox.refresh_from_db()
+            self.assertEqual(outbox.attempts, attempt)
+            self.assertIsNone(outbox.locked_at)
+            if attempt < MAX_ATTEMPTS:
+                self.assertGreaterEqual(outbox.scheduled_at, before + RETRY_BACKOFF * 2 ** (attempt - 1))
+            # Până la scheduled_at mesajul nu este revendicat din nou
+            self.assertEqual(drain_outbox(workers=1)['processed'], 0)
+            EmailOutbox.objects.filter(id=outbox.id).update(scheduled_at=timezone.now())
+
+        self.assertEqual(drain_outbox(workers=1)['processed'], 0)
+        self.assertEqual(EmailDelivery.objects.get(outbox=outbox).status, 'FAILED')
+
+
+class ScriptedConnection:
+    """Conexiune de email falsă: rezultatele open() / send_messages() sunt date în ordine."""
+
+    def __init__(self, opens=(), sends=()):
+        self.opens = list(opens)
+        self.sends = list(sends)
+        self.calls = []
+
+    def _next(self, outcomes, default):
+        outcome = outcomes.pop(0) if outcomes else default
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def open(self):
+        self.calls.append('open')
+        return self._next(self.opens, True)
+
+    def close(self):
+        self.calls.append('close')
+
+    def send_messages(self, messages):
+        self.calls.append('send')
+        return self._next(self.sends, len(messages))
+
+
+@override_settings(EMAIL_RATE_LIMITS={})
+class DeliverOutboxBatchTests(SimpleTestCase):
+    def deliver(self, connection, count=3):
+        batch = [
+            EmailOutbox(id=index, to=f'user{index}@example.com', template='request_status')
+            for index in range(1, count + 1)
+        ]
+        with mock.patch('apps.notify.email_sender.get_connection', return_value=connection):
+            return [error for _, error in deliver_outbox_batch(batch)]
+
+    def test_dropped_session_is_reopened_and_the_message_resent(self):
+        connection = ScriptedConnection(sends=[smtplib.SMTPServerDisconnected('timeout')])
+        self.assertEqual(self.deliver(connection), [None, None, None])
+        self.assertEqual(connection.calls, ['open', 'send', 'close', 'open', 'send', 'send', 'send', 'close'])
+
+    def test_connection_is_reopened_before_the_next_message(self):
+        # Mesajul 1 pică de două ori: conexiunea rămâne închisă și este redeschisă pentru mesajul 2
+        dropped = smtplib.SMTPServerDisconnected('timeout')
+        connection = ScriptedConnection(sends=[dropped, dropped])
+        self.assertEqual(self.deliver(connection), ['timeout', None, None])
+        self.assertEqual(connection.calls[:6], ['open', 'send', 'close', 'open', 'send', 'close'])
+        self.assertEqual(connection.calls[6:], ['open', 'send', 'send', 'close'])
+
+    def test_rest_of_the_batch_fails_when_the_server_stays_down(self):
+        refused = ConnectionRefusedError('refused')
+        connection = ScriptedConnection(
+            opens=[True, refused, refused],
+            sends=[smtplib.SMTPServerDisconnected('timeout')],
+        )
+        self.assertEqual(self.deliver(connection), ['refused', 'refused', 'refused'])
+        self.assertEqual(connection.calls.count('send'), 1)
+
+
+class FakeClock:
+    """Ceas injectat în TokenBucket; sleep() avansează timpul în loc să aștepte."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTests(SimpleTestCase):
+    def bucket(self, rate, burst=1):
+        clock = FakeClock()
+        return TokenBucket(rate, burst, clock=clock, sleep=clock.sleep), clock
+
+    def test_burst_is_free_then_one_token_per_interval(self):
+        bucket, clock = self.bucket(rate=10, burst=3)
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1)
+        self.assertAlmostEqual(waits[4], 0.1)
+        self.assertAlmostEqual(clock.now, 100.2)
+
+    def test_tokens_refill_with_time_up_to_burst(self):
+        bucket, clock = self.bucket(rate=2, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+        clock.now += 60
+        self.assertEqual([bucket.acquire(), bucket.acquire()], [0.0, 0.0])
+        self.assertAlmostEqual(bucket.acquire(), 0.5)
+
+    def test_concurrent_reservations_wait_in_line(self):
+        # Fără sleep real: rezervările făcute în același moment așteaptă 1/rate, 2/rate, ...
+        clock = FakeClock()
+        bucket = TokenBucket(4, 1, clock=clock, sleep=lambda seconds: None)
+        self.assertEqual([bucket.acquire() for _ in range(4)], [0.0, 0.25, 0.5, 0.75])
+
+    def test_no_rate_means_no_limit(self):
+        bucket, clock = self.bucket(rate=0)
+        self.assertEqual([bucket.acquire() for _ in range(100)], [0.0] * 100)
+        self.assertEqual(clock.sleeps, [])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SharedRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_is_shared_between_processes(self):
+        # Două "procese" (limitatoare separate) pe același cache: 10 mesaje/secundă în total
+        clock = FakeClock()
+        first, second = (
+            SharedRateLimiter('smtp', rate=10, burst=10, clock=clock, sleep=clock.sleep)
+            for _ in range(2)
+        )
+        waits = [(first if index % 2 else second).acquire() for index in range(10)]
+        self.assertEqual(waits, [0.0] * 10)
+        # Fereastra este plină: al 11-lea mesaj așteaptă fereastra următoare
+        self.assertAlmostEqual(first.acquire(), 1.0)
+        self.assertEqual(second.acquire(), 0.0)
+        self.assertAlmostEqual(clock.now, 101.0)
+
+    def test_average_rate_over_a_longer_window(self):
+        clock = FakeClock()
+        limiter = SharedRateLimiter('smtp', rate=0.5, burst=10, clock=clock, sleep=clock.sleep)
+        self.assertEqual(limiter.window, 20)
+        for _ in range(30):
+            limiter.acquire()
+        # 30 de mesaje în trei ferestre de 20 secunde (ferestre aliniate: 100 -> 120 -> 140)
+        self.assertEqual(clock.now, 140.0)
+
+    def test_no_rate_means_no_limit(self):
+        limiter = SharedRateLimiter('smtp', rate=0)
+        self.assertEqual([limiter.acquire() for _ in range(100)], [0.0] * 100)
+
+
+@override_settings(EMAIL_RATE_LIMITS={'smtp': {'rate': 10, 'burst': 10}}, EMAIL_SENDER_PROCESSES=4)
+class RateLimiterSelectionTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(ratelimit._buckets, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shared_cache_uses_one_limit_for_all_processes(self):
+        with mock.patch.object(ratelimit, 'is_shared_cache', return_value=True):
+            limiter = ratelimit.rate_limiter('smtp')
+        self.assertIsInstance(limiter, SharedRateLimiter)
+        self.assertEqual((limiter.rate, limiter.process_rate), (10, 2.5))
+        self.assertIs(ratelimit.rate_limiter('smtp'), limiter)
+
+    def test_local_cache_divides_the_rate_between_processes(self):
+        with mock.patch.object(ratelimit, 'is_shared_cache', return_value=False):
+            limiter = ratelimit.rate_limiter('smtp')
+        self.assertIsInstance(limiter, TokenBucket)
+        self.assertEqual((limiter.rate, limiter.burst), (2.5, 2))
+
+
+class MaxClaimSizeTests(SimpleTestCase):
+    def test_claim_fits_in_the_send_budget(self):
+        budget = CLAIM_SEND_BUDGET.total_seconds()
+        self.assertEqual(max_claim_size(50, TokenBucket(0)), 50)
+        self.assertEqual(max_claim_size(50, TokenBucket(100, 10)), 50)
+        self.assertEqual(max_claim_size(1000, TokenBucket(0.5, 10)), int(0.5 * budget))
+        self.assertEqual(max_claim_size(50, TokenBucket(0.0001)), 1)
+
+    def test_claim_uses_the_process_share_of_a_shared_limit(self):
+        budget = CLAIM_SEND_BUDGET.total_seconds()
+        limiter = SharedRateLimiter('smtp', rate=1, burst=10, processes=4)
+        self.assertEqual(max_claim_size(1000, limiter), int(budget / 4))
@@ -152,6 +152,17 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Paginarea keyset pentru /api/requests/, /api/appointments/ și /api/users/ (apps.core.pagination).
+# Cât timp API_PAGINATE_BY_DEFAULT este False, listele sunt paginate doar dacă clientul
+# trimite `cursor` sau `page_size` (compatibilitate cu frontend-ul care așteaptă liste complete).
+API_PAGINATE_BY_DEFAULT = os.environ.get('API_PAGINATE_BY_DEFAULT', 'False').lower() in ('1', 'true', 'yes', 'on')
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', '50'))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', '200'))
+
+# Profilul unui user (/api/users/{id}/): câte zile de istoric și câte rezervări trecute pe pagină
+USER_PROFILE_HISTORY_DAYS = int(os.environ.get('USER_PROFILE_HISTORY_DAYS', '90'))
+USER_PROFILE_PAST_PAGE_SIZE = int(os.environ.get('USER_PROFILE_PAST_PAGE_SIZE', '20'))
+
 # drf-spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Office Smart Appointments API',
@@ -201,6 +212,60 @@ EMAIL_USE_SSL = os.environ.get('EMAIL_USE_SSL', 'False').lower() == 'true'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 
+# Trimiterea imediată: fiecare scriere în outbox pune în coadă un task după commit
+# (False = mesajele sunt trimise doar de sweep-ul periodic)
+EMAIL_DISPATCH_ON_COMMIT = os.environ.get('EMAIL_DISPATCH_ON_COMMIT', 'True').lower() == 'true'
+
+# Intervalul (secunde) sweep-ului periodic al outbox-ului: plasă de siguranță pentru
+# mesajele netrimise imediat (broker indisponibil, worker căzut, reîncercări)
+EMAIL_QUEUE_SWEEP_SECONDS = float(os.environ.get('EMAIL_QUEUE_SWEEP_SECONDS', '300'))
+
+# Trimiterea în paralel: numărul de conexiuni (thread-uri) per worker care golește coada
+# (1 = secvențial, pe o singură conexiune)
+EMAIL_DISPATCH_WORKERS = int(os.environ.get('EMAIL_DISPATCH_WORKERS', '1'))
+
+# Limita de trimitere per backend de email: mesaje/secundă și rafala maximă (rate 0 = fără limită).
+# Cu REDIS_CACHE_URL limita este comună tuturor proceselor (vezi apps/notify/ratelimit.py)
+EMAIL_RATE_LIMITS = {
+    EMAIL_BACKEND: {
+        'rate': float(os.environ.get('EMAIL_RATE_PER_SECOND', '0')),
+        'burst': int(os.environ.get('EMAIL_RATE_BURST', '10')),
+    },
+}
+
+# Numărul de procese care trimit email-uri simultan (ex: concurrency-ul worker-ului Celery
+# + comanda send_emails). Fără cache partajat, fiecare proces primește rate / N; cu cache
+# partajat, determină câte mesaje revendică un proces odată (vezi max_claim_size)
+EMAIL_SENDER_PROCESSES = int(os.environ.get('EMAIL_SENDER_PROCESSES', '1'))
+
+# Cache (Redis) - folosit pentru snapshot-urile de disponibilitate per zi
+# Dacă REDIS_CACHE_URL este gol, se folosește un cache local în memorie (per proces);
+# invalidările nu ar ajunge la celelalte procese, așa că snapshot-urile sunt dezactivate
+# (check-ul core.W001 semnalează configurația)
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL', '')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'office',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Cât timp (secunde) rămâne valid un snapshot de ocupare pentru o zi
+# (plasă de siguranță - snapshot-urile sunt oricum invalidate la fiecare scriere)
+AVAILABILITY_SNAPSHOT_TTL = int(os.environ.get('AVAILABILITY_SNAPSHOT_TTL', '600'))
+
+# Câte zile în avans sunt create aparițiile seriilor recurente ca Appointment / Request
+# (după orizont, aparițiile sunt calculate la citire)
+BOOKING_SERIES_HORIZON_DAYS = int(os.environ.get('BOOKING_SERIES_HORIZON_DAYS', '28'))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
@@ -213,14 +278,29 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minute
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minute
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_TASK_ACKS_LATE = True
+# Publicarea task-urilor din request-uri (ex: trimiterea imediată a email-urilor) nu
+# așteaptă secunde întregi reconectări la un broker indisponibil
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'max_retries': 1,
+    'interval_start': 0,
+    'interval_step': 0.2,
+    'interval_max': 0.5,
+}
 
 # Celery Beat Schedule (task-uri periodice)
 CELERY_BEAT_SCHEDULE = {
     'process-email-queue': {
         'task': 'notify.process_email_queue',
-        'schedule': 60.0,  # Rulează la fiecare 60 de secunde (1 minut)
+        'schedule': EMAIL_QUEUE_SWEEP_SECONDS,  # Plasă de siguranță (default: la 5 minute)
+        'options': {
+            'expires': EMAIL_QUEUE_SWEEP_SECONDS / 2,  # Task-ul expiră dacă nu e preluat până la jumătatea intervalului
+        }
+    },
+    'materialize-booking-series': {
+        'task': 'core.materialize_booking_series',
+        'schedule': 6 * 60 * 60.0,  # De 4 ori pe zi (orizontul avansează cu o zi pe zi)
         'options': {
-            'expires': 30.0,  # Task-ul expiră după 30 de secunde dacă nu e preluat
+            'expires': 60 * 60.0,
         }
     },
 }
@@ -19,6 +19,7 @@ from apps.core.api import (
 from apps.core.viewsets import (
     RequestViewSet,
     AppointmentViewSet,
+    BookingSeriesViewSet,
     AvailabilityViewSet,
     AppAndReqViewSet,
     ItemOccupancyStatsViewSet,
@@ -48,6 +49,7 @@ router.register(r'rooms', RoomViewSet, basename='room')
 router.register(r'items', ItemViewSet, basename='item')
 router.register(r'requests', RequestViewSet, basename='request')
 router.register(r'appointments', AppointmentViewSet, basename='appointment')
+router.register(r'booking-series', BookingSeriesViewSet, basename='booking-series')
 router.register(r'appandreq', AppAndReqViewSet, basename='appandreq')
 router.register(r'availability', AvailabilityViewSet, basename='availability')
 router.register(r'item-occupancy-stats', ItemOccupancyStatsViewSet, basename='item-occupancy-stats')